@@ -0,0 +1,84 @@
+import json
+from bson import json_util
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from models.item import Item
+from services.cache import document_cache
+from services.index_advisor import create_metadata_index, get_index_advice
+from services.duplicates import BACKFILL_JOB
+from services.jobs import job_runner, job_to_dict
+from services.similarity import similarity_index
+from api.v1.items import build_board_filters
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"]
+)
+
+@router.get("/indexes")
+async def get_indexes():
+    """
+    Index de la collection items, statistiques d'utilisation ($indexStats)
+    et suggestions du conseiller d'index pour les filtres metadata.
+    """
+    collection = Item.get_motor_collection()
+    indexes = await collection.index_information()
+    try:
+        stats = await collection.aggregate([{"$indexStats": {}}]).to_list(length=None)
+        usage = {s["name"]: {"ops": s["accesses"]["ops"], "since": s["accesses"]["since"]} for s in stats}
+    except Exception:
+        usage = {}  # $indexStats non supporté (ex: base de test)
+    return json.loads(json_util.dumps({
+        "indexes": {
+            name: {"keys": info.get("key"), "usage": usage.get(name), **{k: v for k, v in info.items() if k not in ("key", "v")}}
+            for name, info in indexes.items()
+        },
+        "advice": await get_index_advice(),
+    }))
+
+@router.post("/indexes/metadata/{key}", status_code=201)
+async def create_index_for_metadata_key(key: str):
+    """Crée l'index partiel (board_id, metadata.<key>) suggéré par le conseiller."""
+    try:
+        name = await create_metadata_index(key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"name": name}
+
+@router.get("/explain/items/by_board/{board_id}")
+async def explain_items_by_board(board_id: str, request: Request):
+    """
+    Plan d'exécution Mongo (explain) de GET /items/by_board/{board_id}
+    avec les mêmes filtres de query string.
+    """
+    item_query = await build_board_filters(board_id, request.query_params.multi_items())
+    query = item_query.filter
+    cursor = Item.get_motor_collection().find(query)
+    if item_query.sort:
+        cursor = cursor.sort(item_query.sort)
+    plan = await cursor.explain()
+    # Le plan contient des types BSON (Timestamp, ObjectId...) : conversion en JSON étendu
+    return json.loads(json_util.dumps({"filter": query, "explain": plan}))
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Succès / échecs du cache de lecture par espace (board, item, boards, board_items)."""
+    return {"backend": type(document_cache.backend).__name__, "namespaces": document_cache.stats()}
+
+@router.get("/similarity")
+async def get_similarity_stats():
+    """Boards chargés dans l'index de similarité (nombre d'items vectorisés par board)."""
+    return similarity_index.stats()
+
+@router.post("/duplicates/backfill", status_code=status.HTTP_202_ACCEPTED)
+async def backfill_duplicate_signatures(rebuild: bool = False):
+    """
+    Calcule en tâche de fond (job, suivi sur GET /ai/jobs/{job_id}) les signatures MinHash
+    des items qui n'en ont pas, ou de tous les items avec rebuild=true.
+    """
+    job = await job_runner.submit(BACKFILL_JOB, {"rebuild": rebuild})
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=job_to_dict(job),
+        headers={"Location": f"/ai/jobs/{job.id}"},
+    )
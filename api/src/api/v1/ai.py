@@ -0,0 +1,75 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from beanie import PydanticObjectId
+from models.board import Board
+from models.job import Job
+from services.ai_service import PROCESS_JOB, llm_batcher
+from services.jobs import job_runner, job_to_dict
+
+router = APIRouter(
+    prefix="/ai",
+    tags=["ai"]
+)
+
+class ProcessRequest(BaseModel):
+    requests: List[str] = Field(..., min_length=1, max_length=100)  # demandes en langage naturel
+    board_id: Optional[PydanticObjectId] = None  # board cible (contexte donné au LLM)
+    priority: int = 0  # les jobs de plus haute priorité sont traités en premier
+
+@router.post("/process", status_code=status.HTTP_202_ACCEPTED)
+async def process(request: ProcessRequest):
+    """
+    Soumet des demandes à l'IA. Le traitement (appels LLM) tourne dans un job de fond :
+    la route répond 202 avec le job, à suivre sur GET /ai/jobs/{job_id}.
+    Le résultat du job contient une proposition d'item par demande.
+    """
+    if request.board_id is not None and not await Board.get(request.board_id):
+        raise HTTPException(status_code=404, detail="Board not found")
+    params = {"requests": request.requests, "board_id": str(request.board_id) if request.board_id else None}
+    job = await job_runner.submit(PROCESS_JOB, params, priority=request.priority, total=len(request.requests))
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=job_to_dict(job),
+        headers={"Location": f"/ai/jobs/{job.id}"},
+    )
+
+@router.get("/jobs")
+async def list_jobs(
+    status: Optional[str] = Query(None, pattern="^(queued|running|done|failed|cancelled)$"),
+    kind: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+):
+    """Derniers jobs (les plus récents d'abord), filtrables par statut et par type."""
+    query = {}
+    if status:
+        query["status"] = status
+    if kind:
+        query["kind"] = kind
+    jobs = await Job.find(query).sort("-created_at").limit(limit).to_list()
+    return [job_to_dict(job) for job in jobs]
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: PydanticObjectId):
+    """Statut, avancement (processed / total) et résultat d'un job."""
+    job = await Job.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_dict(job)
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: PydanticObjectId):
+    """
+    Annule un job : immédiatement s'il est en file, sinon dès que le processus qui
+    l'exécute le voit (au plus tard à sa prochaine mise à jour d'avancement).
+    """
+    job = await job_runner.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_dict(job)
+
+@router.get("/stats")
+async def ai_stats():
+    """File de jobs (en attente / en cours), compteurs du runner et regroupement des appels LLM."""
+    return {"jobs": await job_runner.stats(), "llm": llm_batcher.stats()}
@@ -1,44 +1,203 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from typing import List, Optional
 from models.board import Board
 from beanie import PydanticObjectId
+from core.config import settings
+from models.job import Job
+from services.board_ops import BOARD_JOBS, delete_board_cascade, move_board_items
+from services.board_stats import get_board_stats
+from services.cache import document_cache, pack_entry, unpack_entry
+from services.events import EPOCH, ItemEvent, event_bus
+from services.jobs import job_to_dict
+from utils.http_cache import (
+    conditional_response, document_validators, is_not_modified, listing_validators, not_modified, validator_headers,
+)
+from utils.raw_documents import dumps, find_raw, output_fields, shape_document
+from utils.update_utils import atomic_update, build_set_update, strip_protected_fields
 
 router = APIRouter(
     prefix="/boards",
     tags=["boards"]
 )
 
+class MoveItemsRequest(BaseModel):
+    target_board_id: PydanticObjectId
+    item_ids: Optional[List[PydanticObjectId]] = None  # par défaut : tous les items du board
+    status: Optional[str] = None  # ne déplacer que les items de ce statut
+
+def _job_accepted(job: dict) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=job,
+        headers={"Location": f"/boards/jobs/{job['_id']}"},
+    )
+
 @router.get("/", response_model=List[Board])
-async def list_boards():
-    return await Board.find_all().to_list()
+async def list_boards(request: Request, response: Response):
+    """
+    Liste des boards. Requêtes conditionnelles : ETag (nombre de boards et dernier
+    updated_at) et Last-Modified, 304 si la copie du client est à jour.
+    """
+    if settings.raw_list_serialization:
+        cached = await document_cache.get("boards", "list")
+        if cached is not None:
+            headers, body = unpack_entry(cached)
+            return conditional_response(request, body, headers)
+    etag, last_modified = await listing_validators(Board, {})
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    headers = validator_headers(etag, last_modified)
+    if not settings.raw_list_serialization:
+        response.headers.update(headers)
+        return await Board.find_all().to_list()
+    fields = output_fields(Board)
+    body = dumps([shape_document(doc, fields) for doc in await find_raw(Board, {})])
+    await document_cache.set("boards", "list", pack_entry(headers, body))
+    return conditional_response(request, body, headers)
 
 @router.post("/", response_model=Board, status_code=status.HTTP_201_CREATED)
 async def create_board(board: Board):
     await board.insert()
+    await document_cache.invalidate_boards_list()
     return board
 
 @router.get("/{id}", response_model=Board)
-async def get_board(id: PydanticObjectId):
+async def get_board(id: PydanticObjectId, request: Request):
+    """Board par identifiant, avec ETag (révision) et Last-Modified : 304 s'il n'a pas changé."""
+    cached = await document_cache.get("board", str(id))
+    if cached is not None:
+        headers, body = unpack_entry(cached)
+        return conditional_response(request, body, headers)
     board = await Board.get(id)
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
-    return board
+    headers = validator_headers(*document_validators(board))
+    body = dumps(board.model_dump(mode="json", by_alias=True))
+    await document_cache.set("board", str(id), pack_entry(headers, body))
+    return conditional_response(request, body, headers)
 
 @router.put("/{id}", response_model=Board)
-async def update_board(id: PydanticObjectId, board_data: Board):
+async def update_board(id: PydanticObjectId, board_data: Board, expected_revision: Optional[int] = None):
+    update_data = strip_protected_fields(board_data.dict(exclude_unset=True))
+    set_fields = build_set_update(Board, update_data, merge_fields=())
+    board = await atomic_update(Board, id, set_fields, expected_revision, not_found_detail="Board not found")
+    await document_cache.invalidate_board(str(id))
+    return board
+
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_board(id: PydanticObjectId, cascade: bool = False):
+    """
+    Supprime le board. Avec cascade=true, ses items sont supprimés aussi (transaction) ;
+    pour un gros board, la suppression tourne en tâche de fond et la route répond 202
+    avec le job à suivre sur GET /boards/jobs/{job_id}.
+    """
     board = await Board.get(id)
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
-    update_data = board_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(board, field, value)
-    await board.save()
-    return board
+    if not cascade:
+        await board.delete()
+        await document_cache.invalidate_board(str(id))
+        return None
+    result = await delete_board_cascade(str(id))
+    if "job" in result:
+        return _job_accepted(result["job"])
+    return None
 
-@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_board(id: PydanticObjectId):
+@router.post("/{id}/move-items")
+async def move_items(id: PydanticObjectId, request: MoveItemsRequest):
+    """
+    Déplace les items du board vers target_board_id (tous, ou filtrés par item_ids / status)
+    en un seul update_many. Pour un gros volume, répond 202 avec un job de fond.
+    """
+    if request.target_board_id == id:
+        raise HTTPException(status_code=400, detail="Target board must differ from source board")
+    for board_id in (id, request.target_board_id):
+        if not await Board.get(board_id):
+            raise HTTPException(status_code=404, detail=f"Board {board_id} not found")
+    result = await move_board_items(str(id), str(request.target_board_id), request.item_ids, request.status)
+    if "job" in result:
+        return _job_accepted(result["job"])
+    return result
+
+@router.get("/jobs/{job_id}")
+async def get_board_job(job_id: PydanticObjectId):
+    """
+    Avancement d'une suppression en cascade ou d'un déplacement exécuté en tâche de fond
+    (jobs du runner, annulables par POST /ai/jobs/{job_id}/cancel).
+    """
+    job = await Job.get(job_id)
+    if job is None or job.kind not in BOARD_JOBS:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_dict(job)
+
+@router.get("/{id}/stats")
+async def board_stats(id: PydanticObjectId):
+    """
+    Statistiques du board : nombre d'items par statut et par type, avancement des checklists.
+    Calculées par agrégation Mongo et mises en cache jusqu'à la prochaine écriture d'item.
+    """
+    return await get_board_stats(str(id))
+
+def _sse(event: str, data: dict, event_id: Optional[str] = None) -> str:
+    message = f"event: {event}\n"
+    if event_id:
+        message += f"id: {event_id}\n"
+    return message + f"data: {json.dumps(data)}\n\n"
+
+def _sse_item_event(event: ItemEvent) -> str:
+    return _sse(event.op, event.to_dict(), event.event_id)
+
+@router.get("/{id}/events")
+async def board_events(id: PydanticObjectId, request: Request, last_event_id: Optional[str] = None):
+    """
+    Flux Server-Sent Events des changements d'items du board (created/updated/deleted).
+
+    Reprise : le client renvoie l'identifiant du dernier événement reçu (en-tête
+    Last-Event-ID, envoyé automatiquement par EventSource, ou paramètre last_event_id).
+    Si la reprise est impossible, un événement `reset` indique qu'il faut recharger le board.
+    """
     board = await Board.get(id)
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
-    await board.delete()
-    return None
\ No newline at end of file
+    board_id = str(id)
+    resume_from = request.headers.get("last-event-id") or last_event_id
+    # S'abonner avant de rejouer l'historique pour ne perdre aucun événement
+    queue = event_bus.subscribe(board_id)
+    start_seq = event_bus.last_seq
+
+    async def stream():
+        last_seq = start_seq
+        try:
+            if resume_from:
+                backlog = event_bus.events_since(board_id, resume_from)
+                if backlog is None:
+                    yield _sse("reset", {"board_id": board_id, "reason": "resume token expired or unknown"})
+                else:
+                    for event in backlog:
+                        last_seq = event.seq
+                        yield _sse_item_event(event)
+            yield _sse("ready", {"board_id": board_id, "source": event_bus.source}, f"{EPOCH}-{last_seq}")
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.events_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                if event.seq <= last_seq:
+                    continue  # déjà envoyé lors du rejeu
+                last_seq = event.seq
+                yield _sse_item_event(event)
+        finally:
+            event_bus.unsubscribe(board_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,70 +1,612 @@
-from fastapi import APIRouter, HTTPException, status, Body, Request
-from typing import List
+import json
+from fastapi import APIRouter, HTTPException, status, Body, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 from models.item import Item
 from beanie import PydanticObjectId
+from bson import ObjectId
+from pydantic import BaseModel
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from core.config import settings
+from services.board_stats import invalidate_board_stats
+from services.cache import document_cache, pack_entry, unpack_entry
+from services.duplicates import apply_signature, find_duplicates, merge_patch, signature_updates
+from services.events import event_bus, publish_item_event
+from services.index_advisor import record_metadata_filters
+from services.schema_service import compute_schema_hash, ensure_schema_version, get_metadata_field_types, validate_metadata
+from services.similarity import similarity_index
+from utils.item_schema_utils import generate_metadata_schema
+from utils.http_cache import (
+    conditional_response, document_validators, is_not_modified, listing_validators, not_modified, validator_headers,
+)
+from utils.metadata_validator import MetadataValidationError
+from utils.projection import item_projection_model, parse_fields, projection_output_fields, truncate_texts
+from utils.query_dsl import ItemQuery, QueryError, compile_item_query
+from utils.raw_documents import dumps, find_raw, json_response, mongo_projection, output_fields, shape_document
+from utils.update_utils import atomic_update, build_set_update, strip_protected_fields
 
 router = APIRouter(
     prefix="/items",
     tags=["items"]
 )
 
+async def apply_metadata_schema(item: Item) -> None:
+    """
+    Valide les metadata d'un item et versionne le schéma de son type.
+    Ne fait rien si le client n'a pas envoyé de metadata.
+    """
+    if "metadata" not in item.model_fields_set:
+        return
+    if item.type and isinstance(item.metadata, dict):
+        item.metadata = await _validate_metadata(item.type, item.metadata)
+        await ensure_schema_version(item.type, item.metadata)
+
+async def _validate_metadata(item_type: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return await validate_metadata(item_type, metadata)
+    except MetadataValidationError as e:
+        raise HTTPException(
+            status_code=422,
+            detail={"message": f"Metadata do not match the latest '{item_type}' schema", "errors": e.errors},
+        )
+
+async def apply_metadata_schemas(items: List[Item], ordered: bool = False) -> Dict[int, str]:
+    """
+    Variante de apply_metadata_schema pour un lot d'items : le versionnement n'est
+    calculé qu'une fois par couple (type, forme des metadata) distinct du lot.
+    Retourne les erreurs de validation par index (entrées à ne pas insérer) ; avec
+    ordered, le lot s'arrête à la première entrée invalide.
+    """
+    errors: Dict[int, str] = {}
+    seen = set()
+    for index, item in enumerate(items):
+        if "metadata" not in item.model_fields_set:
+            continue
+        if not item.type or not isinstance(item.metadata, dict):
+            continue
+        try:
+            item.metadata = await validate_metadata(item.type, item.metadata)
+        except MetadataValidationError as e:
+            errors[index] = f"Metadata do not match the latest '{item.type}' schema: {e}"
+            if ordered:
+                break
+            continue
+        key = (item.type, compute_schema_hash(generate_metadata_schema(item.metadata)))
+        if key in seen:
+            continue
+        seen.add(key)
+        await ensure_schema_version(item.type, item.metadata)
+    return errors
+
+class BulkItemUpdate(BaseModel):
+    id: PydanticObjectId
+    data: Dict[str, Any]
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[str] = None
+    status: str  # "created", "updated", "deleted", "not_found" ou "error"
+    error: Optional[str] = None
+
+class BulkResponse(BaseModel):
+    ok: int
+    errors: int
+    results: List[BulkItemResult]
+
+def _bulk_response(results: List[BulkItemResult]) -> BulkResponse:
+    errors = sum(1 for r in results if r.status in ("error", "not_found"))
+    return BulkResponse(ok=len(results) - errors, errors=errors, results=results)
+
+def _write_errors(error: BulkWriteError) -> Dict[int, str]:
+    """Index des opérations en échec -> message d'erreur."""
+    return {e["index"]: e.get("errmsg", "write error") for e in error.details.get("writeErrors", [])}
+
+# Paramètres réservés de get_items_by_board (ne sont pas des filtres)
+LIST_QUERY_PARAMS = {"board_id", "after", "limit", "fields", "format", "sort", "max_text"}
+
+# Longueur minimale de `max_text` (troncature des textes dans les réponses)
+MIN_MAX_TEXT = 16
+
+async def build_board_filters(board_id: str, query_params: Iterable[Tuple[str, str]]) -> ItemQuery:
+    """
+    Compile la query string d'une liste d'items d'un board (voir utils/query_dsl.py).
+    Les filtres metadata.<clé> sont signalés au conseiller d'index.
+    Lève HTTPException 400 sur un champ, un opérateur ou une valeur invalide.
+    """
+    try:
+        item_query = compile_item_query(
+            board_id, query_params, await get_metadata_field_types(), reserved=LIST_QUERY_PARAMS,
+        )
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    record_metadata_filters(item_query.metadata_keys)
+    return item_query
+
+async def _board_items_validators(request: Request, item_query: ItemQuery) -> Union[Dict[str, str], Response]:
+    """
+    ETag (nombre d'items du filtre, dernier updated_at et paramètres de la requête) et
+    Last-Modified d'une liste d'items, ou la réponse 304 si la copie du client est à jour.
+    """
+    etag, last_modified = await listing_validators(
+        Item, item_query.filter, sorted(request.query_params.multi_items()),
+    )
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    return validator_headers(etag, last_modified)
+
 @router.get("/by_board/{board_id}", response_model=List[Item])
-async def get_items_by_board(board_id: str, request: Request):
-    # Récupérer tous les filtres de la query string
-    filters = []
-    filters.append(Item.board_id == board_id)
-    for key, value in request.query_params.items():
-        if key == "board_id":
-            continue  # déjà filtré
-        if key.startswith("metadata."):
-            meta_key = key.split(".", 1)[1]
-            filters.append(Item.metadata[meta_key] == value)
+async def get_items_by_board(
+    board_id: str,
+    request: Request,
+    response: Response,
+    after: Optional[PydanticObjectId] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    fields: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    max_text: Optional[int] = Query(None, ge=MIN_MAX_TEXT),
+):
+    """
+    Liste les items d'un board.
+
+    - Pagination par curseur : `limit` et `after` (ObjectId du dernier item reçu).
+      L'identifiant à passer pour la page suivante est renvoyé dans l'en-tête X-Next-After.
+    - Projection : `fields=title,status` ne renvoie que ces champs (plus `_id`) ; seuls
+      ces champs sont lus en base.
+    - `max_text=200` : les textes (titre, descriptions, valeurs de metadata...) sont
+      tronqués à 200 caractères suivis de "…".
+    - `format=ndjson` : réponse streamée, un item JSON par ligne, directement depuis le curseur.
+    - Tout autre paramètre est un filtre (`metadata.<clé>` pour les metadata), avec les
+      opérateurs `__ne`, `__in`, `__nin`, `__gt`, `__gte`, `__lt`, `__lte` et `__exists`
+      (ex: `metadata.points__gte=3`). Les valeurs sont converties selon le type du champ
+      (registre des schémas pour les metadata).
+    - `sort=-updated_at,title` : tri (incompatible avec `after`, qui suit l'ordre des `_id`).
+    - Requêtes conditionnelles (hors ndjson) : ETag / Last-Modified, 304 si la liste n'a pas changé.
+    """
+    item_query = await build_board_filters(board_id, request.query_params.multi_items())
+    if item_query.sort and after is not None:
+        raise HTTPException(status_code=400, detail="'after' cannot be combined with 'sort'")
+    if after is not None:
+        item_query.filter["_id"] = {"$gt": after}
+    try:
+        projection_fields = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Ordre stable sur _id pour la pagination par curseur
+    sort = item_query.sort or ([("_id", 1)] if after is not None or limit is not None else None)
+
+    if settings.raw_list_serialization:
+        # Documents BSON bruts encodés par orjson, sans construire de modèles Beanie
+        if projection_fields:
+            fields = projection_output_fields(projection_fields)
+            projection = {key: 1 for key, _, _ in fields}
+        else:
+            fields = output_fields(Item)
+            projection = None
+        if format == "ndjson":
+            async def stream_raw_items():
+                cursor = Item.get_motor_collection().find(item_query.filter, projection or mongo_projection(Item))
+                if sort:
+                    cursor = cursor.sort(sort)
+                if limit is not None:
+                    cursor = cursor.limit(limit)
+                async for doc in cursor:
+                    yield dumps(truncate_texts(shape_document(doc, fields), max_text)) + b"\n"
+            return StreamingResponse(stream_raw_items(), media_type="application/x-ndjson")
+        cache_key = await document_cache.board_items_key(board_id, request.query_params.multi_items())
+        cached = await document_cache.get("board_items", cache_key)
+        if cached is not None:
+            headers, body = unpack_entry(cached)
+            return conditional_response(request, body, headers)
+        headers = await _board_items_validators(request, item_query)
+        if isinstance(headers, Response):
+            return headers
+        docs = await find_raw(Item, item_query.filter, projection, sort, limit)
+        # Le curseur `after` suit l'ordre des _id : pas de page suivante avec un tri explicite
+        if limit is not None and len(docs) == limit and not item_query.sort:
+            headers["X-Next-After"] = str(docs[-1]["_id"])
+        body = dumps([truncate_texts(shape_document(doc, fields), max_text) for doc in docs])
+        await document_cache.set("board_items", cache_key, pack_entry(headers, body))
+        return json_response(body, headers=headers)
+
+    query = Item.find(item_query.filter)
+    if projection_fields:
+        query = query.project(item_projection_model(projection_fields))
+    if sort:
+        query = query.sort(sort)
+    if limit is not None:
+        query = query.limit(limit)
+
+    if format == "ndjson":
+        async def stream_items():
+            async for item in query:
+                yield json.dumps(truncate_texts(jsonable_encoder(item, by_alias=True), max_text)) + "\n"
+        return StreamingResponse(stream_items(), media_type="application/x-ndjson")
+
+    headers = await _board_items_validators(request, item_query)
+    if isinstance(headers, Response):
+        return headers
+    response.headers.update(headers)
+    items = await query.to_list()
+    if limit is not None and len(items) == limit and not item_query.sort:
+        response.headers["X-Next-After"] = str(items[-1].id)
+    if projection_fields or max_text:
+        return JSONResponse(truncate_texts(jsonable_encoder(items, by_alias=True), max_text), headers=dict(response.headers))
+    return items
+
+@router.get("/search")
+async def search_items(
+    q: str = Query(..., min_length=1),
+    board_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=200),
+    fields: Optional[str] = None,
+    max_text: Optional[int] = Query(None, ge=MIN_MAX_TEXT),
+):
+    """
+    Recherche plein texte (index texte Mongo) sur le titre et les descriptions des items.
+    Les résultats sont triés par pertinence (champ `score`) et limités à `limit`.
+    `fields` et `max_text` réduisent la réponse comme sur GET /items/by_board/{board_id}.
+    """
+    try:
+        projection_fields = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    match = {"$text": {"$search": q}}
+    if board_id:
+        match["board_id"] = board_id
+    # Sans `fields`, les champs du modèle : minhash (binaire) et lsh_buckets ne quittent pas Mongo
+    projection = {field: 1 for field in projection_fields} if projection_fields else dict(mongo_projection(Item))
+    projection["score"] = {"$meta": "textScore"}
+    pipeline = [
+        {"$match": match},
+        {"$sort": {"score": {"$meta": "textScore"}}},
+        {"$limit": limit},
+        {"$project": projection},
+    ]
+    results = await Item.aggregate(pipeline).to_list()
+    return JSONResponse(truncate_texts(jsonable_encoder(results, custom_encoder={ObjectId: str}), max_text))
+
+@router.get("/similar")
+async def similar_items(
+    board_id: str,
+    q: List[str] = Query(default=[]),
+    item_id: List[PydanticObjectId] = Query(default=[]),
+    k: int = Query(10, ge=1, le=100),
+    min_score: float = Query(0.05, ge=0, le=1),
+    fields: Optional[str] = None,
+):
+    """
+    Items du board sémantiquement proches de textes (`q`) ou d'items de référence
+    (`item_id`), par similarité cosinus sur l'index vectoriel du board (services/similarity.py).
+
+    Les paramètres sont répétables pour une recherche par lot (`?q=export csv&q=login&item_id=...`) :
+    un résultat par requête, avec les `k` items les plus proches (champ `score`).
+    Par défaut seuls `title`, `type` et `status` des items sont renvoyés (voir `fields`).
+    """
+    if not q and not item_id:
+        raise HTTPException(status_code=400, detail="At least one 'q' or 'item_id' is required")
+    try:
+        projection_fields = parse_fields(fields) or ("status", "title", "type")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        results = await similarity_index.search(board_id, q, [str(i) for i in item_id], k, min_score)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Item {e.args[0]} not found")
+
+    ids = {found_id for result in results for found_id, _ in result["matches"]}
+    output = projection_output_fields(projection_fields)
+    docs = await find_raw(Item, {"_id": {"$in": [ObjectId(i) for i in ids]}}, {key: 1 for key, _, _ in output})
+    by_id = {str(doc["_id"]): shape_document(doc, output) for doc in docs}
+    for result in results:
+        result["items"] = [
+            dict(by_id[found_id], score=score)
+            for found_id, score in result.pop("matches")
+            if found_id in by_id
+        ]
+    return json_response(dumps({"board_id": board_id, "results": results}))
+
+@router.post("/bulk", response_model=BulkResponse)
+async def create_items(items: List[Item], ordered: bool = True):
+    """
+    Crée plusieurs items en un seul insert_many.
+    Avec ordered=true, l'insertion s'arrête à la première erreur (metadata invalides
+    comprises) ; les entrées suivantes sont alors signalées en erreur.
+    """
+    # Des metadata invalides sont une erreur de l'entrée, comme un échec d'écriture
+    errors = await apply_metadata_schemas(items, ordered)
+    aborted_at = min(errors) if ordered and errors else None
+    to_insert = [
+        index for index in range(len(items))
+        if index not in errors and (aborted_at is None or index < aborted_at)
+    ]
+    for index in to_insert:
+        items[index].id = PydanticObjectId()
+        apply_signature(items[index])
+    if to_insert:
+        try:
+            await Item.insert_many([items[index] for index in to_insert], ordered=ordered)
+        except BulkWriteError as e:
+            write_errors = {to_insert[position]: message for position, message in _write_errors(e).items()}
+            errors.update(write_errors)
+            if ordered and write_errors:
+                aborted_at = min(write_errors) if aborted_at is None else min(aborted_at, *write_errors)
+    results = []
+    for index, item in enumerate(items):
+        if index in errors:
+            results.append(BulkItemResult(index=index, status="error", error=errors[index]))
+        elif aborted_at is not None and index > aborted_at:
+            results.append(BulkItemResult(index=index, status="error", error="not attempted (ordered batch aborted)"))
+        else:
+            results.append(BulkItemResult(index=index, id=str(item.id), status="created"))
+            publish_item_event("created", item.board_id, item.id, item)
+    await document_cache.invalidate_items(board_ids=[item.board_id for item in items])
+    return _bulk_response(results)
+
+@router.patch("/bulk", response_model=BulkResponse)
+async def patch_items(updates: List[BulkItemUpdate], ordered: bool = True):
+    """
+    Met à jour partiellement plusieurs items en un seul bulk_write.
+    Même sémantique que PATCH /items/{id} : les metadata sont fusionnées clé par clé.
+    """
+    results: List[Optional[BulkItemResult]] = [None] * len(updates)
+    operations = []
+    op_indexes = []
+    op_changes = []
+    for index, update in enumerate(updates):
+        try:
+            set_fields = build_set_update(Item, update.data)
+        except ValueError as e:
+            results[index] = BulkItemResult(index=index, id=str(update.id), status="error", error=str(e))
+            continue
+        op_indexes.append(index)
+        op_changes.append(set_fields)
+    # Les signatures de doublons suivent le titre et la description, dans la même écriture
+    signatures = await signature_updates({updates[index].id: changes for index, changes in zip(op_indexes, op_changes)})
+    for index, set_fields in zip(op_indexes, op_changes):
+        set_fields = {**set_fields, **signatures.get(updates[index].id, {})}
+        operations.append(UpdateOne({"_id": updates[index].id}, {"$set": set_fields, "$inc": {"revision": 1}}))
+
+    errors: Dict[int, str] = {}
+    matched = len(operations)
+    if operations:
+        try:
+            result = await Item.get_motor_collection().bulk_write(operations, ordered=ordered)
+            matched = result.matched_count
+        except BulkWriteError as e:
+            errors = _write_errors(e)
+            matched = e.details.get("nMatched", 0)
+    attempted = len(operations) if not (ordered and errors) else min(errors)
+    missing = set()
+    if matched < attempted - len(errors):
+        # Certains ids n'existent pas : une requête pour savoir lesquels
+        ids = [updates[i].id for i in op_indexes]
+        found = await Item.find({"_id": {"$in": ids}}).project(item_projection_model(())).to_list()
+        missing = set(ids) - {doc.id for doc in found}
+    for op_index, index in enumerate(op_indexes):
+        item_id = str(updates[index].id)
+        if op_index in errors:
+            results[index] = BulkItemResult(index=index, id=item_id, status="error", error=errors[op_index])
+        elif op_index >= attempted:
+            results[index] = BulkItemResult(index=index, id=item_id, status="error", error="not attempted (ordered batch aborted)")
+        elif updates[index].id in missing:
+            results[index] = BulkItemResult(index=index, id=item_id, status="not_found")
         else:
-            filters.append(getattr(Item, key) == value)
-    # Combiner tous les filtres avec AND logique
-    # Correction : Beanie accepte *filters pour un AND logique
-    return await Item.find(*filters).to_list()
+            results[index] = BulkItemResult(index=index, id=item_id, status="updated")
+    # Les boards des items ne sont pas connus : toutes les listes sont invalidées
+    await document_cache.invalidate_items([str(update.id) for update in updates], [None])
+    if any("board_id" in changes for changes in op_changes):
+        # les anciens boards des items déplacés ne sont pas connus non plus
+        invalidate_board_stats()
+    await _publish_bulk_updates(updates, results, op_indexes, op_changes)
+    return _bulk_response(results)
+
+async def _publish_bulk_updates(updates, results, op_indexes, op_changes) -> None:
+    """
+    Publie les deltas d'un PATCH /items/bulk. Le board des items n'étant pas connu,
+    il est relu (projection sur board_id) : les listeners (statistiques, similarité)
+    en ont besoin même sans client SSE.
+    """
+    if event_bus.source != "routes":
+        return
+    changed = {
+        updates[index].id: changes
+        for index, changes in zip(op_indexes, op_changes)
+        if results[index].status == "updated"
+    }
+    if not changed:
+        return
+    docs = await Item.find({"_id": {"$in": list(changed)}}).project(item_projection_model(("board_id",))).to_list()
+    for doc in docs:
+        publish_item_event("updated", doc.board_id, doc.id, changes=changed[doc.id])
+
+@router.delete("/bulk", response_model=BulkResponse)
+async def delete_items(ids: List[PydanticObjectId] = Body(...)):
+    """
+    Supprime plusieurs items en un seul delete_many.
+    """
+    found = await Item.find({"_id": {"$in": ids}}).project(item_projection_model(("board_id",))).to_list()
+    existing = {doc.id for doc in found}
+    if existing:
+        await Item.find({"_id": {"$in": list(existing)}}).delete()
+        for doc in found:
+            publish_item_event("deleted", doc.board_id, doc.id)
+        await document_cache.invalidate_items([str(doc.id) for doc in found], [doc.board_id for doc in found])
+    results = [
+        BulkItemResult(index=index, id=str(item_id), status="deleted" if item_id in existing else "not_found")
+        for index, item_id in enumerate(ids)
+    ]
+    return _bulk_response(results)
+
+def _response_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _item_response(
+    item: Item,
+    projection_fields: Tuple[str, ...],
+    max_text: Optional[int],
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+):
+    """
+    Réponse d'une écriture : l'item complet, ou seulement `_id` et les champs demandés
+    (textes tronqués à max_text) pour les clients qui n'ont pas besoin de tout relire.
+    """
+    if not projection_fields and not max_text:
+        return item
+    data = item.model_dump(mode="json", by_alias=True)
+    if projection_fields:
+        data = shape_document(data, projection_output_fields(projection_fields))
+    return json_response(dumps(truncate_texts(data, max_text)), headers=headers, status_code=status_code)
 
 @router.post("/", response_model=Item, status_code=status.HTTP_201_CREATED)
-async def create_item(item: Item):
+async def create_item(
+    item: Item,
+    response: Response,
+    fields: Optional[str] = None,
+    max_text: Optional[int] = Query(None, ge=MIN_MAX_TEXT),
+    on_duplicate: str = Query("allow", pattern="^(allow|reject|merge)$"),
+):
+    """
+    Crée un item. `fields` et `max_text` réduisent la réponse (par défaut l'item complet).
+
+    Les items du board au titre et à la description quasi identiques (MinHash/LSH, voir
+    services/duplicates.py) sont traités selon `on_duplicate` :
+    - `allow` (défaut) : création, les doublons probables sont listés dans X-Possible-Duplicates ;
+    - `reject` : 409 avec la liste des doublons (`detail.duplicates`), rien n'est créé ;
+    - `merge` : le plus proche est complété (descriptions vides, metadata et tâches absentes)
+      et renvoyé en 200 avec l'en-tête X-Merged-Into.
+    """
+    projection_fields = _response_fields(fields)
+    await apply_metadata_schema(item)
+    apply_signature(item)
+    duplicates = await find_duplicates(item.board_id, item.minhash, item.lsh_buckets)
+    if duplicates and on_duplicate == "reject":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Possible duplicate items in this board", "duplicates": duplicates},
+        )
+    if duplicates and on_duplicate == "merge":
+        merged = await _merge_duplicate(PydanticObjectId(duplicates[0]["_id"]), item)
+        if merged is not None:
+            response.status_code = status.HTTP_200_OK
+            response.headers["X-Merged-Into"] = str(merged.id)
+            return _item_response(merged, projection_fields, max_text, status.HTTP_200_OK, dict(response.headers))
     await item.insert()
-    return item
+    await document_cache.invalidate_items(board_ids=[item.board_id])
+    publish_item_event("created", item.board_id, item.id, item)
+    if duplicates:
+        response.headers["X-Possible-Duplicates"] = ",".join(duplicate["_id"] for duplicate in duplicates)
+    return _item_response(item, projection_fields, max_text, status.HTTP_201_CREATED, dict(response.headers))
+
+async def _merge_duplicate(duplicate_id: PydanticObjectId, item: Item) -> Optional[Item]:
+    """Complète le doublon existant avec l'item reçu ; None s'il a été supprimé entre-temps."""
+    existing = await Item.get(duplicate_id)
+    if existing is None:
+        return None
+    patch = merge_patch(existing, item)
+    if not patch:
+        return existing
+    try:
+        set_fields = build_set_update(Item, patch)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_fields.update((await signature_updates({existing.id: set_fields})).get(existing.id, {}))
+    merged = await atomic_update(Item, existing.id, set_fields, None, not_found_detail="Item not found")
+    await _invalidate_updated_item(merged, set_fields)
+    publish_item_event("updated", merged.board_id, merged.id, merged)
+    return merged
 
 @router.get("/{id}", response_model=Item)
-async def get_item(id: PydanticObjectId):
+async def get_item(id: PydanticObjectId, request: Request):
+    """Item par identifiant, avec ETag (révision) et Last-Modified : 304 s'il n'a pas changé."""
+    cached = await document_cache.get("item", str(id))
+    if cached is not None:
+        headers, body = unpack_entry(cached)
+        return conditional_response(request, body, headers)
     item = await Item.get(id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
-    return item
+    headers = validator_headers(*document_validators(item))
+    body = dumps(item.model_dump(mode="json", by_alias=True))
+    await document_cache.set("item", str(id), pack_entry(headers, body))
+    return conditional_response(request, body, headers)
+
+async def _previous_board_id(id: PydanticObjectId, set_fields: Dict[str, Any]) -> Optional[str]:
+    """Board de l'item avant une mise à jour qui change son board_id (une lecture projetée), sinon None."""
+    if "board_id" not in set_fields:
+        return None
+    doc = await Item.get_motor_collection().find_one({"_id": id}, {"board_id": 1})
+    return doc.get("board_id") if doc else None
+
+async def _invalidate_updated_item(item: Item, set_fields: Dict[str, Any], previous_board_id: Optional[str] = None) -> None:
+    board_ids = [item.board_id]
+    if "board_id" in set_fields and previous_board_id != item.board_id:
+        # L'item a quitté l'ancien board : sa liste et ses statistiques sont aussi obsolètes
+        board_ids.append(previous_board_id)
+        invalidate_board_stats(previous_board_id)
+    await document_cache.invalidate_items([str(item.id)], board_ids)
+
+def _publish_updated_item(item: Item, set_fields: Dict[str, Any], previous_board_id: Optional[str] = None) -> None:
+    publish_item_event("updated", item.board_id, item.id, item)
+    if "board_id" in set_fields and previous_board_id != item.board_id:
+        # Comme un déplacement de board : l'ancien board voit l'item partir
+        publish_item_event("updated", previous_board_id, item.id, changes={"board_id": item.board_id})
 
 @router.put("/{id}", response_model=Item)
-async def update_item(id: PydanticObjectId, item_data: Item):
-    item = await Item.get(id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    update_data = item_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(item, field, value)
-    await item.save()
-    return item
+async def update_item(
+    id: PydanticObjectId,
+    item_data: Item,
+    expected_revision: Optional[int] = None,
+    fields: Optional[str] = None,
+    max_text: Optional[int] = Query(None, ge=MIN_MAX_TEXT),
+):
+    """
+    Met à jour les champs envoyés d'un item en un seul aller-retour.
+    Avec expected_revision, la mise à jour échoue (409) si l'item a été modifié entre-temps.
+    `fields` et `max_text` réduisent la réponse comme pour POST /items/.
+    """
+    projection_fields = _response_fields(fields)
+    await apply_metadata_schema(item_data)
+    update_data = strip_protected_fields(item_data.dict(exclude_unset=True))
+    set_fields = build_set_update(Item, update_data, merge_fields=())
+    set_fields.update((await signature_updates({id: set_fields})).get(id, {}))
+    previous_board_id = await _previous_board_id(id, set_fields)
+    item = await atomic_update(Item, id, set_fields, expected_revision, not_found_detail="Item not found")
+    await _invalidate_updated_item(item, set_fields, previous_board_id)
+    _publish_updated_item(item, set_fields, previous_board_id)
+    return _item_response(item, projection_fields, max_text)
 
 
 @router.patch("/{id}", response_model=Item)
-async def patch_item(id: PydanticObjectId, patch_data: dict = Body(...)):
-    item = await Item.get(id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    for field, value in patch_data.items():
-        if field == "metadata" and isinstance(value, dict):
-            # Fusionner intelligemment les metadata
-            current_metadata = getattr(item, "metadata", {}) or {}
-            updated_metadata = current_metadata.copy()
-            updated_metadata.update(value)
-            setattr(item, "metadata", updated_metadata)
-        else:
-            setattr(item, field, value)
-    await item.save()
-    return item
+async def patch_item(
+    id: PydanticObjectId,
+    patch_data: dict = Body(...),
+    expected_revision: Optional[int] = None,
+    fields: Optional[str] = None,
+    max_text: Optional[int] = Query(None, ge=MIN_MAX_TEXT),
+):
+    """
+    Modifie partiellement un item via `$set` : les metadata sont fusionnées clé par clé
+    (`metadata.<clé>`), sans relire le document.
+    `fields` et `max_text` réduisent la réponse comme pour POST /items/.
+    """
+    projection_fields = _response_fields(fields)
+    try:
+        set_fields = build_set_update(Item, patch_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_fields.update((await signature_updates({id: set_fields})).get(id, {}))
+    previous_board_id = await _previous_board_id(id, set_fields)
+    item = await atomic_update(Item, id, set_fields, expected_revision, not_found_detail="Item not found")
+    await _invalidate_updated_item(item, set_fields, previous_board_id)
+    _publish_updated_item(item, set_fields, previous_board_id)
+    return _item_response(item, projection_fields, max_text)
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_item(id: PydanticObjectId):
@@ -72,4 +614,6 @@ async def delete_item(id: PydanticObjectId):
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     await item.delete()
+    await document_cache.invalidate_items([str(item.id)], [item.board_id])
+    publish_item_event("deleted", item.board_id, item.id)
     return None
@@ -1,34 +1,73 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from typing import Any, Dict, List, Optional
+from pymongo.errors import DuplicateKeyError
+from core.config import settings
 from models.item_schema import ItemSchema
+from services.schema_service import compute_schema_hash, diff_against_latest, get_latest_schema as get_latest_schema_doc, invalidate_schema_cache
+from utils.http_cache import etag_matches, make_etag, not_modified
+from utils.raw_documents import find_raw, raw_documents_response
 
 router = APIRouter(
     prefix="/schemas",
     tags=["schemas"]
 )
 
+# Les routes GET supportent les requêtes conditionnelles : elles renvoient un ETag
+# et répondent 304 Not Modified si l'en-tête If-None-Match correspond.
+
 @router.get("/", response_model=List[str])
-async def list_item_types():
+async def list_item_types(request: Request, response: Response):
     """Liste tous les types d'item connus (distincts)."""
     types = await ItemSchema.distinct("item_type")
+    etag = make_etag(sorted(types))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return types
 
 @router.get("/{item_type}", response_model=List[ItemSchema])
-async def get_schemas_for_type(item_type: str):
+async def get_schemas_for_type(item_type: str, request: Request, response: Response):
     """Liste toutes les versions de schéma pour un type d'item."""
+    if settings.raw_list_serialization:
+        docs = await find_raw(ItemSchema, {"item_type": item_type}, sort=[("version", -1)])
+        etag = make_etag(item_type, [(doc.get("version"), doc.get("schema_hash")) for doc in docs])
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        return raw_documents_response(ItemSchema, docs, headers={"ETag": etag})
     schemas = await ItemSchema.find(ItemSchema.item_type == item_type).sort("-version").to_list()
+    etag = make_etag(item_type, [(s.version, s.schema_hash) for s in schemas])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return schemas
 
 @router.get("/{item_type}/latest", response_model=Optional[ItemSchema])
-async def get_latest_schema(item_type: str):
+async def get_latest_schema(item_type: str, request: Request, response: Response):
     """Récupère le schéma courant (dernière version) pour un type d'item."""
-    schema = await ItemSchema.find(ItemSchema.item_type == item_type).sort("-version").first_or_none()
+    schema = await get_latest_schema_doc(item_type, refresh=True)
     if not schema:
         raise HTTPException(status_code=404, detail="No schema found for this item type")
+    etag = make_etag(item_type, schema.version, schema.schema_hash or compute_schema_hash(schema.schema))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return schema
 
+@router.post("/{item_type}/diff")
+async def diff_schema(item_type: str, metadata: Dict[str, Any]):
+    """
+    Compare le schéma déduit des metadata fournies au schéma courant du type :
+    chemins ajoutés, supprimés et dont le type a changé (objets et listes imbriqués).
+    """
+    return await diff_against_latest(item_type, metadata)
+
 @router.post("/", response_model=ItemSchema, status_code=status.HTTP_201_CREATED)
 async def create_schema(schema: ItemSchema):
     """Crée une nouvelle version de schéma pour un type d'item."""
-    await schema.insert()
-    return schema
\ No newline at end of file
+    schema.schema_hash = compute_schema_hash(schema.schema)
+    try:
+        await schema.insert()
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="This schema version already exists for this item type")
+    invalidate_schema_cache(schema.item_type)
+    return schema
@@ -0,0 +1,131 @@
+import gzip
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+logger = logging.getLogger("compression")
+
+# Encodages optionnels : brotli (paquet brotli) et zstd (paquet zstandard)
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP_LEVEL = 6
+# Qualités rapides : le gain de taille des niveaux élevés ne compense pas le CPU par requête
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+
+def _compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    compressors: Dict[str, Callable[[bytes], bytes]] = {}
+    if brotli is not None:
+        compressors["br"] = lambda body: brotli.compress(body, quality=BROTLI_QUALITY)
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        compressors["zstd"] = compressor.compress
+    compressors["gzip"] = lambda body: gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return compressors
+
+
+# Encodages disponibles, par ordre de préférence du serveur
+COMPRESSORS = _compressors()
+
+
+def negotiate_encoding(accept_encoding: str, available: List[str]) -> Optional[str]:
+    """
+    Choisit l'encodage à utiliser d'après l'en-tête Accept-Encoding : le plus grand
+    facteur q, puis l'ordre de préférence de `available`. None si aucun n'est accepté.
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    candidates: List[Tuple[float, int, str]] = []
+    for rank, encoding in enumerate(available):
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > 0:
+            candidates.append((-q, rank, encoding))
+    return min(candidates)[2] if candidates else None
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    return content_type.startswith("text/") or any(
+        marker in content_type for marker in ("json", "xml", "javascript")
+    )
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI pur : compresse (br, zstd ou gzip selon Accept-Encoding) les réponses
+    texte/JSON d'au moins `minimum_size` octets envoyées en un seul message.
+
+    Les réponses en streaming (NDJSON, SSE : plusieurs messages body) passent telles
+    quelles, sans être mises en mémoire, comme les réponses 304 / 204 et celles déjà encodées.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), list(COMPRESSORS))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # retenu jusqu'au premier morceau du corps, qui décide de la compression
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+            start, start_message = start_message, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or start["status"] in (204, 304)
+                or "content-encoding" in headers
+                or not is_compressible(headers.get("content-type", ""))
+            ):
+                await send(start)
+                await send(message)
+                return
+            compressed = COMPRESSORS[encoding](body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # un ETag fort désigne une suite d'octets précise : celle-ci a changé
+                headers["ETag"] = "W/" + etag
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,101 @@
+import os
+
+try:
+    # Développement local : variables lues depuis un fichier .env si python-dotenv est installé
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class Settings:
+    """
+    Configuration de l'API, lue depuis les variables d'environnement.
+    """
+
+    def __init__(self):
+        # Connexion MongoDB (core/database.py) : un seul client, donc un pool, par processus
+        self.mongodb_uri = os.environ.get("MONGODB_URI", "mongodb://localhost:27017")
+        self.mongodb_db = os.environ.get("MONGODB_DB", "ai_board")
+        self.mongo_max_pool_size = int(os.environ.get("MONGO_MAX_POOL_SIZE", "100"))
+        self.mongo_min_pool_size = int(os.environ.get("MONGO_MIN_POOL_SIZE", "2"))
+        self.mongo_max_idle_time_ms = int(os.environ.get("MONGO_MAX_IDLE_TIME_MS", "300000"))
+        self.mongo_connect_timeout_ms = int(os.environ.get("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+        self.mongo_server_selection_timeout_ms = int(os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+        self.mongo_wait_queue_timeout_ms = int(os.environ.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", "10000"))
+        # 0 : pas de timeout sur les opérations
+        self.mongo_socket_timeout_ms = int(os.environ.get("MONGO_SOCKET_TIMEOUT_MS", "0"))
+        # Création des index : "startup" (bloquante), "background" ou "off"
+        self.mongo_index_creation = os.environ.get("MONGO_INDEX_CREATION", "background")
+        # Connexions ouvertes au démarrage, avant les premières requêtes
+        self.mongo_warmup_connections = int(os.environ.get("MONGO_WARMUP_CONNECTIONS", str(self.mongo_min_pool_size)))
+        # Conseiller d'index sur les filtres metadata.* (services/index_advisor.py)
+        self.index_advisor_threshold = int(os.environ.get("INDEX_ADVISOR_THRESHOLD", "50"))
+        self.index_advisor_auto_create = _env_bool("INDEX_ADVISOR_AUTO_CREATE", False)
+        # Au-delà de ce nombre de clés metadata filtrées, un index wildcard est suggéré
+        self.index_advisor_wildcard_keys = int(os.environ.get("INDEX_ADVISOR_WILDCARD_KEYS", "10"))
+        # Flux d'événements des boards (services/events.py) :
+        # "auto" (change streams si disponibles), "routes" ou "change_stream"
+        self.events_source = os.environ.get("EVENTS_SOURCE", "auto")
+        # Historique de reprise : événements gardés par board, boards suivis au plus
+        self.events_history_size = int(os.environ.get("EVENTS_HISTORY_SIZE", "1000"))
+        self.events_history_boards = int(os.environ.get("EVENTS_HISTORY_BOARDS", "100"))
+        self.events_heartbeat_seconds = float(os.environ.get("EVENTS_HEARTBEAT_SECONDS", "15"))
+        # Durée de vie maximale des statistiques de board en cache (services/board_stats.py)
+        self.stats_cache_ttl = float(os.environ.get("STATS_CACHE_TTL", "30"))
+        # Validation des metadata contre le dernier schéma du type : "off", "warn" ou "strict"
+        self.metadata_validation = os.environ.get("METADATA_VALIDATION", "warn")
+        # Suppression en cascade / déplacement des items d'un board (services/board_ops.py) :
+        # au-delà de ce nombre d'items, l'opération tourne en tâche de fond, par lots
+        self.board_ops_background_threshold = int(os.environ.get("BOARD_OPS_BACKGROUND_THRESHOLD", "5000"))
+        self.board_ops_batch_size = int(os.environ.get("BOARD_OPS_BATCH_SIZE", "1000"))
+        # Métriques Prometheus (GET /metrics) : durées par route et commandes Mongo
+        self.metrics_enabled = _env_bool("METRICS_ENABLED", True)
+        # Listes (boards, items d'un board, versions de schéma) lues en BSON brut et encodées
+        # par orjson, sans validation Pydantic document par document
+        self.raw_list_serialization = _env_bool("RAW_LIST_SERIALIZATION", True)
+        # Cache de lecture des boards / items (services/cache.py) : "memory", "redis" ou "off"
+        self.cache_backend = os.environ.get("CACHE_BACKEND", "memory")
+        self.cache_ttl = float(os.environ.get("CACHE_TTL", "30"))
+        self.cache_max_entries = int(os.environ.get("CACHE_MAX_ENTRIES", "10000"))
+        self.redis_url = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+        # Nombre de processus servant l'API (lu aussi par uvicorn / gunicorn pour --workers)
+        self.web_concurrency = int(os.environ.get("WEB_CONCURRENCY", "1"))
+        # Compression des réponses (core/compression.py) à partir de COMPRESSION_MIN_SIZE octets
+        self.compression_enabled = _env_bool("COMPRESSION_ENABLED", True)
+        self.compression_min_size = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+        # Index de similarité des items (services/similarity.py, GET /items/similar)
+        self.similarity_embedder = os.environ.get("SIMILARITY_EMBEDDER", "hashing")
+        self.similarity_dim = int(os.environ.get("SIMILARITY_DIM", "1024"))
+        self.similarity_max_boards = int(os.environ.get("SIMILARITY_MAX_BOARDS", "50"))
+        self.similarity_index_ttl = float(os.environ.get("SIMILARITY_INDEX_TTL", "300"))
+        # Jobs asynchrones persistés (services/jobs.py) : jobs simultanés par processus,
+        # délai de scrutation de la file, délai sans heartbeat avant reprise, nombre de tentatives
+        self.jobs_concurrency = int(os.environ.get("JOBS_CONCURRENCY", "4"))
+        self.jobs_poll_interval = float(os.environ.get("JOBS_POLL_INTERVAL", "2"))
+        self.jobs_stale_after = float(os.environ.get("JOBS_STALE_AFTER", "60"))
+        self.jobs_max_attempts = int(os.environ.get("JOBS_MAX_ATTEMPTS", "3"))
+        # Appels LLM (services/ai_service.py) : fournisseur "stub" (local) ou "module:fabrique",
+        # regroupement des prompts en lots et nombre de lots simultanés
+        self.llm_provider = os.environ.get("LLM_PROVIDER", "stub")
+        self.llm_batch_size = int(os.environ.get("LLM_BATCH_SIZE", "8"))
+        self.llm_batch_wait_ms = float(os.environ.get("LLM_BATCH_WAIT_MS", "20"))
+        self.llm_max_concurrent_batches = int(os.environ.get("LLM_MAX_CONCURRENT_BATCHES", "2"))
+        self.llm_stub_latency_ms = float(os.environ.get("LLM_STUB_LATENCY_MS", "200"))
+        # Détection des doublons (services/duplicates.py) : composantes MinHash et bandes LSH
+        # (seuil de candidature (1/bandes)^(bandes/composantes)), similarité minimale d'un doublon
+        # et nombre maximal de candidats lus par recherche
+        self.minhash_permutations = int(os.environ.get("MINHASH_PERMUTATIONS", "64"))
+        self.minhash_bands = int(os.environ.get("MINHASH_BANDS", "16"))
+        self.duplicate_threshold = float(os.environ.get("DUPLICATE_THRESHOLD", "0.5"))
+        self.duplicate_max_candidates = int(os.environ.get("DUPLICATE_MAX_CANDIDATES", "200"))
+
+
+settings = Settings()
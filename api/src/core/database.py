@@ -1,22 +1,120 @@
-import os
-from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
+import logging
+from typing import Optional
+
 from beanie import init_beanie
-from dotenv import load_dotenv
+from beanie.odm.fields import IndexModelField
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import OperationFailure
 
+from core.config import settings
+from core.instrumentation import mongo_listener
 from models.board import Board
 from models.item import Item
 from models.item_schema import ItemSchema
+from models.job import Job
+from services.schema_service import migrate_item_schemas
+
+logger = logging.getLogger("database")
+
+DOCUMENT_MODELS = [Board, Item, ItemSchema, Job]
+
+# Client unique du processus (un pool de connexions par worker)
+client: Optional[AsyncIOMotorClient] = None
+_index_task: Optional[asyncio.Task] = None
+
+
+def create_client() -> AsyncIOMotorClient:
+    """Client Motor configuré depuis core/config.py (pool, timeouts, monitoring)."""
+    options = {
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "minPoolSize": settings.mongo_min_pool_size,
+        "maxIdleTimeMS": settings.mongo_max_idle_time_ms,
+        "connectTimeoutMS": settings.mongo_connect_timeout_ms,
+        "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+        "waitQueueTimeoutMS": settings.mongo_wait_queue_timeout_ms,
+        "appname": "ai-board-api",
+    }
+    if settings.mongo_socket_timeout_ms:
+        options["socketTimeoutMS"] = settings.mongo_socket_timeout_ms
+    if settings.metrics_enabled:
+        options["event_listeners"] = [mongo_listener]
+    return AsyncIOMotorClient(settings.mongodb_uri, **options)
 
-load_dotenv()
 
-MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
-MONGODB_DB = os.getenv("MONGODB_DB", "ai_board")
+async def create_indexes() -> None:
+    """
+    Crée les index déclarés dans les Settings des modèles (createIndexes est idempotent).
+    Les index existants ne sont jamais supprimés, sauf ceux remplacés par une migration
+    (voir services/schema_service.migrate_item_schemas, exécutée avant).
 
-client = AsyncIOMotorClient(MONGODB_URI)
-db = client[MONGODB_DB]
+    Un index unique qui ne peut pas être construit (doublons restants) lève l'erreur :
+    bloquante avec MONGO_INDEX_CREATION=startup, journalisée en tâche de fond.
+    """
+    await migrate_item_schemas()
+    for model in DOCUMENT_MODELS:
+        indexes = IndexModelField.merge_indexes([], model.get_settings().indexes or [])
+        if not indexes:
+            continue
+        try:
+            await model.get_motor_collection().create_indexes([field.index for field in indexes])
+        except OperationFailure as e:
+            if e.code in (11000, 11001):
+                logger.error(
+                    f"Index unique de {model.__name__} non créé, documents en double : "
+                    f"l'unicité n'est pas garantie tant qu'ils ne sont pas corrigés ({e})"
+                )
+            raise
+    logger.info("Index Mongo à jour")
 
-async def init_db():
+
+async def _create_indexes_in_background() -> None:
+    try:
+        await create_indexes()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error(f"Échec de la création des index en tâche de fond: {e}")
+
+
+async def warm_up(connections: int) -> None:
+    """Ouvre `connections` connexions du pool (pings concurrents) avant les premières requêtes."""
+    if connections <= 0:
+        return
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(connections)))
+
+
+async def init_db() -> None:
+    """
+    Connexion et initialisation de Beanie. Selon MONGO_INDEX_CREATION, les index sont créés
+    avant de servir ("startup"), en tâche de fond ("background") ou pas du tout ("off",
+    ex: workers supplémentaires quand un seul processus s'en charge).
+    """
+    global client, _index_task
+    client = create_client()
+    # Index créés par create_indexes, après la migration des versions de schéma
     await init_beanie(
-        database=db,
-        document_models=[Board, Item, ItemSchema],
-    )
\ No newline at end of file
+        database=client[settings.mongodb_db],
+        document_models=DOCUMENT_MODELS,
+        skip_indexes=True,
+    )
+    if settings.mongo_index_creation == "startup":
+        await create_indexes()
+    elif settings.mongo_index_creation == "background":
+        _index_task = asyncio.create_task(_create_indexes_in_background())
+    await warm_up(settings.mongo_warmup_connections)
+
+
+async def close_db() -> None:
+    """Arrêt propre : annule la création d'index en cours et ferme le pool."""
+    global client, _index_task
+    if _index_task is not None and not _index_task.done():
+        _index_task.cancel()
+        try:
+            await _index_task
+        except asyncio.CancelledError:
+            pass
+    _index_task = None
+    if client is not None:
+        client.close()
+        client = None
@@ -0,0 +1,92 @@
+import time
+
+from fastapi.responses import Response
+from pymongo import monitoring
+
+from utils.metrics import CONTENT_TYPE, DEFAULT_SIZE_BUCKETS, Registry
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "api_http_requests_total", "Requêtes HTTP traitées", ("method", "route", "status"),
+)
+http_duration = registry.histogram(
+    "api_http_request_duration_seconds", "Durée des requêtes HTTP, jusqu'au dernier octet envoyé", ("method", "route"),
+)
+http_response_size = registry.histogram(
+    "api_http_response_size_bytes", "Taille du corps des réponses HTTP", ("method", "route"), DEFAULT_SIZE_BUCKETS,
+)
+mongo_commands = registry.counter(
+    "api_mongo_commands_total", "Commandes Mongo exécutées", ("command", "outcome"),
+)
+mongo_duration = registry.histogram(
+    "api_mongo_command_duration_seconds", "Durée des commandes Mongo (mesurée par le driver)", ("command",),
+)
+
+
+def _route_label(scope) -> str:
+    # Le template de la route ("/items/{id}") et non le chemin, pour borner la cardinalité
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI : nombre, durée et taille des réponses par route.
+    Middleware ASGI pur (pas BaseHTTPMiddleware) : les réponses en streaming
+    (NDJSON, SSE) ne sont pas mises en mémoire.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            method = scope["method"]
+            route = _route_label(scope)
+            http_requests.inc(method, route, str(status_code))
+            http_duration.observe(time.perf_counter() - started, method, route)
+            http_response_size.observe(size, method, route)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """
+    Compte et chronomètre les commandes envoyées par le driver (find, aggregate,
+    update...). Appelé depuis les threads de Motor : les métriques sont thread-safe.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_commands.inc(event.command_name, "success")
+        mongo_duration.observe(event.duration_micros / 1_000_000, event.command_name)
+
+    def failed(self, event):
+        mongo_commands.inc(event.command_name, "failure")
+        mongo_duration.observe(event.duration_micros / 1_000_000, event.command_name)
+
+
+mongo_listener = MongoCommandListener()
+
+
+def metrics_response() -> Response:
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
@@ -1,70 +1,37 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from api.v1.boards import router as boards_router
 from api.v1.items import router as items_router
 from api.v1.schemas import router as schemas_router
+from api.v1.admin import router as admin_router
+from api.v1.ai import router as ai_router
 
-import motor.motor_asyncio
-from beanie import init_beanie
-import os
-from models.board import Board
-from models.item import Item
-from models.item_schema import ItemSchema
-
-app = FastAPI()
-
-from starlette.requests import Request
-from starlette.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from utils.metadata_validator import MetadataValidator
-from utils.item_schema_utils import generate_metadata_schema, deep_schema_diff
+from services.cache import check_cache_backend
+from services.events import start_change_stream_watcher, stop_change_stream_watcher
+from services.jobs import job_runner
+from core.compression import CompressionMiddleware
+from core.config import settings
+from core.database import close_db, init_db
+from core.instrumentation import MetricsMiddleware, metrics_response
 
-class MetadataValidationMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # Intercepter uniquement POST/PUT sur /items
-        if request.method in ("POST", "PUT") and request.url.path.startswith("/items"):
-            try:
-                body = await request.json()
-                # Validation simple
-                if "metadata" in body:
-                    body["metadata"] = MetadataValidator.validate(body["metadata"])
-                    # --- Versionnement du schéma de metadata ---
-                    item_type = body.get("type")
-                    metadata = body.get("metadata", {})
-                    if item_type and isinstance(metadata, dict):
-                        # Générer le schéma courant
-                        current_schema = generate_metadata_schema(metadata)
-                        # Chercher la dernière version du schéma pour ce type
-                        last_schema_doc = await ItemSchema.find(ItemSchema.item_type == item_type).sort("-version").first_or_none()
-                        if last_schema_doc is None:
-                            # Nouveau type : créer version 1
-                            new_schema = ItemSchema(
-                                item_type=item_type,
-                                version=1,
-                                schema=current_schema,
-                                author="IA",  # ou récupérer l'utilisateur si dispo
-                            )
-                            await new_schema.insert()
-                        else:
-                            # Comparer avec le dernier schéma
-                            if deep_schema_diff(current_schema, last_schema_doc.schema):
-                                new_version = last_schema_doc.version + 1
-                                new_schema = ItemSchema(
-                                    item_type=item_type,
-                                    version=new_version,
-                                    schema=current_schema,
-                                    author="IA",  # ou récupérer l'utilisateur si dispo
-                                )
-                                await new_schema.insert()
-                    # Remplacer le body de la requête
-                    request._body = JSONResponse(body).body
-            except Exception:
-                pass  # Si body non JSON ou autre, ne rien faire
-        response = await call_next(request)
-        return response
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Connexion MongoDB (client unique, voir core/database.py)
+    await init_db()
+    await start_change_stream_watcher()
+    check_cache_backend()
+    await job_runner.start()
+    try:
+        yield
+    finally:
+        await job_runner.stop()
+        await stop_change_stream_watcher()
+        await close_db()
 
-app.add_middleware(MetadataValidationMiddleware)
+app = FastAPI(lifespan=lifespan)
 
 # CORS configuration
 app.add_middleware(
@@ -75,21 +42,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.compression_enabled:
+    # Compression négociée (br / zstd / gzip) des réponses JSON non streamées
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_size)
+
+if settings.metrics_enabled:
+    # Ajouté en dernier : englobe les autres middlewares dans la mesure
+    app.add_middleware(MetricsMiddleware)
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
-@app.on_event("startup")
-async def app_init():
-    # Connexion MongoDB
-    mongo_uri = os.environ.get("MONGODB_URI", "mongodb://localhost:27017")
-    client = motor.motor_asyncio.AsyncIOMotorClient(mongo_uri)
-    db_name = os.environ.get("MONGODB_DB", "ai_board")
-    await init_beanie(
-        database=client[db_name],
-        document_models=[Board, Item, ItemSchema]
-    )
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Métriques au format texte Prometheus (routes HTTP et commandes Mongo)."""
+    return metrics_response()
 
 app.include_router(boards_router)
 app.include_router(items_router)
-app.include_router(schemas_router)
\ No newline at end of file
+app.include_router(schemas_router)
+app.include_router(admin_router)
+app.include_router(ai_router)
\ No newline at end of file
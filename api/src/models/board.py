@@ -10,6 +10,7 @@ class Board(Document):
     metadata: Optional[Dict[str, Any]] = Field(default_factory=dict)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    revision: int = 0  # incrémenté à chaque mise à jour (concurrence optimiste)
 
     class Settings:
         name = "boards"
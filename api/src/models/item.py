@@ -1,6 +1,7 @@
 from typing import Optional, Dict, Any, List
 from beanie import Document, Link
 from pydantic import Field
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
 from datetime import datetime, timezone
 
 class ChecklistItem(Document):
@@ -18,10 +19,29 @@ class Item(Document):
     metadata: Optional[Dict[str, Any]] = Field(default_factory=dict)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    revision: int = 0  # incrémenté à chaque mise à jour (concurrence optimiste)
+    # Signature MinHash du titre et de la description fonctionnelle, et ses clés LSH :
+    # détection des doublons (services/duplicates.py), jamais renvoyées par l'API
+    minhash: Optional[bytes] = Field(default=None, exclude=True)
+    lsh_buckets: Optional[List[int]] = Field(default=None, exclude=True)
 
     class Settings:
         name = "items"
         indexes = [
             "board_id",
-            "status"
+            "status",
+            # vues filtrées d'un board (statut) triées par date de modification
+            IndexModel(
+                [("board_id", ASCENDING), ("status", ASCENDING), ("updated_at", DESCENDING)],
+                name="board_status_updated",
+            ),
+            # candidats doublons d'un board : items partageant une clé LSH
+            IndexModel([("board_id", ASCENDING), ("lsh_buckets", ASCENDING)], name="board_lsh_buckets"),
+            # index texte pour la recherche plein texte (/items/search)
+            IndexModel(
+                [("title", TEXT), ("functional_description", TEXT), ("technical_description", TEXT)],
+                name="item_text_search",
+                weights={"title": 10, "functional_description": 3, "technical_description": 1},
+                default_language="none",
+            ),
         ]
\ No newline at end of file
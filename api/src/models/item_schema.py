@@ -1,6 +1,7 @@
 from typing import Optional, Dict, Any
 from beanie import Document
 from pydantic import Field
+from pymongo import IndexModel, ASCENDING
 from datetime import datetime, timezone
 
 class ItemSchema(Document):
@@ -9,9 +10,20 @@ class ItemSchema(Document):
     schema: Dict[str, Any] = Field(default_factory=dict)  # schéma JSON
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     author: Optional[str] = None  # "IA" ou nom utilisateur
+    schema_hash: Optional[str] = None  # hash du schéma (voir services/schema_service.py)
 
     class Settings:
         name = "item_schemas"
         indexes = [
-            [("item_type", 1), ("version", -1)]  # index composé pour recherche rapide
+            # index composé unique : une seule version N par type, même avec plusieurs writers
+            IndexModel(
+                [("item_type", ASCENDING), ("version", ASCENDING)],
+                name="item_type_version_unique",
+                unique=True,
+            ),
+            # recherche d'une version par hash de schéma (forme canonique)
+            IndexModel(
+                [("item_type", ASCENDING), ("schema_hash", ASCENDING)],
+                name="item_type_schema_hash",
+            ),
         ]
\ No newline at end of file
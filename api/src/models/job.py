@@ -0,0 +1,33 @@
+from typing import Optional, Dict, Any
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from datetime import datetime, timezone
+
+class Job(Document):
+    kind: str  # type de traitement (ex: "ai.process"), voir services/jobs.py
+    status: str = "queued"  # queued, running, done, failed, cancelled
+    priority: int = 0  # les jobs de plus haute priorité sont démarrés en premier
+    params: Dict[str, Any] = Field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    total: int = 0
+    processed: int = 0
+    attempts: int = 0  # nombre de démarrages (un job interrompu est relancé)
+    cancel_requested: bool = False
+    worker: Optional[str] = None  # processus qui exécute le job
+    heartbeat_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        name = "jobs"
+        indexes = [
+            # file d'attente : prochain job à démarrer (priorité puis ancienneté)
+            IndexModel(
+                [("status", ASCENDING), ("priority", DESCENDING), ("created_at", ASCENDING)],
+                name="status_priority_created",
+            ),
+            IndexModel([("kind", ASCENDING), ("created_at", DESCENDING)], name="kind_created"),
+        ]
@@ -0,0 +1,206 @@
+import asyncio
+import importlib
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from beanie import PydanticObjectId
+
+from core.config import settings
+from models.board import Board
+from models.item_schema import ItemSchema
+from models.job import Job
+from services.jobs import JobContext, job_runner
+
+logger = logging.getLogger("ai")
+
+PROCESS_JOB = "ai.process"
+
+
+class StubLLM:
+    """
+    LLM local, sans réseau : répond après une latence fixe par appel plus un coût par
+    prompt, comme une API qui traite un lot de prompts. Sert au développement et aux
+    mesures de débit (bench/jobs.py). La réponse est une proposition d'item en JSON,
+    déduite du texte de la demande.
+    """
+
+    def __init__(self, latency_ms: float = 200, per_prompt_ms: float = 5):
+        self.latency_ms = latency_ms
+        self.per_prompt_ms = per_prompt_ms
+        self.calls = 0
+
+    async def complete_batch(self, prompts: List[str]) -> List[str]:
+        self.calls += 1
+        await asyncio.sleep((self.latency_ms + self.per_prompt_ms * len(prompts)) / 1000)
+        return [json.dumps(self._answer(prompt)) for prompt in prompts]
+
+    @staticmethod
+    def _answer(prompt: str) -> Dict[str, Any]:
+        request = prompt.rsplit("Demande :", 1)[-1].strip()
+        words = re.findall(r"\w+", request)
+        lowered = {word.lower() for word in words}
+        item_type = "bug" if lowered & {"bug", "erreur", "error", "crash"} else "task"
+        return {
+            "title": " ".join(words[:8]).capitalize() or "Nouvel item",
+            "type": item_type,
+            "functional_description": request,
+            "metadata": {"source": "stub"},
+        }
+
+
+def create_llm_client():
+    """
+    Client LLM configuré par LLM_PROVIDER : "stub" (défaut, local) ou "module:fabrique".
+    Un client expose `async complete_batch(prompts) -> List[str]` (une réponse par prompt).
+    """
+    name = settings.llm_provider
+    if name == "stub":
+        return StubLLM(latency_ms=settings.llm_stub_latency_ms)
+    module_name, _, factory = name.partition(":")
+    return getattr(importlib.import_module(module_name), factory)()
+
+
+class LLMBatcher:
+    """
+    Regroupe les appels complete(prompt) concurrents (de plusieurs jobs) en lots d'au plus
+    max_batch_size prompts, envoyés dès que le lot est plein ou après max_wait_ms.
+    Au plus max_concurrent_batches lots sont en vol, pour respecter les quotas du fournisseur.
+    """
+
+    def __init__(self, client, max_batch_size: int, max_wait_ms: float, max_concurrent_batches: int):
+        self.client = client
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._semaphore = asyncio.Semaphore(max_concurrent_batches)
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # lots en vol : la boucle ne garde qu'une référence faible sur les tâches
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.prompts = 0
+
+    async def complete(self, prompt: str) -> str:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((prompt, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            # les appels annulés entre-temps (job annulé) ne sont pas envoyés
+            batch = [(prompt, future) for prompt, future in batch if not future.done()]
+            if batch:
+                task = asyncio.ensure_future(self._send(batch))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        async with self._semaphore:
+            self.batches += 1
+            self.prompts += len(batch)
+            try:
+                answers = await self.client.complete_batch([prompt for prompt, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+        for (_, future), answer in zip(batch, answers):
+            if not future.done():
+                future.set_result(answer)
+        if len(answers) < len(batch):
+            # un client qui renvoie moins de réponses que de prompts ne doit bloquer aucun appel
+            error = RuntimeError(f"LLM returned {len(answers)} answers for {len(batch)} prompts")
+            for _, future in batch[len(answers):]:
+                if not future.done():
+                    future.set_exception(error)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "client": type(self.client).__name__,
+            "batches": self.batches,
+            "prompts": self.prompts,
+            "mean_batch_size": round(self.prompts / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+llm_batcher = LLMBatcher(
+    create_llm_client(),
+    settings.llm_batch_size,
+    settings.llm_batch_wait_ms,
+    settings.llm_max_concurrent_batches,
+)
+
+
+def build_prompt(request: str, board: Optional[Board], item_types: List[str]) -> str:
+    lines = [
+        "Tu transformes une demande utilisateur en item de board.",
+        'Réponds en JSON : {"title", "type", "functional_description", "metadata"}.',
+    ]
+    if board is not None:
+        lines.append(f"Board : {board.name}" + (f" ({board.description})" if board.description else ""))
+    if item_types:
+        lines.append("Types d'item existants : " + ", ".join(item_types))
+    lines.append(f"Demande : {request}")
+    return "\n".join(lines)
+
+
+def parse_proposal(answer: str, request: str) -> Dict[str, Any]:
+    """Proposition d'item lue dans la réponse du LLM ; la réponse brute est gardée si elle n'est pas exploitable."""
+    try:
+        proposal = json.loads(answer)
+    except ValueError:
+        proposal = None
+    if not isinstance(proposal, dict) or not proposal.get("title"):
+        return {"title": request[:80], "type": "task", "metadata": {}, "raw": answer}
+    return {
+        "title": str(proposal["title"]),
+        "type": str(proposal.get("type") or "task"),
+        "functional_description": proposal.get("functional_description"),
+        "metadata": proposal.get("metadata") if isinstance(proposal.get("metadata"), dict) else {},
+    }
+
+
+async def process_requests(job: Job, ctx: JobContext) -> Dict[str, Any]:
+    """
+    Job "ai.process" : une proposition d'item par demande en langage naturel.
+    Les demandes sont envoyées au LLM en parallèle (regroupées en lots par llm_batcher).
+    Les propositions ne sont pas enregistrées : l'IA propose, l'utilisateur valide.
+    """
+    requests: List[str] = job.params.get("requests", [])
+    board_id = job.params.get("board_id")
+    board = await Board.get(PydanticObjectId(board_id)) if board_id else None
+    item_types = sorted(await ItemSchema.distinct("item_type"))
+    proposals: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+    processed = 0
+    await ctx.progress(0, len(requests))
+
+    async def propose(index: int, request: str) -> None:
+        nonlocal processed
+        answer = await llm_batcher.complete(build_prompt(request, board, item_types))
+        proposals[index] = dict(parse_proposal(answer, request), board_id=board_id)
+        processed += 1
+        await ctx.progress(processed)
+
+    tasks = [asyncio.ensure_future(propose(index, request)) for index, request in enumerate(requests)]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        # annulation ou échec : ne pas laisser les autres demandes tourner
+        for task in tasks:
+            task.cancel()
+        raise
+    return {"proposals": proposals}
+
+
+job_runner.register(PROCESS_JOB, process_requests)
@@ -0,0 +1,217 @@
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo.errors import ConfigurationError, OperationFailure
+
+from core.config import settings
+from models.board import Board
+from models.item import Item
+from models.job import Job
+from services.board_stats import invalidate_board_stats
+from services.cache import document_cache
+from services.events import publish_item_event
+from services.jobs import JobContext, job_runner, job_to_dict
+
+logger = logging.getLogger("board_ops")
+
+# Types des jobs de fond (services/jobs.py) des opérations sur de gros boards
+DELETE_CASCADE_JOB = "boards.delete_cascade"
+MOVE_ITEMS_JOB = "boards.move_items"
+BOARD_JOBS = (DELETE_CASCADE_JOB, MOVE_ITEMS_JOB)
+
+# Code Mongo renvoyé quand les transactions ne sont pas disponibles (serveur standalone)
+_ILLEGAL_OPERATION = 20
+
+# None : pas encore testé ; False : pas de replica set, les opérations tournent sans transaction
+_transactions_supported: Optional[bool] = None
+
+
+async def run_in_transaction(operation: Callable[[Any], Awaitable[Any]]) -> Any:
+    """
+    Exécute operation(session) dans une transaction Mongo.
+    Sans replica set (transactions indisponibles), operation(None) est exécutée
+    directement : chaque écriture reste atomique, mais pas l'ensemble.
+    """
+    global _transactions_supported
+    if _transactions_supported is not False:
+        client = Item.get_motor_collection().database.client
+        try:
+            async with await client.start_session() as session:
+                async with session.start_transaction():
+                    result = await operation(session)
+            _transactions_supported = True
+            return result
+        except OperationFailure as e:
+            if e.code != _ILLEGAL_OPERATION:
+                raise
+        except (ConfigurationError, NotImplementedError):
+            pass
+        _transactions_supported = False
+        logger.warning("Transactions Mongo indisponibles (pas de replica set) : opérations sans transaction")
+    return await operation(None)
+
+
+def _items_filter(board_id: str, item_ids: Optional[List[ObjectId]] = None, status: Optional[str] = None) -> Dict[str, Any]:
+    query: Dict[str, Any] = {"board_id": board_id}
+    if item_ids is not None:
+        query["_id"] = {"$in": item_ids}
+    if status is not None:
+        query["status"] = status
+    return query
+
+
+async def _find_ids(query: Dict[str, Any], limit: int = 0, session: Any = None) -> List[ObjectId]:
+    cursor = Item.get_motor_collection().find(query, {"_id": 1}, session=session)
+    if limit:
+        cursor = cursor.sort("_id", 1).limit(limit)
+    return [doc["_id"] for doc in await cursor.to_list(length=None)]
+
+
+def _publish_deleted(board_id: str, ids: List[ObjectId]) -> None:
+    for item_id in ids:
+        publish_item_event("deleted", board_id, item_id)
+
+
+def _publish_moved(source_id: str, target_id: str, ids: List[ObjectId]) -> None:
+    # Chaque board voit le changement de board_id : la source retire l'item, la cible l'ajoute
+    for item_id in ids:
+        publish_item_event("updated", source_id, item_id, changes={"board_id": target_id})
+        publish_item_event("updated", target_id, item_id, changes={"board_id": target_id})
+
+
+async def delete_board_cascade(board_id: str) -> Dict[str, Any]:
+    """
+    Supprime le board et tous ses items.
+
+    Jusqu'à BOARD_OPS_BACKGROUND_THRESHOLD items : un delete_many et la suppression du
+    board dans une même transaction. Au-delà : job DELETE_CASCADE_JOB supprimant les
+    items par lots (le board est supprimé en dernier), dont l'avancement est consultable.
+    """
+    query = _items_filter(board_id)
+    total = await Item.get_motor_collection().count_documents(query)
+    if total > settings.board_ops_background_threshold:
+        job = await job_runner.submit(DELETE_CASCADE_JOB, {"board_id": board_id}, total=total)
+        return {"job": job_to_dict(job)}
+
+    async def operation(session):
+        # Filtre sur board_id dans la transaction : les items ajoutés depuis le comptage sont aussi supprimés
+        ids = await _find_ids(query, session=session)
+        result = await Item.get_motor_collection().delete_many(query, session=session)
+        await Board.get_motor_collection().delete_one({"_id": ObjectId(board_id)}, session=session)
+        return result.deleted_count, ids
+
+    deleted, ids = await run_in_transaction(operation)
+    await document_cache.invalidate_items([str(item_id) for item_id in ids], [board_id])
+    await document_cache.invalidate_board(board_id)
+    _publish_deleted(board_id, ids)
+    invalidate_board_stats(board_id)
+    return {"deleted_items": deleted}
+
+
+async def delete_in_batches(job: Job, ctx: JobContext) -> Dict[str, Any]:
+    """
+    Job DELETE_CASCADE_JOB : supprime par lots les items de params.board_id, puis le board.
+    Repris après une interruption, il supprime les items restants.
+    """
+    board_id = job.params["board_id"]
+    collection = Item.get_motor_collection()
+    query = _items_filter(board_id)
+    deleted = 0
+    while True:
+        ids = await _find_ids(query, limit=settings.board_ops_batch_size)
+        if not ids:
+            break
+        # le filtre sur le board reste appliqué : un item déplacé entre-temps n'est pas supprimé
+        result = await collection.delete_many({**query, "_id": {"$in": ids}})
+        deleted += result.deleted_count
+        await document_cache.invalidate_items([str(item_id) for item_id in ids], [board_id])
+        _publish_deleted(board_id, ids)
+        invalidate_board_stats(board_id)
+        # avancement (et point d'annulation) entre deux lots
+        await ctx.progress(deleted)
+    await Board.get_motor_collection().delete_one({"_id": ObjectId(board_id)})
+    await document_cache.invalidate_board(board_id)
+    await ctx.progress(deleted, deleted)
+    return {"deleted_items": deleted}
+
+
+async def move_board_items(
+    source_id: str,
+    target_id: str,
+    item_ids: Optional[List[ObjectId]] = None,
+    status: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Déplace les items d'un board (tous, ou filtrés par ids / statut) vers un autre board.
+
+    Jusqu'à BOARD_OPS_BACKGROUND_THRESHOLD items : un seul update_many en transaction.
+    Au-delà : job MOVE_ITEMS_JOB déplaçant les items par lots.
+    """
+    query = _items_filter(source_id, item_ids, status)
+    total = await Item.get_motor_collection().count_documents(query)
+    if total > settings.board_ops_background_threshold:
+        params = {
+            "board_id": source_id,
+            "target_board_id": target_id,
+            "item_ids": [str(item_id) for item_id in item_ids] if item_ids is not None else None,
+            "status": status,
+        }
+        job = await job_runner.submit(MOVE_ITEMS_JOB, params, total=total)
+        return {"job": job_to_dict(job)}
+
+    async def operation(session):
+        # Filtre complet dans la transaction : un item déjà parti vers un autre board n'est pas ramené
+        ids = await _find_ids(query, session=session)
+        result = await Item.get_motor_collection().update_many(
+            query,
+            {"$set": {"board_id": target_id, "updated_at": datetime.now(timezone.utc)}, "$inc": {"revision": 1}},
+            session=session,
+        )
+        return result.modified_count, ids
+
+    moved, ids = await run_in_transaction(operation)
+    await document_cache.invalidate_items([str(item_id) for item_id in ids], [source_id, target_id])
+    _publish_moved(source_id, target_id, ids)
+    invalidate_board_stats(source_id)
+    invalidate_board_stats(target_id)
+    return {"moved_items": moved}
+
+
+async def move_in_batches(job: Job, ctx: JobContext) -> Dict[str, Any]:
+    """
+    Job MOVE_ITEMS_JOB : déplace par lots les items de params.board_id (tous, ou filtrés
+    par params.item_ids / params.status) vers params.target_board_id.
+    """
+    source_id, target_id = job.params["board_id"], job.params["target_board_id"]
+    item_ids = job.params.get("item_ids")
+    query = _items_filter(
+        source_id, [ObjectId(item_id) for item_id in item_ids] if item_ids is not None else None, job.params.get("status"),
+    )
+    collection = Item.get_motor_collection()
+    started = time.monotonic()
+    moved = 0
+    while True:
+        # les items déplacés ne correspondent plus au filtre (board_id a changé)
+        ids = await _find_ids(query, limit=settings.board_ops_batch_size)
+        if not ids:
+            break
+        result = await collection.update_many(
+            {**query, "_id": {"$in": ids}},
+            {"$set": {"board_id": target_id, "updated_at": datetime.now(timezone.utc)}, "$inc": {"revision": 1}},
+        )
+        moved += result.modified_count
+        await document_cache.invalidate_items([str(item_id) for item_id in ids], [source_id, target_id])
+        _publish_moved(source_id, target_id, ids)
+        invalidate_board_stats(source_id)
+        invalidate_board_stats(target_id)
+        await ctx.progress(moved)
+    await ctx.progress(moved, moved)
+    logger.info(f"Job {job.id}: {moved} items déplacés en {time.monotonic() - started:.1f}s")
+    return {"moved_items": moved}
+
+
+job_runner.register(DELETE_CASCADE_JOB, delete_in_batches)
+job_runner.register(MOVE_ITEMS_JOB, move_in_batches)
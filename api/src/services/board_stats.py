@@ -0,0 +1,99 @@
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from core.config import settings
+from models.item import Item
+from services.events import ANY_BOARD, ItemEvent, event_bus
+
+# Cache des statistiques par board : board_id -> (expiration, stats)
+_stats_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
+def _stats_pipeline(board_id: str) -> list:
+    checklist = {"$ifNull": ["$checklist", []]}
+    return [
+        {"$match": {"board_id": board_id}},
+        {"$facet": {
+            "by_status": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+            "by_type": [{"$group": {"_id": "$type", "count": {"$sum": 1}}}],
+            "checklist": [
+                {"$project": {
+                    "updated_at": 1,
+                    "total": {"$size": checklist},
+                    "done": {"$size": {"$filter": {
+                        "input": checklist,
+                        "as": "task",
+                        "cond": {"$eq": ["$$task.completed", True]},
+                    }}},
+                }},
+                {"$group": {
+                    "_id": None,
+                    "items": {"$sum": 1},
+                    "items_with_checklist": {"$sum": {"$cond": [{"$gt": ["$total", 0]}, 1, 0]}},
+                    "items_checklist_done": {"$sum": {"$cond": [
+                        {"$and": [{"$gt": ["$total", 0]}, {"$eq": ["$total", "$done"]}]}, 1, 0
+                    ]}},
+                    "tasks": {"$sum": "$total"},
+                    "completed_tasks": {"$sum": "$done"},
+                    "last_updated_at": {"$max": "$updated_at"},
+                }},
+            ],
+        }},
+    ]
+
+
+def _counts(groups: list) -> Dict[str, int]:
+    return {str(group["_id"]) if group["_id"] is not None else "none": group["count"] for group in groups}
+
+
+async def compute_board_stats(board_id: str) -> Dict[str, Any]:
+    """
+    Calcule les statistiques d'un board en une seule agrégation ($facet) sur items.
+    """
+    result = await Item.aggregate(_stats_pipeline(board_id)).to_list()
+    facets = result[0] if result else {"by_status": [], "by_type": [], "checklist": []}
+    checklist = facets["checklist"][0] if facets["checklist"] else {}
+    tasks = checklist.get("tasks", 0)
+    completed = checklist.get("completed_tasks", 0)
+    return {
+        "board_id": board_id,
+        "total_items": checklist.get("items", 0),
+        "by_status": _counts(facets["by_status"]),
+        "by_type": _counts(facets["by_type"]),
+        "checklist": {
+            "tasks": tasks,
+            "completed_tasks": completed,
+            "completion_ratio": round(completed / tasks, 4) if tasks else None,
+            "items_with_checklist": checklist.get("items_with_checklist", 0),
+            "items_checklist_done": checklist.get("items_checklist_done", 0),
+        },
+        "last_updated_at": checklist.get("last_updated_at"),
+    }
+
+
+async def get_board_stats(board_id: str) -> Dict[str, Any]:
+    """
+    Statistiques d'un board, servies depuis le cache tant qu'aucun item du board
+    n'a été modifié (et au plus STATS_CACHE_TTL secondes, pour les écritures
+    faites par d'autres processus).
+    """
+    cached = _stats_cache.get(board_id)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    stats = await compute_board_stats(board_id)
+    _stats_cache[board_id] = (time.monotonic() + settings.stats_cache_ttl, stats)
+    return stats
+
+
+def invalidate_board_stats(board_id: Optional[str] = None) -> None:
+    if board_id is None or board_id == ANY_BOARD:
+        _stats_cache.clear()
+    else:
+        _stats_cache.pop(board_id, None)
+
+
+def _on_item_event(event: ItemEvent) -> None:
+    invalidate_board_stats(event.board_id)
+
+
+event_bus.add_listener(_on_item_event)
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import orjson
+
+from core.config import settings
+from core.instrumentation import registry
+from services.events import ANY_BOARD, ItemEvent, event_bus
+
+logger = logging.getLogger("cache")
+
+cache_requests = registry.counter(
+    "api_cache_requests_total", "Lectures du cache de documents", ("namespace", "result"),
+)
+
+
+def pack_entry(headers: Dict[str, str], body: bytes) -> bytes:
+    """Valeur de cache d'une réponse : ses en-têtes (ETag, X-Next-After...) sur une ligne JSON, puis le corps."""
+    return orjson.dumps(headers) + b"\n" + body
+
+
+def unpack_entry(value: bytes) -> Tuple[Dict[str, str], bytes]:
+    head, body = value.split(b"\n", 1)
+    return orjson.loads(head), body
+
+
+class MemoryCache:
+    """
+    Backend en mémoire : LRU borné à max_entries, chaque entrée expirant après ttl secondes.
+    Propre à chaque processus : les routes n'invalident que le cache du processus qui
+    écrit. Avec plusieurs workers, seuls les change streams (voir _on_item_event)
+    invalident les caches des autres processus (voir check_cache_backend).
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        # Compteurs de génération : hors LRU, une éviction ne doit pas les remettre à zéro
+        self._counters: Dict[str, int] = {}
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        now = time.monotonic()
+        values = []
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                values.append(None)
+            else:
+                self._entries.move_to_end(key)
+                values.append(entry[1])
+        return values
+
+    async def set(self, key: str, value: bytes) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, keys: List[str]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def counters(self, keys: List[str]) -> List[int]:
+        return [self._counters.get(key, 0) for key in keys]
+
+    async def incr(self, key: str) -> None:
+        self._counters[key] = self._counters.get(key, 0) + 1
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class RedisCache:
+    """
+    Backend Redis partagé entre processus (redis.asyncio). Tout client exposant
+    mget/set/delete/incr (ex: fakeredis en local) peut être passé à la place.
+    """
+
+    def __init__(self, ttl: float, client=None, url: Optional[str] = None, prefix: str = "ai_board:"):
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self.ttl = ttl
+        self.client = client
+        self.prefix = prefix
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return await self.client.mget([self.prefix + key for key in keys])
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self.client.set(self.prefix + key, value, ex=max(1, int(self.ttl)))
+
+    async def delete(self, keys: List[str]) -> None:
+        if keys:
+            await self.client.delete(*[self.prefix + key for key in keys])
+
+    async def counters(self, keys: List[str]) -> List[int]:
+        return [int(value or 0) for value in await self.client.mget([self.prefix + key for key in keys])]
+
+    async def incr(self, key: str) -> None:
+        await self.client.incr(self.prefix + key)
+
+    async def clear(self) -> None:
+        # Invalide toutes les listes (les documents expirent avec le TTL)
+        await self.incr("gen:all")
+
+
+class DocumentCache:
+    """
+    Cache de lecture des boards, des items et des listes (GET /boards/, GET /items/by_board).
+
+    Les valeurs sont les corps JSON déjà sérialisés. Les documents sont indexés par
+    identifiant ; les listes d'items d'un board par requête, sous un numéro de génération
+    du board : l'incrémenter invalide toutes les requêtes de ce board d'un coup.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    def _count(self, namespace: str, hit: bool) -> None:
+        counters = self.hits if hit else self.misses
+        counters[namespace] = counters.get(namespace, 0) + 1
+        cache_requests.inc(namespace, "hit" if hit else "miss")
+
+    async def get(self, namespace: str, key: str) -> Optional[bytes]:
+        value = (await self.backend.get_many([f"{namespace}:{key}"]))[0]
+        self._count(namespace, value is not None)
+        return value
+
+    async def set(self, namespace: str, key: str, value: bytes) -> None:
+        await self.backend.set(f"{namespace}:{key}", value)
+
+    async def board_items_key(self, board_id: str, query: Iterable[Tuple[str, str]]) -> str:
+        """Clé d'une liste d'items d'un board : génération du board + paramètres triés."""
+        board_gen, all_gen = await self.backend.counters([f"gen:board:{board_id}", "gen:all"])
+        params = "&".join(f"{key}={value}" for key, value in sorted(query))
+        return f"{board_id}:{board_gen}.{all_gen}:{params}"
+
+    async def invalidate_items(self, item_ids: Iterable[str] = (), board_ids: Iterable[Optional[str]] = ()) -> None:
+        """À appeler après l'écriture d'items : documents et listes des boards concernés."""
+        await self.backend.delete([f"item:{item_id}" for item_id in item_ids])
+        for board_id in set(board_ids):
+            if board_id is None or board_id == ANY_BOARD:
+                await self.backend.incr("gen:all")
+            else:
+                await self.backend.incr(f"gen:board:{board_id}")
+
+    async def invalidate_board(self, board_id: str) -> None:
+        """À appeler après l'écriture ou la suppression d'un board."""
+        await self.backend.delete([f"board:{board_id}", "boards:list"])
+        await self.backend.incr(f"gen:board:{board_id}")
+
+    async def invalidate_boards_list(self) -> None:
+        await self.backend.delete(["boards:list"])
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            namespace: {"hits": self.hits.get(namespace, 0), "misses": self.misses.get(namespace, 0)}
+            for namespace in sorted(set(self.hits) | set(self.misses))
+        }
+
+
+class NullCache:
+    """Backend utilisé quand le cache est désactivé (CACHE_BACKEND=off)."""
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [None] * len(keys)
+
+    async def set(self, key: str, value: bytes) -> None:
+        pass
+
+    async def delete(self, keys: List[str]) -> None:
+        pass
+
+    async def counters(self, keys: List[str]) -> List[int]:
+        return [0] * len(keys)
+
+    async def incr(self, key: str) -> None:
+        pass
+
+    async def clear(self) -> None:
+        pass
+
+
+def _make_backend():
+    if settings.cache_backend == "off":
+        return NullCache()
+    if settings.cache_backend == "redis":
+        try:
+            return RedisCache(settings.cache_ttl, url=settings.redis_url)
+        except ImportError:
+            logger.warning("CACHE_BACKEND=redis mais le paquet redis n'est pas installé, utilisation du cache mémoire")
+    return MemoryCache(settings.cache_ttl, settings.cache_max_entries)
+
+
+document_cache = DocumentCache(_make_backend())
+
+
+def check_cache_backend() -> None:
+    """
+    À appeler au démarrage, une fois la source des événements connue. Avec plusieurs
+    workers (WEB_CONCURRENCY) et des événements publiés par les routes, un cache mémoire
+    servirait à un processus les données périmées écrites par un autre : il est désactivé.
+    """
+    if (
+        isinstance(document_cache.backend, MemoryCache)
+        and settings.web_concurrency > 1
+        and event_bus.source != "change_stream"
+    ):
+        logger.warning(
+            f"Cache mémoire désactivé : {settings.web_concurrency} workers sans change streams "
+            "ne s'invalident pas entre eux (CACHE_BACKEND=redis recommandé)"
+        )
+        document_cache.backend = NullCache()
+
+
+def _on_item_event(event: ItemEvent) -> None:
+    # En mode change streams, les écritures d'autres processus arrivent par ce canal ;
+    # en mode routes, les routes invalident déjà le cache avant de répondre.
+    if event_bus.source != "change_stream":
+        return
+    asyncio.ensure_future(document_cache.invalidate_items([event.item_id], [event.board_id]))
+
+
+event_bus.add_listener(_on_item_event)
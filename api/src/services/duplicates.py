@@ -0,0 +1,160 @@
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from core.config import settings
+from models.item import Item
+from models.job import Job
+from services.jobs import JobContext, job_runner
+from utils.minhash import MinHasher
+
+logger = logging.getLogger("duplicates")
+
+# Champs dont le texte forme la signature d'un item
+SIGNATURE_FIELDS = ("title", "functional_description")
+
+BACKFILL_JOB = "items.minhash_backfill"
+BACKFILL_BATCH_SIZE = 500
+
+minhasher = MinHasher(settings.minhash_permutations, settings.minhash_bands)
+
+
+def signature_text(doc: Dict[str, Any]) -> str:
+    return "\n".join(doc.get(field) or "" for field in SIGNATURE_FIELDS)
+
+
+def signature_fields(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Champs `minhash` et `lsh_buckets` d'un document (dict contenant les SIGNATURE_FIELDS)."""
+    minhash, buckets = minhasher.sketch(signature_text(doc))
+    return {"minhash": minhash, "lsh_buckets": buckets}
+
+
+def apply_signature(item: Item) -> None:
+    """Calcule la signature d'un item avant son insertion."""
+    fields = signature_fields({field: getattr(item, field) for field in SIGNATURE_FIELDS})
+    item.minhash = fields["minhash"]
+    item.lsh_buckets = fields["lsh_buckets"]
+
+
+async def signature_updates(set_fields_by_id: Dict[ObjectId, Dict[str, Any]]) -> Dict[ObjectId, Dict[str, Any]]:
+    """
+    Nouvelles signatures des items dont un `$set` modifie le titre ou la description, à
+    ajouter au même `$set` (une seule écriture, un seul événement). Les champs texte absents
+    du `$set` sont relus en une requête pour tous les items concernés.
+    """
+    changed = {
+        item_id: set_fields for item_id, set_fields in set_fields_by_id.items()
+        if any(field in set_fields for field in SIGNATURE_FIELDS)
+    }
+    incomplete = [
+        item_id for item_id, set_fields in changed.items()
+        if not all(field in set_fields for field in SIGNATURE_FIELDS)
+    ]
+    current: Dict[ObjectId, Dict[str, Any]] = {}
+    if incomplete:
+        cursor = Item.get_motor_collection().find(
+            {"_id": {"$in": incomplete}}, {field: 1 for field in SIGNATURE_FIELDS},
+        )
+        current = {doc["_id"]: doc async for doc in cursor}
+    updates = {}
+    for item_id, set_fields in changed.items():
+        doc = dict(current.get(item_id, {}))
+        doc.update({field: set_fields[field] for field in SIGNATURE_FIELDS if field in set_fields})
+        updates[item_id] = signature_fields(doc)
+    return updates
+
+
+async def find_duplicates(
+    board_id: Optional[str],
+    minhash: Optional[bytes],
+    buckets: Iterable[int],
+    exclude_id: Optional[ObjectId] = None,
+    threshold: Optional[float] = None,
+    limit: int = 5,
+) -> List[Dict[str, Any]]:
+    """
+    Items du même board dont la similarité estimée (Jaccard des fragments du titre et de
+    la description) atteint `threshold`, les plus proches d'abord.
+
+    Seuls les items partageant une clé LSH sont lus (index board_lsh_buckets), au plus
+    DUPLICATE_MAX_CANDIDATES : le coût ne dépend pas de la taille du board.
+    """
+    buckets = list(buckets)
+    if minhash is None or not buckets:
+        return []
+    threshold = settings.duplicate_threshold if threshold is None else threshold
+    query: Dict[str, Any] = {"board_id": board_id, "lsh_buckets": {"$in": buckets}}
+    if exclude_id is not None:
+        query["_id"] = {"$ne": exclude_id}
+    cursor = Item.get_motor_collection().find(query, {"title": 1, "type": 1, "status": 1, "minhash": 1})
+    candidates = await cursor.limit(settings.duplicate_max_candidates).to_list(length=None)
+    if not candidates:
+        return []
+    signature = np.frombuffer(minhash, dtype=np.uint32)
+    scores = minhasher.similarities(signature, [doc.get("minhash") for doc in candidates])
+    ranked = sorted(
+        (index for index in range(len(candidates)) if scores[index] >= threshold),
+        key=lambda index: -scores[index],
+    )[:limit]
+    return [
+        {
+            "_id": str(candidates[index]["_id"]),
+            "title": candidates[index].get("title"),
+            "type": candidates[index].get("type"),
+            "status": candidates[index].get("status"),
+            "similarity": round(float(scores[index]), 3),
+        }
+        for index in ranked
+    ]
+
+
+def merge_patch(existing: Item, incoming: Item) -> Dict[str, Any]:
+    """
+    Patch qui complète un item existant avec un doublon sans rien écraser : descriptions
+    vides renseignées, clés de metadata et tâches de checklist absentes ajoutées.
+    """
+    patch: Dict[str, Any] = {}
+    for field in ("functional_description", "technical_description"):
+        if not getattr(existing, field) and getattr(incoming, field):
+            patch[field] = getattr(incoming, field)
+    metadata = {key: value for key, value in (incoming.metadata or {}).items() if key not in (existing.metadata or {})}
+    if metadata:
+        patch["metadata"] = metadata
+    tasks = {entry.get("task") for entry in existing.checklist or []}
+    added = [entry for entry in incoming.checklist or [] if entry.get("task") not in tasks]
+    if added:
+        patch["checklist"] = list(existing.checklist or []) + added
+    return patch
+
+
+async def backfill_signatures(job: Job, ctx: JobContext) -> Dict[str, Any]:
+    """
+    Job "items.minhash_backfill" : calcule la signature des items qui n'en ont pas
+    (items antérieurs à la détection des doublons), ou de tous avec params.rebuild
+    (après un changement de MINHASH_PERMUTATIONS ou MINHASH_BANDS).
+    """
+    collection = Item.get_motor_collection()
+    query = {} if job.params.get("rebuild") else {"minhash": {"$exists": False}}
+    total = await collection.count_documents(query)
+    await ctx.progress(0, total)
+    processed = 0
+    operations = []
+    async for doc in collection.find(query, {field: 1 for field in SIGNATURE_FIELDS}):
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": signature_fields(doc)}))
+        if len(operations) == BACKFILL_BATCH_SIZE:
+            await collection.bulk_write(operations, ordered=False)
+            processed += len(operations)
+            operations = []
+            await ctx.progress(processed)
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+        processed += len(operations)
+    await ctx.progress(processed)
+    logger.info(f"Signatures MinHash calculées pour {processed} item(s)")
+    return {"items": processed}
+
+
+job_runner.register(BACKFILL_JOB, backfill_signatures)
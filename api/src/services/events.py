@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict, defaultdict, deque
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from fastapi.encoders import jsonable_encoder
+from pymongo.errors import PyMongoError
+
+from core.config import settings
+from models.item import Item
+
+logger = logging.getLogger("events")
+
+# Identifiant de ce processus : les identifiants d'événements ("<epoch>-<seq>")
+# ne sont valables que pour le processus qui les a émis.
+EPOCH = uuid.uuid4().hex[:8]
+
+# Canal des événements dont le board est inconnu (ex: suppression vue par un change stream)
+ANY_BOARD = "*"
+
+
+class ItemEvent:
+    """
+    Changement d'un item : op vaut "created", "updated" ou "deleted".
+    `item` contient l'état complet après modification quand il est connu,
+    `changes` les champs modifiés ($set) quand seul le delta est connu.
+
+    L'item peut être passé sous forme de modèle : il n'est sérialisé (jsonable_encoder)
+    qu'au premier accès à `item`.
+    """
+
+    __slots__ = ("seq", "board_id", "op", "item_id", "_item", "_encoded", "changes", "ts")
+
+    def __init__(self, seq: int, board_id: str, op: str, item_id: str,
+                 item: Any = None, changes: Optional[Dict[str, Any]] = None):
+        self.seq = seq
+        self.board_id = board_id
+        self.op = op
+        self.item_id = item_id
+        self._item = item
+        self._encoded = item is None or isinstance(item, dict)
+        self.changes = changes
+        self.ts = time.time()
+
+    @property
+    def item(self) -> Optional[Dict[str, Any]]:
+        if not self._encoded:
+            self._item = jsonable_encoder(self._item, by_alias=True)
+            self._encoded = True
+        return self._item
+
+    @property
+    def event_id(self) -> str:
+        return f"{EPOCH}-{self.seq}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"id": self.event_id, "op": self.op, "board_id": self.board_id, "item_id": self.item_id, "ts": self.ts}
+        if self.item is not None:
+            data["item"] = self.item
+        if self.changes is not None:
+            data["changes"] = self.changes
+        return data
+
+
+class _BoardHistory(deque):
+    """Derniers événements d'un board ; les événements antérieurs à `floor` n'ont pas été gardés."""
+
+    def __init__(self, maxlen: int, floor: int):
+        super().__init__(maxlen=maxlen)
+        self.floor = floor
+
+
+class EventBus:
+    """
+    Pub/sub en mémoire des changements d'items, par board.
+
+    Les boards suivis par un client SSE gardent un historique borné des derniers
+    événements pour permettre la reprise (Last-Event-ID) après une déconnexion ;
+    au-delà de `history_boards` boards, l'historique du board suivi le moins
+    récemment et sans client connecté est oublié. Des listeners synchrones
+    peuvent aussi s'abonner à tous les événements (invalidation de caches...).
+    """
+
+    def __init__(self, history_size: int, history_boards: int):
+        self.history_size = history_size
+        self.history_boards = history_boards
+        # "routes" : publié par les routes ; "change_stream" : publié par le watcher Mongo
+        self.source = "routes"
+        self._seq = 0
+        self._history: "OrderedDict[str, _BoardHistory]" = OrderedDict()
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self._listeners: List[Callable[[ItemEvent], None]] = []
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def add_listener(self, listener: Callable[[ItemEvent], None]) -> None:
+        self._listeners.append(listener)
+
+    def _track_history(self, board_id: str) -> None:
+        """Garde l'historique du board (le crée si besoin) et oublie les boards en trop."""
+        if self.history_size <= 0:
+            return
+        if board_id in self._history:
+            self._history.move_to_end(board_id)
+            return
+        self._history[board_id] = _BoardHistory(self.history_size, self._seq + 1)
+        idle = [other for other in self._history if other not in self._subscribers]
+        for other in idle[:max(0, len(self._history) - self.history_boards)]:
+            del self._history[other]
+
+    def publish(self, board_id: Optional[str], op: str, item_id: Any,
+                item: Any = None, changes: Optional[Dict[str, Any]] = None) -> ItemEvent:
+        self._seq += 1
+        event = ItemEvent(self._seq, board_id or ANY_BOARD, op, str(item_id), item, changes)
+        if event.board_id == ANY_BOARD:
+            histories = list(self._history.values())
+            targets = set().union(*self._subscribers.values())
+        else:
+            history = self._history.get(event.board_id)
+            histories = [history] if history is not None else []
+            targets = self._subscribers.get(event.board_id, set())
+            if history is not None:
+                self._history.move_to_end(event.board_id)
+        if histories or targets:
+            # gardé ou envoyé plus tard : sérialisé maintenant, l'item pouvant encore changer
+            event.item
+        for history in histories:
+            history.append(event)
+        for queue in list(targets):
+            queue.put_nowait(event)
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Listener d'événements en erreur: {e}")
+        return event
+
+    def events_since(self, board_id: str, last_event_id: str) -> Optional[List[ItemEvent]]:
+        """
+        Événements du board postérieurs à last_event_id, ou None si la reprise est
+        impossible (autre processus, ou historique dépassé) : le client doit alors
+        tout recharger.
+        """
+        try:
+            epoch, seq_str = last_event_id.rsplit("-", 1)
+            seq = int(seq_str)
+        except ValueError:
+            return None
+        if epoch != EPOCH:
+            return None
+        history = self._history.get(board_id)
+        if history is None:
+            return [] if seq == self._seq else None
+        if seq + 1 < history.floor:
+            return None  # historique (re)créé après cet événement
+        if history and history[0].seq > seq + 1 and len(history) == history.maxlen:
+            return None  # des événements ont été perdus
+        return [event for event in history if event.seq > seq]
+
+    def subscribe(self, board_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers[board_id].add(queue)
+        self._track_history(board_id)
+        return queue
+
+    def unsubscribe(self, board_id: str, queue: asyncio.Queue) -> None:
+        self._subscribers[board_id].discard(queue)
+        if not self._subscribers[board_id]:
+            del self._subscribers[board_id]
+
+
+event_bus = EventBus(settings.events_history_size, settings.events_history_boards)
+
+
+def publish_item_event(op: str, board_id: Optional[str], item_id: Any,
+                       item: Any = None, changes: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Publie un changement d'item depuis une route d'écriture.
+    Sans effet quand les événements proviennent des change streams Mongo.
+    """
+    if event_bus.source != "routes":
+        return
+    event_bus.publish(board_id, op, item_id, item, jsonable_encoder(changes) if changes else None)
+
+
+_OPERATION_TYPES = {"insert": "created", "replace": "updated", "update": "updated", "delete": "deleted"}
+
+_watcher_task: Optional[asyncio.Task] = None
+
+
+def _publish_change(change: Dict[str, Any]) -> None:
+    op = _OPERATION_TYPES.get(change.get("operationType"))
+    if op is None:
+        return
+    item_id = change["documentKey"]["_id"]
+    # Pour une suppression, le board n'est connu que si les pre-images sont activées
+    document = change.get("fullDocument") or change.get("fullDocumentBeforeChange") or {}
+    item = None
+    if op != "deleted" and change.get("fullDocument"):
+        item = Item.model_validate(change["fullDocument"])
+    event_bus.publish(document.get("board_id"), op, item_id, item)
+    # Changement de board (pre-images activées) : l'ancien board voit aussi l'item partir
+    before = change.get("fullDocumentBeforeChange") or {}
+    if op == "updated" and before and before.get("board_id") != document.get("board_id"):
+        event_bus.publish(before.get("board_id"), op, item_id, None, {"board_id": document.get("board_id")})
+
+
+async def _watch_items(stream) -> None:
+    async with stream:
+        async for change in stream:
+            _publish_change(change)
+
+
+async def start_change_stream_watcher() -> None:
+    """
+    Alimente le bus depuis les change streams Mongo si la base les supporte
+    (replica set). Sinon, les routes publient elles-mêmes les événements.
+    """
+    global _watcher_task
+    if settings.events_source == "routes":
+        return
+    try:
+        stream = Item.get_motor_collection().watch(
+            full_document="updateLookup",
+            full_document_before_change="whenAvailable",
+        )
+        # Ouvre le curseur maintenant pour détecter une base sans change streams (standalone)
+        first_change = await stream.try_next()
+    except (PyMongoError, NotImplementedError) as e:
+        if settings.events_source == "change_stream":
+            raise
+        logger.info(f"Change streams indisponibles ({e}), événements publiés par les routes")
+        return
+    event_bus.source = "change_stream"
+    if first_change is not None:
+        _publish_change(first_change)
+    _watcher_task = asyncio.create_task(_watch_items(stream))
+    logger.info("Événements items alimentés par les change streams Mongo")
+
+
+async def stop_change_stream_watcher() -> None:
+    global _watcher_task
+    if _watcher_task is not None:
+        _watcher_task.cancel()
+        _watcher_task = None
+    event_bus.source = "routes"
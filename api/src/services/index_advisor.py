@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Set
+
+from pymongo import ASCENDING, IndexModel
+
+from core.config import settings
+from models.item import Item
+from models.item_schema import ItemSchema
+from utils.item_schema_utils import schema_field_types
+
+logger = logging.getLogger("index_advisor")
+
+# Nombre de requêtes par clé metadata filtrée (process-local)
+_filter_counts: Counter = Counter()
+# Clés pour lesquelles un index a été créé ou est en cours de création
+_indexed_keys: Set[str] = set()
+# Clés déjà évaluées (seuil atteint), pour ne pas relancer l'analyse à chaque requête
+_evaluated_keys: Set[str] = set()
+# Évaluations en cours (référencées jusqu'à la fin pour ne pas être collectées)
+_tasks: Set[asyncio.Task] = set()
+
+_SAFE_KEY = re.compile(r"^[A-Za-z0-9_\-]+$")
+
+
+def metadata_index_name(key: str) -> str:
+    return f"board_metadata_{key}"
+
+
+def metadata_index_model(key: str) -> IndexModel:
+    """
+    Index partiel (board_id, metadata.<key>) : seuls les items ayant la clé sont indexés.
+    """
+    path = f"metadata.{key}"
+    return IndexModel(
+        [("board_id", ASCENDING), (path, ASCENDING)],
+        name=metadata_index_name(key),
+        partialFilterExpression={path: {"$exists": True}},
+    )
+
+
+def wildcard_index_model() -> IndexModel:
+    return IndexModel([("metadata.$**", ASCENDING)], name="metadata_wildcard")
+
+
+async def known_metadata_types(key: str) -> List[str]:
+    """
+    Types connus d'une clé metadata d'après le registre ItemSchema (toutes versions) :
+    les membres d'une union comptent chacun, une liste porte le type de ses éléments.
+    Sans type scalaire (objet, liste d'objets ou vide), le type du descripteur est
+    repris. Liste vide si la clé n'apparaît dans aucun schéma.
+    """
+    schemas = await ItemSchema.find({f"schema.{key}": {"$exists": True}}).to_list()
+    types: Set[str] = set()
+    for schema in schemas:
+        descriptor = schema.schema.get(key)
+        if not isinstance(descriptor, dict):
+            continue
+        types |= schema_field_types({key: descriptor})[key] or {
+            str(member.get("type")) for member in descriptor.get("anyOf", [descriptor])
+        }
+    return sorted(types)
+
+
+async def create_metadata_index(key: str) -> str:
+    """
+    Crée l'index partiel pour une clé metadata et retourne son nom.
+    """
+    if not _SAFE_KEY.match(key):
+        raise ValueError(f"Invalid metadata key for an index: {key}")
+    _indexed_keys.add(key)
+    try:
+        names = await Item.get_motor_collection().create_indexes([metadata_index_model(key)])
+    except Exception:
+        _indexed_keys.discard(key)
+        raise
+    logger.info(f"Index {names[0]} créé pour metadata.{key}")
+    return names[0]
+
+
+async def _evaluate_key(key: str) -> None:
+    types = await known_metadata_types(key)
+    if not types:
+        # Clé inconnue du registre : pas d'index sur une clé qui n'existe dans aucun item
+        return
+    if settings.index_advisor_auto_create and key not in _indexed_keys:
+        try:
+            await create_metadata_index(key)
+        except Exception as e:
+            logger.error(f"Création de l'index pour metadata.{key} impossible: {e}")
+
+
+def record_metadata_filters(keys: Iterable[str]) -> None:
+    """
+    Enregistre l'utilisation de filtres metadata.<key> (appelé par les routes de liste).
+    Quand une clé atteint le seuil, elle est évaluée en tâche de fond.
+    """
+    for key in keys:
+        _filter_counts[key] += 1
+        if (
+            _filter_counts[key] >= settings.index_advisor_threshold
+            and key not in _evaluated_keys
+            and _SAFE_KEY.match(key)
+        ):
+            _evaluated_keys.add(key)
+            task = asyncio.create_task(_evaluate_key(key))
+            _tasks.add(task)
+            task.add_done_callback(_tasks.discard)
+
+
+async def existing_index_names() -> Set[str]:
+    info = await Item.get_motor_collection().index_information()
+    return set(info.keys())
+
+
+async def get_index_advice() -> Dict[str, Any]:
+    """
+    Suggestions d'index pour les clés metadata filtrées fréquemment.
+    """
+    existing = await existing_index_names()
+    suggestions = []
+    for key, count in _filter_counts.most_common():
+        if count < settings.index_advisor_threshold:
+            break
+        name = metadata_index_name(key)
+        suggestions.append({
+            "key": f"metadata.{key}",
+            "filter_count": count,
+            "known_types": await known_metadata_types(key),
+            "index": {"name": name, "keys": {"board_id": 1, f"metadata.{key}": 1}, "partial": True},
+            "exists": name in existing,
+        })
+    advice: Dict[str, Any] = {
+        "threshold": settings.index_advisor_threshold,
+        "auto_create": settings.index_advisor_auto_create,
+        "filter_counts": dict(_filter_counts),
+        "suggestions": suggestions,
+    }
+    if len(suggestions) > settings.index_advisor_wildcard_keys:
+        advice["wildcard"] = {
+            "name": "metadata_wildcard",
+            "keys": {"metadata.$**": 1},
+            "exists": "metadata_wildcard" in existing,
+            "reason": "Beaucoup de clés metadata différentes sont filtrées : un index wildcard évite un index par clé.",
+        }
+    return advice
@@ -0,0 +1,286 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from core.config import settings
+from models.job import Job
+
+logger = logging.getLogger("jobs")
+
+# Identifiant de ce processus dans la collection jobs (champ worker)
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+FINAL_STATUSES = ("done", "failed", "cancelled")
+
+# Intervalle minimal entre deux écritures de l'avancement d'un job
+PROGRESS_WRITE_INTERVAL = 0.5
+
+
+class JobCancelled(Exception):
+    """Levée dans un handler quand l'annulation du job a été demandée."""
+
+
+class JobContext:
+    """
+    Passé au handler d'un job : publication de l'avancement (qui sert aussi de
+    heartbeat) et détection d'une annulation demandée depuis un autre processus.
+    """
+
+    def __init__(self, job: Job):
+        self.job = job
+        self._last_write = 0.0
+
+    async def progress(self, processed: int, total: Optional[int] = None) -> None:
+        self.job.processed = processed
+        if total is not None:
+            self.job.total = total
+        now = time.monotonic()
+        final = self.job.total and processed >= self.job.total
+        if not final and now - self._last_write < PROGRESS_WRITE_INTERVAL:
+            return
+        self._last_write = now
+        doc = await Job.get_motor_collection().find_one_and_update(
+            {"_id": self.job.id, "worker": WORKER_ID},
+            {"$set": {"processed": processed, "total": self.job.total, "heartbeat_at": datetime.now(timezone.utc)}},
+            projection={"cancel_requested": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is None or doc.get("cancel_requested"):
+            # annulé, ou repris par un autre processus après une perte de heartbeat
+            raise JobCancelled()
+
+
+JobHandler = Callable[[Job, JobContext], Awaitable[Optional[Dict[str, Any]]]]
+
+
+def job_to_dict(job: Job) -> Dict[str, Any]:
+    data = job.model_dump(mode="json", by_alias=True, exclude={"revision_id"})
+    data["progress"] = round(job.processed / job.total, 4) if job.total else (1.0 if job.status == "done" else 0.0)
+    return data
+
+
+class JobRunner:
+    """
+    Exécution asynchrone de jobs persistés dans la collection `jobs`.
+
+    La collection est la file d'attente : chaque processus réserve le prochain job
+    (priorité décroissante puis ancienneté) par un find_one_and_update atomique, dans
+    la limite de `concurrency` jobs simultanés. Les jobs d'un processus arrêté (plus de
+    heartbeat depuis `stale_after` secondes) sont remis en file, au plus `max_attempts` fois.
+    """
+
+    def __init__(self, concurrency: int, poll_interval: float, stale_after: float, max_attempts: int):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.max_attempts = max_attempts
+        self.handlers: Dict[str, JobHandler] = {}
+        self.counters: Dict[str, int] = {"started": 0, "done": 0, "failed": 0, "cancelled": 0, "requeued": 0}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._slot_freed: Optional[asyncio.Event] = None
+        self._loops: List[asyncio.Task] = []
+        self._stopping = False
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self.handlers[kind] = handler
+
+    @property
+    def running(self) -> bool:
+        return bool(self._loops)
+
+    async def submit(self, kind: str, params: Dict[str, Any], priority: int = 0, total: int = 0) -> Job:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = Job(kind=kind, params=params, priority=priority, total=total)
+        await job.insert()
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def cancel(self, job_id: ObjectId) -> Optional[Job]:
+        """
+        Annule un job : immédiatement s'il est en file, sinon en le signalant au
+        processus qui l'exécute. Sans effet sur un job terminé.
+        """
+        collection = Job.get_motor_collection()
+        now = datetime.now(timezone.utc)
+        doc = await collection.find_one_and_update(
+            {"_id": job_id, "status": "queued"},
+            {"$set": {"status": "cancelled", "cancel_requested": True, "finished_at": now}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is not None:
+            self.counters["cancelled"] += 1
+        else:
+            doc = await collection.find_one_and_update(
+                {"_id": job_id, "status": "running"},
+                {"$set": {"cancel_requested": True}},
+                return_document=ReturnDocument.AFTER,
+            )
+            task = self._tasks.get(str(job_id))
+            if doc is not None and task is not None:
+                task.cancel()
+        if doc is None:
+            doc = await collection.find_one({"_id": job_id})
+        return Job.model_validate(doc) if doc is not None else None
+
+    async def _claim(self) -> Optional[Job]:
+        now = datetime.now(timezone.utc)
+        doc = await Job.get_motor_collection().find_one_and_update(
+            {"status": "queued"},
+            {
+                "$set": {"status": "running", "worker": WORKER_ID, "started_at": now, "heartbeat_at": now},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("priority", -1), ("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        return Job.model_validate(doc) if doc is not None else None
+
+    async def _finish(self, job: Job, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        update: Dict[str, Any] = {
+            "status": status,
+            "finished_at": datetime.now(timezone.utc),
+            "processed": job.processed,
+            "total": job.total,
+        }
+        if result is not None:
+            update["result"] = result
+        if error is not None:
+            update["error"] = error
+        await Job.get_motor_collection().update_one({"_id": job.id, "worker": WORKER_ID}, {"$set": update})
+        self.counters[status] += 1
+
+    async def _requeue(self, job: Job) -> None:
+        await Job.get_motor_collection().update_one(
+            {"_id": job.id, "worker": WORKER_ID, "status": "running"},
+            {"$set": {"status": "queued", "worker": None}},
+        )
+        self.counters["requeued"] += 1
+
+    async def _run(self, job: Job) -> None:
+        job_id = str(job.id)
+        self.counters["started"] += 1
+        handler = self.handlers.get(job.kind)
+        try:
+            if handler is None:
+                await self._finish(job, "failed", error=f"Unknown job kind: {job.kind}")
+                return
+            result = await handler(job, JobContext(job))
+            await self._finish(job, "done", result=result or {})
+        except (JobCancelled, asyncio.CancelledError):
+            if self._stopping:
+                # arrêt du processus : un autre worker reprendra le job
+                await self._requeue(job)
+            else:
+                await self._finish(job, "cancelled")
+        except Exception as e:
+            logger.exception(f"Job {job.kind} {job_id} en échec")
+            await self._finish(job, "failed", error=str(e))
+        finally:
+            self._tasks.pop(job_id, None)
+            self._slot_freed.set()
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            if len(self._tasks) >= self.concurrency:
+                self._slot_freed.clear()
+                await self._slot_freed.wait()
+                continue
+            try:
+                job = await self._claim()
+            except Exception as e:
+                logger.error(f"Réservation d'un job impossible: {e}")
+                job = None
+                await asyncio.sleep(self.poll_interval)
+            if job is None:
+                # les jobs soumis par ce processus réveillent la boucle ; ceux des autres
+                # processus sont vus au plus tard après poll_interval
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._tasks[str(job.id)] = asyncio.create_task(self._run(job))
+
+    async def _heartbeat_loop(self) -> None:
+        collection = Job.get_motor_collection()
+        while True:
+            await asyncio.sleep(max(1.0, self.stale_after / 3))
+            now = datetime.now(timezone.utc)
+            try:
+                if self._tasks:
+                    await collection.update_many(
+                        {"_id": {"$in": [ObjectId(job_id) for job_id in self._tasks]}, "worker": WORKER_ID},
+                        {"$set": {"heartbeat_at": now}},
+                    )
+                stale = {"status": "running", "heartbeat_at": {"$lt": now - timedelta(seconds=self.stale_after)}}
+                requeued = await collection.update_many(
+                    {**stale, "attempts": {"$lt": self.max_attempts}},
+                    {"$set": {"status": "queued", "worker": None}},
+                )
+                await collection.update_many(
+                    stale,
+                    {"$set": {"status": "failed", "error": "worker lost", "finished_at": now}},
+                )
+                if requeued.modified_count:
+                    logger.warning(f"{requeued.modified_count} job(s) d'un worker arrêté remis en file")
+                    self._wakeup.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Heartbeat des jobs impossible: {e}")
+
+    async def start(self) -> None:
+        if self._loops:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._slot_freed = asyncio.Event()
+        self._loops = [
+            asyncio.create_task(self._dispatch_loop()),
+            asyncio.create_task(self._heartbeat_loop()),
+        ]
+        logger.info(f"Runner de jobs démarré ({WORKER_ID}, {self.concurrency} jobs simultanés)")
+
+    async def stop(self) -> None:
+        """Arrête la réservation de jobs ; les jobs en cours sont interrompus et remis en file."""
+        self._stopping = True
+        for task in self._loops:
+            task.cancel()
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*self._loops, *tasks, return_exceptions=True)
+        self._loops = []
+
+    async def stats(self) -> Dict[str, Any]:
+        counts = await Job.get_motor_collection().aggregate([
+            {"$match": {"status": {"$in": ["queued", "running"]}}},
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+        ]).to_list(length=None)
+        return {
+            "worker": WORKER_ID,
+            "concurrency": self.concurrency,
+            "running_here": len(self._tasks),
+            "queue": {doc["_id"]: doc["count"] for doc in counts},
+            "counters": dict(self.counters),
+        }
+
+
+job_runner = JobRunner(
+    settings.jobs_concurrency,
+    settings.jobs_poll_interval,
+    settings.jobs_stale_after,
+    settings.jobs_max_attempts,
+)
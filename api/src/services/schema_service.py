@@ -0,0 +1,279 @@
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+from beanie.odm.utils.dump import get_dict
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from core.config import settings
+from models.item_schema import ItemSchema
+from utils.item_schema_utils import generate_metadata_schema, merge_metadata_schemas, schema_field_types, schema_structural_diff
+from utils.metadata_validator import MetadataValidationError, MetadataValidator
+
+logger = logging.getLogger("schemas")
+
+# Cache process-local du dernier schéma connu par type d'item :
+# item_type -> (ItemSchema, hash du schéma)
+_latest_schemas: Dict[str, Tuple[ItemSchema, str]] = {}
+
+# Registre des types de metadata (toutes versions, tous types d'item) :
+# (instant de chargement, chemin pointé -> types). Rechargé après METADATA_TYPES_TTL secondes
+# pour voir les versions créées par les autres processus.
+_metadata_types: Optional[Tuple[float, Dict[str, Set[str]]]] = None
+METADATA_TYPES_TTL = 60
+
+# Nombre maximal de tentatives d'allocation d'une version en cas de concurrence
+MAX_VERSION_ALLOCATION_ATTEMPTS = 10
+
+
+def compute_schema_hash(schema: Dict[str, Any]) -> str:
+    """
+    Calcule un hash stable d'un schéma de metadata à partir de sa forme canonique
+    (clés triées à tous les niveaux, unions "anyOf" déjà triées à la génération).
+    """
+    payload = json.dumps(schema, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def invalidate_schema_cache(item_type: Optional[str] = None) -> None:
+    """
+    Invalide le cache pour un type d'item, ou entièrement si item_type est None.
+    """
+    if item_type is None:
+        _latest_schemas.clear()
+    else:
+        _latest_schemas.pop(item_type, None)
+    invalidate_metadata_types()
+
+
+def invalidate_metadata_types() -> None:
+    global _metadata_types
+    _metadata_types = None
+
+
+def _schema_doc_hash(schema_doc: ItemSchema) -> str:
+    # Les schémas créés avant l'ajout de schema_hash n'ont pas de hash stocké
+    return schema_doc.schema_hash or compute_schema_hash(schema_doc.schema)
+
+
+def _cache_schema(schema_doc: ItemSchema) -> None:
+    _latest_schemas[schema_doc.item_type] = (schema_doc, _schema_doc_hash(schema_doc))
+
+
+async def get_latest_schema(item_type: str, refresh: bool = False) -> Optional[ItemSchema]:
+    """
+    Retourne la dernière version du schéma pour un type d'item.
+    Mongo n'est interrogé qu'en cas d'absence dans le cache (ou si refresh=True).
+    """
+    cached = _latest_schemas.get(item_type)
+    if cached is not None and not refresh:
+        return cached[0]
+    schema_doc = await ItemSchema.find(ItemSchema.item_type == item_type).sort("-version").first_or_none()
+    if schema_doc is not None:
+        _cache_schema(schema_doc)
+    return schema_doc
+
+
+async def get_metadata_field_types() -> Dict[str, Set[str]]:
+    """
+    Registre des types de metadata : chemin pointé (`points`, `owner.name`) -> types
+    scalaires rencontrés dans toutes les versions de schéma de tous les types d'item.
+    Sert à convertir les valeurs des filtres de la query string (voir utils/query_dsl.py).
+    """
+    global _metadata_types
+    if _metadata_types is not None and time.monotonic() - _metadata_types[0] < METADATA_TYPES_TTL:
+        return _metadata_types[1]
+    registry: Dict[str, Set[str]] = {}
+    async for doc in ItemSchema.get_motor_collection().find({}, {"schema": 1}):
+        for path, types in schema_field_types(doc.get("schema") or {}).items():
+            registry.setdefault(path, set()).update(types)
+    _metadata_types = (time.monotonic(), registry)
+    return registry
+
+
+async def find_schema_by_hash(item_type: str, schema_hash: str) -> Optional[ItemSchema]:
+    """
+    Retourne la version la plus récente d'un type dont le schéma a ce hash
+    (une seule requête, servie par l'index item_type_schema_hash).
+    """
+    return await ItemSchema.find(
+        ItemSchema.item_type == item_type,
+        ItemSchema.schema_hash == schema_hash,
+    ).sort("-version").first_or_none()
+
+
+async def diff_against_latest(item_type: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compare le schéma déduit de metadata au dernier schéma du type.
+    Retourne la différence structurelle et, le cas échéant, la version existante
+    qui a exactement ce schéma ou qui l'englobe déjà (valeurs null, clés optionnelles).
+    """
+    current_schema = generate_metadata_schema(metadata)
+    current_hash = compute_schema_hash(current_schema)
+    latest = await get_latest_schema(item_type)
+    if latest is not None and _fits_schema(latest, current_schema, current_hash):
+        matching = latest
+    else:
+        matching = await find_schema_by_hash(item_type, current_hash)
+    return {
+        "item_type": item_type,
+        "latest_version": latest.version if latest is not None else None,
+        "matching_version": matching.version if matching is not None else None,
+        "identical": matching is not None and latest is not None and matching.version == latest.version,
+        "schema_hash": current_hash,
+        "schema": current_schema,
+        "diff": schema_structural_diff(latest.schema if latest is not None else {}, current_schema),
+    }
+
+
+async def _allocate_version(
+    item_type: str,
+    version: int,
+    schema: Dict[str, Any],
+    schema_hash: str,
+    author: Optional[str],
+) -> ItemSchema:
+    """
+    Réserve atomiquement la version `version` d'un type d'item (un seul aller-retour).
+
+    L'upsert porte sur (item_type, version), protégé par l'index unique : si plusieurs
+    writers visent la même version, un seul document est créé et tous récupèrent
+    le même. Le document retourné peut donc avoir un autre hash que `schema_hash`.
+    """
+    candidate = ItemSchema(
+        item_type=item_type,
+        version=version,
+        schema=schema,
+        author=author,
+        schema_hash=schema_hash,
+    )
+    on_insert = get_dict(candidate, to_db=True)
+    on_insert.pop("item_type", None)
+    on_insert.pop("version", None)
+    raw = await ItemSchema.get_motor_collection().find_one_and_update(
+        {"item_type": item_type, "version": version},
+        {"$setOnInsert": on_insert},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return ItemSchema.model_validate(raw)
+
+
+# Index remplacés par item_type_version_unique (models/item_schema.py), supprimés à la migration
+LEGACY_SCHEMA_INDEXES = ("item_type_1_version_-1",)
+
+
+async def deduplicate_schema_versions() -> int:
+    """
+    Migration préalable à l'index unique (item_type, version) : les bases antérieures
+    peuvent contenir plusieurs documents pour une même version (course entre writers).
+    Dans chaque groupe, le plus ancien garde la version ; les copies de même schéma sont
+    supprimées, les autres schémas reçoivent les versions suivantes du type.
+    Retourne le nombre de documents supprimés ou renumérotés.
+    """
+    collection = ItemSchema.get_motor_collection()
+    groups = await collection.aggregate([
+        {"$group": {"_id": {"item_type": "$item_type", "version": "$version"}, "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]).to_list(length=None)
+    fixed = 0
+    for group in groups:
+        item_type = group["_id"]["item_type"]
+        docs = await collection.find({"_id": {"$in": group["ids"]}}).sort([("created_at", 1), ("_id", 1)]).to_list(length=None)
+        kept_hash = docs[0].get("schema_hash") or compute_schema_hash(docs[0].get("schema") or {})
+        for doc in docs[1:]:
+            if (doc.get("schema_hash") or compute_schema_hash(doc.get("schema") or {})) == kept_hash:
+                await collection.delete_one({"_id": doc["_id"]})
+            else:
+                last = await collection.find({"item_type": item_type}).sort("version", -1).limit(1).to_list(length=1)
+                await collection.update_one({"_id": doc["_id"]}, {"$set": {"version": last[0]["version"] + 1}})
+            fixed += 1
+    if fixed:
+        logger.warning(f"{fixed} version(s) de schéma en double corrigée(s) avant la création de l'index unique")
+        invalidate_schema_cache()
+    return fixed
+
+
+async def migrate_item_schemas() -> None:
+    """Dédoublonne les versions de schéma et supprime les index remplacés."""
+    await deduplicate_schema_versions()
+    collection = ItemSchema.get_motor_collection()
+    existing = await collection.index_information()
+    for name in LEGACY_SCHEMA_INDEXES:
+        if name in existing:
+            await collection.drop_index(name)
+            logger.info(f"Index {name} supprimé (remplacé par item_type_version_unique)")
+
+
+def _fits_schema(schema_doc: ItemSchema, current_schema: Dict[str, Any], current_hash: str) -> bool:
+    """Vrai si le schéma de la version englobe déjà current_schema (son union avec lui ne change rien)."""
+    schema_hash = _schema_doc_hash(schema_doc)
+    if schema_hash == current_hash:
+        return True
+    return compute_schema_hash(merge_metadata_schemas(schema_doc.schema, current_schema)) == schema_hash
+
+
+async def ensure_schema_version(item_type: str, metadata: Dict[str, Any], author: str = "IA") -> ItemSchema:
+    """
+    Versionne le schéma de metadata d'un type d'item.
+
+    La comparaison avec le dernier schéma connu se fait par hash de la forme canonique
+    (récursive) : s'il est identique, aucune requête Mongo n'est faite. Sinon le nouveau
+    schéma est l'union du dernier et de celui des metadata (merge_metadata_schemas) : une
+    valeur qui passe de null à une valeur, ou une clé absente, ne crée une version qu'une
+    fois. La version suivante est allouée par un upsert atomique ; si un autre writer a
+    pris cette version avec un schéma différent, on recommence sur la version suivante.
+    """
+    current_schema = generate_metadata_schema(metadata)
+    current_hash = compute_schema_hash(current_schema)
+
+    last_schema_doc = await get_latest_schema(item_type)
+    for _ in range(MAX_VERSION_ALLOCATION_ATTEMPTS):
+        if last_schema_doc is not None:
+            if _schema_doc_hash(last_schema_doc) == current_hash:
+                return last_schema_doc
+            schema = merge_metadata_schemas(last_schema_doc.schema, current_schema)
+            schema_hash = compute_schema_hash(schema)
+            if schema_hash == _schema_doc_hash(last_schema_doc):
+                return last_schema_doc
+            new_version = last_schema_doc.version + 1
+        else:
+            # Nouveau type : créer version 1
+            schema, schema_hash = current_schema, current_hash
+            new_version = 1
+
+        try:
+            schema_doc = await _allocate_version(item_type, new_version, schema, schema_hash, author)
+        except DuplicateKeyError:
+            # Course sur l'upsert non rejouée par le serveur : relire la dernière version
+            last_schema_doc = await get_latest_schema(item_type, refresh=True)
+            continue
+        _cache_schema(schema_doc)
+        invalidate_metadata_types()
+        # Si la version a été prise par un autre schéma, on compare à nouveau avec celle-ci
+        last_schema_doc = schema_doc
+    raise RuntimeError(f"Impossible d'allouer une version de schéma pour le type {item_type}")
+
+
+async def validate_metadata(item_type: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Valide metadata contre le dernier schéma du type (validateur compilé et mis en cache).
+
+    Selon METADATA_VALIDATION : "off" ne valide pas, "warn" journalise les erreurs,
+    "strict" lève MetadataValidationError.
+    """
+    if settings.metadata_validation == "off":
+        return metadata
+    schema_doc = await get_latest_schema(item_type)
+    if schema_doc is None:
+        return metadata
+    try:
+        return MetadataValidator.validate(metadata, schema_doc.item_type, schema_doc.version, schema_doc.schema)
+    except MetadataValidationError as e:
+        if settings.metadata_validation == "strict":
+            raise
+        logger.warning(f"Metadata non conformes au schéma {item_type} v{schema_doc.version}: {e}")
+        return metadata
@@ -0,0 +1,329 @@
+import asyncio
+import importlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from bson import ObjectId
+
+from core.config import settings
+from models.item import Item
+from services.events import ANY_BOARD, ItemEvent, event_bus
+from utils.text_vectors import HashingEmbedder
+
+logger = logging.getLogger("similarity")
+
+# Champs texte indexés ; le titre compte double
+TEXT_FIELDS = ("title", "title", "functional_description", "technical_description")
+
+LOAD_BATCH_SIZE = 1000
+
+
+def item_text(doc: Dict[str, Any]) -> str:
+    return "\n".join(doc.get(field) or "" for field in TEXT_FIELDS)
+
+
+def create_embedder():
+    """
+    Embedder configuré par SIMILARITY_EMBEDDER : "hashing" (défaut, local) ou
+    "module:fabrique" pour brancher un autre modèle. Un embedder expose `dim`,
+    `uses_idf` et `embed(texts) -> np.ndarray (len(texts), dim)`.
+    """
+    name = settings.similarity_embedder
+    if name == "hashing":
+        return HashingEmbedder(dim=settings.similarity_dim)
+    module_name, _, factory = name.partition(":")
+    return getattr(importlib.import_module(module_name), factory)()
+
+
+class BoardVectors:
+    """
+    Vecteurs des items d'un board, une ligne par item dans une matrice NumPy
+    (capacité doublée à la demande, suppression par échange avec la dernière ligne).
+
+    Les lignes sont les vecteurs bruts de l'embedder. Avec la pondération IDF, le
+    cosinus se calcule sans matrice pondérée : (d ∘ idf)·(q ∘ idf) = d·(q ∘ idf²),
+    seules les normes des lignes pondérées sont gardées (recalculées après écriture).
+    """
+
+    def __init__(self, dim: int, uses_idf: bool):
+        self.uses_idf = uses_idf
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        # nombre d'items où chaque composante est non nulle
+        self.df = np.zeros(dim, dtype=np.float32)
+        self.loaded_at = time.monotonic()
+        self._idf: Optional[np.ndarray] = None
+        self._norms: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._matrix[:len(self.ids)]
+
+    def _invalidate(self) -> None:
+        self._idf = None
+        self._norms = None
+
+    def upsert(self, item_id: str, vector: np.ndarray) -> None:
+        row = self.positions.get(item_id)
+        if row is None:
+            row = len(self.ids)
+            if row == self._matrix.shape[0]:
+                grown = np.zeros((max(16, row * 2), self._matrix.shape[1]), dtype=np.float32)
+                grown[:row] = self._matrix[:row]
+                self._matrix = grown
+            self.ids.append(item_id)
+            self.positions[item_id] = row
+        else:
+            self.df -= self._matrix[row] > 0
+        self._matrix[row] = vector
+        self.df += vector > 0
+        self._invalidate()
+
+    def remove(self, item_id: str) -> bool:
+        row = self.positions.pop(item_id, None)
+        if row is None:
+            return False
+        self.df -= self._matrix[row] > 0
+        last = len(self.ids) - 1
+        if row != last:
+            moved = self.ids[last]
+            self._matrix[row] = self._matrix[last]
+            self.ids[row] = moved
+            self.positions[moved] = row
+        self._matrix[last] = 0
+        self.ids.pop()
+        self._invalidate()
+        return True
+
+    def vector(self, item_id: str) -> Optional[np.ndarray]:
+        row = self.positions.get(item_id)
+        return None if row is None else self._matrix[row].copy()
+
+    def _weights(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._idf is None:
+            if self.uses_idf:
+                self._idf = (np.log((1.0 + len(self.ids)) / (1.0 + self.df)) + 1.0).astype(np.float32)
+            else:
+                self._idf = np.ones_like(self.df)
+        if self._norms is None:
+            self._norms = np.sqrt((self.matrix ** 2) @ (self._idf ** 2))
+        return self._idf, self._norms
+
+    def top_k(
+        self,
+        queries: np.ndarray,
+        k: int,
+        exclude: Sequence[Optional[str]] = (),
+        min_score: float = 0.0,
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Cosinus entre chaque ligne de `queries` et les items du board, en un seul
+        produit matriciel. Pour chaque requête : les k meilleurs (id, score) par score
+        décroissant, hors exclude[i] (l'item de départ d'une recherche "items similaires").
+        """
+        if not self.ids or queries.shape[0] == 0:
+            return [[] for _ in range(queries.shape[0])]
+        idf, norms = self._weights()
+        weighted = queries * idf
+        query_norms = np.linalg.norm(weighted, axis=1)
+        scores = self.matrix @ (weighted * idf).T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = scores / np.outer(norms, query_norms)
+        scores = np.nan_to_num(scores, nan=0.0, posinf=0.0, neginf=0.0)
+
+        results = []
+        for column in range(scores.shape[1]):
+            column_scores = scores[:, column]
+            excluded = exclude[column] if column < len(exclude) else None
+            if excluded in self.positions:
+                column_scores[self.positions[excluded]] = -1.0
+            count = min(k, len(column_scores))
+            # sélection partielle en O(n), puis tri des seuls k candidats
+            candidates = np.argpartition(-column_scores, count - 1)[:count]
+            candidates = candidates[np.argsort(-column_scores[candidates], kind="stable")]
+            results.append([
+                (self.ids[row], round(float(column_scores[row]), 4))
+                for row in candidates
+                if column_scores[row] > min_score
+            ])
+        return results
+
+
+class SimilarityIndex:
+    """
+    Index vectoriel en mémoire, un BoardVectors par board, chargé à la première
+    recherche sur le board puis tenu à jour par les événements d'items.
+
+    Au plus SIMILARITY_MAX_BOARDS boards en mémoire (LRU). Un board est rechargé
+    après SIMILARITY_INDEX_TTL secondes, pour intégrer les écritures des autres processus.
+    """
+
+    def __init__(self, embedder, max_boards: int, ttl: float):
+        self.embedder = embedder
+        self.max_boards = max_boards
+        self.ttl = ttl
+        self._boards: "OrderedDict[str, BoardVectors]" = OrderedDict()
+        # board en cours de chargement -> événements reçus entre-temps (rejoués ensuite)
+        self._loading: Dict[str, List[ItemEvent]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return self.embedder.embed(list(texts))
+
+    async def _load(self, board_id: str) -> BoardVectors:
+        vectors = BoardVectors(self.embedder.dim, self.embedder.uses_idf)
+        projection = {"title": 1, "functional_description": 1, "technical_description": 1}
+        cursor = Item.get_motor_collection().find({"board_id": board_id}, projection)
+        batch: List[Dict[str, Any]] = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= LOAD_BATCH_SIZE:
+                self._add_batch(vectors, batch)
+                batch = []
+                await asyncio.sleep(0)
+        self._add_batch(vectors, batch)
+        return vectors
+
+    def _add_batch(self, vectors: BoardVectors, docs: List[Dict[str, Any]]) -> None:
+        if not docs:
+            return
+        matrix = self.embed([item_text(doc) for doc in docs])
+        for doc, vector in zip(docs, matrix):
+            vectors.upsert(str(doc["_id"]), vector)
+
+    async def board(self, board_id: str) -> BoardVectors:
+        vectors = self._boards.get(board_id)
+        if vectors is not None and time.monotonic() - vectors.loaded_at < self.ttl:
+            self._boards.move_to_end(board_id)
+            return vectors
+        lock = self._locks.setdefault(board_id, asyncio.Lock())
+        async with lock:
+            vectors = self._boards.get(board_id)
+            if vectors is not None and time.monotonic() - vectors.loaded_at < self.ttl:
+                return vectors
+            self._loading[board_id] = []
+            started = time.perf_counter()
+            try:
+                vectors = await self._load(board_id)
+            finally:
+                pending = self._loading.pop(board_id)
+            self._boards[board_id] = vectors
+            self._boards.move_to_end(board_id)
+            while len(self._boards) > self.max_boards:
+                evicted, _ = self._boards.popitem(last=False)
+                self._locks.pop(evicted, None)
+            for event in pending:
+                self.apply(event)
+            logger.info(f"Index de similarité du board {board_id} : {len(vectors)} items en {time.perf_counter() - started:.2f}s")
+            return vectors
+
+    def apply(self, event: ItemEvent) -> None:
+        """Met à jour les boards chargés après l'écriture d'un item."""
+        if event.board_id in self._loading:
+            self._loading[event.board_id].append(event)
+        if event.op == "deleted":
+            targets = self._boards.values() if event.board_id == ANY_BOARD else [self._boards.get(event.board_id)]
+            for vectors in targets:
+                if vectors is not None:
+                    vectors.remove(event.item_id)
+            return
+        if event.item is not None:
+            board_id = event.item.get("board_id")
+            # l'item a pu changer de board (PUT) : le retirer des autres boards
+            for other_id, vectors in self._boards.items():
+                if other_id != board_id:
+                    vectors.remove(event.item_id)
+            vectors = self._boards.get(board_id)
+            if vectors is not None:
+                vectors.upsert(event.item_id, self.embed([item_text(event.item)])[0])
+            return
+        changes = event.changes or {}
+        if "board_id" in changes and changes["board_id"] != event.board_id:
+            vectors = self._boards.get(event.board_id)
+            if vectors is not None:
+                vectors.remove(event.item_id)
+            return
+        if "board_id" in changes or any(field in changes for field in TEXT_FIELDS):
+            # seul le delta est connu : relire le texte complet de l'item
+            if event.board_id in self._boards:
+                asyncio.ensure_future(self._refresh(event.item_id))
+
+    async def _refresh(self, item_id: str) -> None:
+        try:
+            doc = await Item.get_motor_collection().find_one(
+                {"_id": ObjectId(item_id)},
+                {"board_id": 1, "title": 1, "functional_description": 1, "technical_description": 1},
+            )
+        except Exception as e:
+            logger.error(f"Relecture de l'item {item_id} pour l'index de similarité impossible: {e}")
+            return
+        for board_id, vectors in self._boards.items():
+            if doc is None or board_id != doc.get("board_id"):
+                vectors.remove(item_id)
+        if doc is not None and doc.get("board_id") in self._boards:
+            self._boards[doc["board_id"]].upsert(item_id, self.embed([item_text(doc)])[0])
+
+    async def search(
+        self,
+        board_id: str,
+        texts: Sequence[str] = (),
+        item_ids: Sequence[str] = (),
+        k: int = 10,
+        min_score: float = 0.0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Recherche par lot : une liste de résultats par texte puis par item de référence.
+        Un item de référence absent du board est relu dans Mongo (item d'un autre board).
+        """
+        vectors = await self.board(board_id)
+        queries: List[np.ndarray] = []
+        exclude: List[Optional[str]] = []
+        labels: List[Dict[str, Any]] = []
+        if texts:
+            queries.extend(self.embed(texts))
+            exclude.extend([None] * len(texts))
+            labels.extend({"query": text} for text in texts)
+        for item_id in item_ids:
+            vector = vectors.vector(item_id)
+            if vector is None:
+                doc = await Item.get_motor_collection().find_one(
+                    {"_id": ObjectId(item_id)},
+                    {"title": 1, "functional_description": 1, "technical_description": 1},
+                )
+                if doc is None:
+                    raise KeyError(item_id)
+                vector = self.embed([item_text(doc)])[0]
+            queries.append(vector)
+            exclude.append(item_id)
+            labels.append({"item_id": item_id})
+        if not queries:
+            return []
+        matches = vectors.top_k(np.vstack(queries), k, exclude, min_score)
+        return [dict(label, matches=found) for label, found in zip(labels, matches)]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "embedder": type(self.embedder).__name__,
+            "dim": self.embedder.dim,
+            "boards": {board_id: len(vectors) for board_id, vectors in self._boards.items()},
+        }
+
+
+similarity_index = SimilarityIndex(create_embedder(), settings.similarity_max_boards, settings.similarity_index_ttl)
+
+
+def _on_item_event(event: ItemEvent) -> None:
+    try:
+        similarity_index.apply(event)
+    except Exception as e:
+        logger.error(f"Mise à jour de l'index de similarité impossible: {e}")
+
+
+event_bus.add_listener(_on_item_event)
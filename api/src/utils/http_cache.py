@@ -0,0 +1,122 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple, Type
+
+from beanie import Document
+from fastapi import Request, Response, status
+
+from utils.raw_documents import json_response
+
+
+def make_etag(*parts: Any, weak: bool = True) -> str:
+    """
+    Construit un ETag à partir de valeurs quelconques (sérialisées en JSON).
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Vrai si l'en-tête If-None-Match de la requête correspond à l'ETag (comparaison faible).
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == wanted:
+            return True
+    return False
+
+
+def http_date(value: datetime) -> str:
+    """Date au format HTTP (Last-Modified). Les dates naïves lues dans Mongo sont en UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Vrai si la copie du client est à jour : If-None-Match est prioritaire, sinon
+    If-Modified-Since est comparé à last_modified (à la seconde près).
+    """
+    if request.headers.get("if-none-match"):
+        return etag_matches(request, etag)
+    since = request.headers.get("if-modified-since")
+    if not since or last_modified is None:
+        return False
+    try:
+        since_date = parsedate_to_datetime(since)
+    except (TypeError, ValueError):
+        return False
+    if since_date.tzinfo is None:
+        since_date = since_date.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since_date
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    """
+    En-têtes de validation d'une réponse. no-cache : le client peut garder la réponse
+    mais doit la revalider (requête conditionnelle) avant de la réutiliser.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None) -> Response:
+    """
+    Réponse 304 Not Modified portant l'ETag courant.
+    """
+    headers = validator_headers(etag, last_modified) if last_modified is not None else {"ETag": etag}
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def document_validators(document: Document) -> Tuple[str, datetime]:
+    """ETag (identifiant, révision, date de modification) et Last-Modified d'un board ou d'un item."""
+    etag = make_etag(type(document).__name__, str(document.id), document.revision, document.updated_at)
+    return etag, document.updated_at
+
+
+async def listing_validators(model: Type[Document], query: Dict[str, Any], *parts: Any) -> Tuple[str, Optional[datetime]]:
+    """
+    ETag et Last-Modified d'une liste de documents : nombre de documents du filtre et
+    max(updated_at), en une agrégation (servie par l'index du filtre, sans lire les corps
+    des documents quand il couvre updated_at). `parts` distingue les variantes d'une même
+    liste (paramètres de la requête).
+    """
+    pipeline = [
+        {"$match": query},
+        {"$group": {"_id": None, "count": {"$sum": 1}, "last": {"$max": "$updated_at"}}},
+    ]
+    result = await model.get_motor_collection().aggregate(pipeline).to_list(length=1)
+    count, last = (result[0]["count"], result[0]["last"]) if result else (0, None)
+    return make_etag(model.__name__, count, last, *parts), last
+
+
+
+def conditional_response(request: Request, body: bytes, headers: Dict[str, str]) -> Response:
+    """
+    Réponse JSON déjà encodée (ex: servie par le cache), ou 304 si les validateurs
+    présents dans `headers` (ETag, Last-Modified) correspondent à la copie du client.
+    """
+    etag = headers.get("ETag")
+    if etag is not None:
+        last_modified = headers.get("Last-Modified")
+        if is_not_modified(request, etag, parsedate_to_datetime(last_modified) if last_modified else None):
+            validators = {key: headers[key] for key in ("ETag", "Last-Modified", "Cache-Control") if key in headers}
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators)
+    return json_response(body, headers=headers)
@@ -1,20 +1,185 @@
-from typing import Dict, Any
+import json
+from typing import Dict, Any, List, Set
+
+
+def _canonical(descriptor: Dict[str, Any]) -> str:
+    return json.dumps(descriptor, sort_keys=True, separators=(",", ":"))
+
+
+def infer_value_schema(value: Any) -> Dict[str, Any]:
+    """
+    Déduit récursivement le descripteur de type d'une valeur :
+    - scalaires : {"type": "int", "required": True}
+    - dict : {"type": "dict", "required": True, "properties": {clé: descripteur}}
+    - list : {"type": "list", "required": True, "items": descripteur des éléments}
+    - null : {"type": "NoneType", "required": False}
+    """
+    if isinstance(value, dict):
+        return {
+            "type": "dict",
+            "required": True,
+            "properties": {key: infer_value_schema(sub_value) for key, sub_value in value.items()},
+        }
+    if isinstance(value, list):
+        descriptor = {"type": "list", "required": True}
+        if value:
+            descriptor["items"] = merge_value_schemas([infer_value_schema(element) for element in value])
+        return descriptor
+    return {"type": type(value).__name__, "required": value is not None}
+
+
+def _is_descriptor(descriptor: Any) -> bool:
+    return isinstance(descriptor, dict) and ("type" in descriptor or "anyOf" in descriptor)
+
+
+def merge_value_schemas(descriptors: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Fusionne des descripteurs (éléments d'une liste, ou valeurs d'une même clé d'une
+    version de schéma à l'autre) :
+    - même type : fusion récursive (une clé absente de certains objets devient non
+      requise) ; le type n'est requis que s'il l'est dans tous les descripteurs
+    - types différents : union {"anyOf": [...]} triée pour rester canonique
+      (ex: null puis entier -> anyOf [NoneType, int])
+    La fusion est idempotente : refusionner le résultat avec l'un des descripteurs le redonne.
+    """
+    by_type: Dict[str, List[Dict[str, Any]]] = {}
+    for descriptor in descriptors:
+        members = descriptor["anyOf"] if "anyOf" in descriptor else [descriptor]
+        for member in members:
+            by_type.setdefault(member["type"], []).append(member)
+
+    merged = []
+    for type_name, group in by_type.items():
+        required = all(member.get("required", False) for member in group)
+        if type_name == "dict":
+            keys = {key for member in group for key in member.get("properties", {})}
+            properties = {}
+            for key in keys:
+                present = [member["properties"][key] for member in group if key in member.get("properties", {})]
+                prop = merge_value_schemas(present)
+                if len(present) < len(group) and "anyOf" not in prop:
+                    prop = dict(prop, required=False)
+                properties[key] = prop
+            merged.append({"type": "dict", "required": required, "properties": properties})
+        elif type_name == "list":
+            items = [member["items"] for member in group if "items" in member]
+            descriptor = {"type": "list", "required": required}
+            if items:
+                descriptor["items"] = merge_value_schemas(items)
+            merged.append(descriptor)
+        else:
+            merged.append(dict(group[0], required=required))
+
+    if len(merged) == 1:
+        return merged[0]
+    return {"anyOf": sorted(merged, key=_canonical)}
+
+
+def merge_metadata_schemas(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Union de deux schémas de metadata, clé par clé et récursivement, comme les objets
+    d'une liste (voir merge_value_schemas) : une clé qui passe de null à une valeur (ou
+    l'inverse) devient une union, une clé absente de l'un des deux devient non requise.
+    Les descripteurs de `previous` d'un format inconnu sont ignorés.
+    """
+    previous = {key: descriptor for key, descriptor in previous.items() if _is_descriptor(descriptor)}
+    merged = merge_value_schemas([
+        {"type": "dict", "required": True, "properties": previous},
+        {"type": "dict", "required": True, "properties": current},
+    ])
+    return merged["properties"]
+
 
 def generate_metadata_schema(metadata: Dict[str, Any]) -> Dict[str, Any]:
     """
     Génère dynamiquement le schéma à partir du contenu du champ metadata d'un item.
-    Le schéma est un dict {clé: type}.
+    Le schéma est un dict {clé: descripteur de type}, récursif pour les objets et
+    les listes (voir infer_value_schema). Pour des metadata scalaires, il est
+    identique à l'ancien format plat {clé: {"type", "required"}}.
     """
-    schema = {}
-    for key, value in metadata.items():
-        schema[key] = {
-            "type": type(value).__name__,
-            "required": value is not None
-        }
-    return schema
+    return {key: infer_value_schema(value) for key, value in metadata.items()}
+
+
+def _describe(descriptor: Dict[str, Any]) -> str:
+    if "anyOf" in descriptor:
+        return " | ".join(_describe(member) for member in descriptor["anyOf"])
+    return descriptor.get("type", "?")
+
+
+def _diff_descriptors(path: str, old: Dict[str, Any], new: Dict[str, Any], diff: Dict[str, Dict[str, Any]]) -> None:
+    if "anyOf" in old or "anyOf" in new or old.get("type") != new.get("type"):
+        if _canonical(old) != _canonical(new):
+            diff["changed"][path] = {"from": _describe(old), "to": _describe(new)}
+        return
+    if old.get("type") == "dict":
+        _diff_properties(path + ".", old.get("properties", {}), new.get("properties", {}), diff)
+    elif old.get("type") == "list":
+        if "items" in old and "items" in new:
+            _diff_descriptors(path + "[]", old["items"], new["items"], diff)
+        elif "items" in old or "items" in new:
+            # une liste vide ne renseigne pas le type de ses éléments : pas de différence
+            pass
+    elif old.get("required") != new.get("required"):
+        diff["changed"][path] = {"from": _describe(old), "to": _describe(new), "nullable": not new.get("required")}
+
+
+def _diff_properties(prefix: str, old: Dict[str, Any], new: Dict[str, Any], diff: Dict[str, Dict[str, Any]]) -> None:
+    for key in sorted(set(old) | set(new)):
+        path = prefix + key
+        if key not in new:
+            diff["removed"][path] = _describe(old[key]) if isinstance(old[key], dict) else str(old[key])
+        elif key not in old:
+            diff["added"][path] = _describe(new[key]) if isinstance(new[key], dict) else str(new[key])
+        elif isinstance(old[key], dict) and isinstance(new[key], dict):
+            _diff_descriptors(path, old[key], new[key], diff)
+        elif old[key] != new[key]:
+            diff["changed"][path] = {"from": str(old[key]), "to": str(new[key])}
+
+
+def schema_structural_diff(old_schema: Dict[str, Any], new_schema: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Différence structurelle entre deux schémas de metadata, par chemin pointé
+    (`a.b` pour un objet, `a[]` pour les éléments d'une liste) :
+    {"added": {chemin: type}, "removed": {chemin: type}, "changed": {chemin: {"from", "to"}}}
+    """
+    diff: Dict[str, Dict[str, Any]] = {"added": {}, "removed": {}, "changed": {}}
+    _diff_properties("", old_schema, new_schema, diff)
+    return diff
+
 
 def deep_schema_diff(schema1: Dict[str, Any], schema2: Dict[str, Any]) -> bool:
     """
-    Compare deux schémas de metadata (dict). Retourne True s'ils sont différents.
+    Compare deux schémas de metadata (dict) de façon structurelle.
+    Retourne True s'ils sont différents.
     """
-    return schema1 != schema2
\ No newline at end of file
+    diff = schema_structural_diff(schema2, schema1)
+    return any(diff[kind] for kind in ("added", "removed", "changed"))
+
+
+def schema_field_types(schema: Dict[str, Any]) -> Dict[str, Set[str]]:
+    """
+    Types scalaires de chaque chemin pointé d'un schéma de metadata (`a`, `a.b`).
+    Comme Mongo compare les éléments d'un tableau à la valeur filtrée, un chemin de
+    liste porte le type de ses éléments. Les chemins d'objet ou de liste vide sont
+    présents avec un ensemble vide.
+    """
+    types: Dict[str, Set[str]] = {}
+
+    def visit(path: str, descriptor: Dict[str, Any]) -> None:
+        types.setdefault(path, set())
+        for member in descriptor.get("anyOf", [descriptor]):
+            type_name = member.get("type")
+            if type_name == "dict":
+                for key, sub_descriptor in member.get("properties", {}).items():
+                    if isinstance(sub_descriptor, dict):
+                        visit(f"{path}.{key}", sub_descriptor)
+            elif type_name == "list":
+                if "items" in member:
+                    visit(path, member["items"])
+            elif type_name:
+                types[path].add(type_name)
+
+    for key, descriptor in schema.items():
+        if isinstance(descriptor, dict):
+            visit(key, descriptor)
+    return types
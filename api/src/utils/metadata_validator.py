@@ -1,11 +1,171 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Validateur compilé : metadata -> liste d'erreurs (vide si valide)
+CompiledValidator = Callable[[Dict[str, Any]], List[str]]
+
+
+class MetadataValidationError(ValueError):
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("; ".join(errors))
+
+
+def _type_check(type_name: str) -> Optional[Callable[[Any], bool]]:
+    """
+    Fonction de test pour un nom de type produit par generate_metadata_schema.
+    None si le type est inconnu (pas de contrôle).
+    """
+    if type_name == "str":
+        return lambda value: isinstance(value, str)
+    if type_name == "bool":
+        return lambda value: isinstance(value, bool)
+    if type_name == "int":
+        return lambda value: isinstance(value, int) and not isinstance(value, bool)
+    if type_name == "float":
+        # un entier est accepté là où un flottant est attendu (ex: 3 au lieu de 3.0)
+        return lambda value: isinstance(value, (int, float)) and not isinstance(value, bool)
+    if type_name == "dict":
+        return lambda value: isinstance(value, dict)
+    if type_name == "list":
+        return lambda value: isinstance(value, list)
+    if type_name == "NoneType":
+        return lambda value: value is None
+    return None
+
+
+# Validateur d'une valeur : (chemin, valeur) -> liste d'erreurs
+_ValueCheck = Callable[[str, Any], List[str]]
+
+
+def _compile_descriptor(spec: Dict[str, Any], in_union: bool = False) -> Optional[_ValueCheck]:
+    """
+    Compile récursivement un descripteur produit par generate_metadata_schema
+    (scalaire, dict avec "properties", list avec "items", union "anyOf").
+    None si le descripteur ne permet aucun contrôle.
+
+    Seul, un descripteur NoneType (clé vue uniquement à null) n'apprend rien du type
+    de la clé : toute valeur est acceptée. Dans une union, il rend le type nullable.
+    """
+    if "anyOf" in spec:
+        members = [_compile_descriptor(member, in_union=True) for member in spec["anyOf"] if isinstance(member, dict)]
+        if not members or any(member is None for member in members):
+            return None
+        expected = " | ".join(str(member.get("type")) for member in spec["anyOf"] if isinstance(member, dict))
+
+        def check_any(path: str, value: Any) -> List[str]:
+            if any(not member(path, value) for member in members):
+                return []
+            return [f"{path}: expected {expected}, got {type(value).__name__}"]
+
+        return check_any
+
+    type_name = spec.get("type")
+    if type_name == "NoneType" and not in_union:
+        return None
+    check = _type_check(type_name) if isinstance(type_name, str) else None
+    if check is None:
+        return None
+    nullable = not spec.get("required", False) or type_name == "NoneType"
+    children: Optional[Callable[[str, Any], List[str]]] = None
+    if type_name == "dict" and isinstance(spec.get("properties"), dict):
+        children = _compile_properties(spec["properties"])
+    elif type_name == "list" and isinstance(spec.get("items"), dict):
+        item_check = _compile_descriptor(spec["items"])
+        if item_check is not None:
+            def children(path: str, value: List[Any]) -> List[str]:
+                errors = []
+                for index, element in enumerate(value):
+                    errors.extend(item_check(f"{path}[{index}]", element))
+                return errors
+
+    def check_value(path: str, value: Any) -> List[str]:
+        if value is None:
+            return [] if nullable else [f"{path}: null value not allowed (expected {type_name})"]
+        if not check(value):
+            return [f"{path}: expected {type_name}, got {type(value).__name__}"]
+        return children(path, value) if children is not None else []
+
+    return check_value
+
+
+def _compile_properties(properties: Dict[str, Any]) -> Callable[[str, Dict[str, Any]], List[str]]:
+    checks: List[Tuple[str, _ValueCheck]] = []
+    for key, spec in properties.items():
+        if not isinstance(spec, dict):
+            continue
+        check = _compile_descriptor(spec)
+        if check is not None:
+            checks.append((key, check))
+
+    def validate(path: str, value: Dict[str, Any]) -> List[str]:
+        errors = []
+        for key, check in checks:
+            if key in value:
+                errors.extend(check(f"{path}.{key}", value[key]))
+        return errors
+
+    return validate
+
+
+def compile_metadata_schema(schema: Dict[str, Any]) -> CompiledValidator:
+    """
+    Compile un schéma de metadata (voir generate_metadata_schema) en une fonction
+    de validation : le schéma n'est parcouru qu'une fois, à la compilation.
+    Les objets, listes et unions imbriqués sont contrôlés récursivement.
+
+    Seules les clés présentes à la fois dans les metadata et dans le schéma sont
+    contrôlées : une clé ajoutée ou absente fait évoluer le schéma (nouvelle version)
+    et n'est pas une erreur. Une valeur null est refusée si la clé est "required".
+    """
+    validate_properties = _compile_properties(schema)
+
+    def validate(metadata: Dict[str, Any]) -> List[str]:
+        return validate_properties("metadata", metadata)
+
+    return validate
+
+
 class MetadataValidator:
     """
-    v0: Stub implementation. Does nothing.
+    v1: validation des metadata contre le dernier schéma connu d'un type d'item.
+
+    Les schémas sont compilés une seule fois en validateurs, mis en cache par
+    (item_type, version) : une version de schéma n'est jamais modifiée.
     """
 
-    @staticmethod
-    def validate(metadata: dict) -> dict:
+    max_cached_validators = 512
+    _validators: "OrderedDict[Tuple[str, int], CompiledValidator]" = OrderedDict()
+
+    @classmethod
+    def get_validator(cls, item_type: str, version: int, schema: Dict[str, Any]) -> CompiledValidator:
+        key = (item_type, version)
+        validator = cls._validators.get(key)
+        if validator is None:
+            validator = compile_metadata_schema(schema)
+            cls._validators[key] = validator
+            if len(cls._validators) > cls.max_cached_validators:
+                cls._validators.popitem(last=False)
+        else:
+            cls._validators.move_to_end(key)
+        return validator
+
+    @classmethod
+    def validate(
+        cls,
+        metadata: dict,
+        item_type: Optional[str] = None,
+        version: Optional[int] = None,
+        schema: Optional[Dict[str, Any]] = None,
+    ) -> dict:
         """
-        No-op validation: returns metadata unchanged.
+        Valide metadata contre le schéma (item_type, version) et retourne metadata.
+        Sans schéma, aucune validation n'est faite.
+        Lève MetadataValidationError si des valeurs ne respectent pas le schéma.
         """
-        return metadata
\ No newline at end of file
+        if schema is None or not isinstance(metadata, dict):
+            return metadata
+        errors = cls.get_validator(item_type, version, schema)(metadata)
+        if errors:
+            raise MetadataValidationError(errors)
+        return metadata
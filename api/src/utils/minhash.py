@@ -0,0 +1,95 @@
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from utils.text_vectors import normalize_text
+
+_WORD = re.compile(r"\w+")
+
+# Graine des fonctions de hachage : les signatures doivent être comparables d'un processus à l'autre
+MINHASH_SEED = 20240611
+
+
+def shingles(text: str, size: int = 5) -> np.ndarray:
+    """
+    Fragments de `size` octets consécutifs du texte normalisé (minuscules, sans accents,
+    ponctuation réduite à un espace), chacun codé exactement sur un entier, sans doublons.
+    Un texte plus court que `size` forme un seul fragment ; un texte vide n'en a aucun.
+    """
+    data = " ".join(_WORD.findall(normalize_text(text))).encode("utf-8")
+    if not data:
+        return np.zeros(0, dtype=np.uint64)
+    data = np.frombuffer(data.ljust(size), dtype=np.uint8).astype(np.uint64)
+    count = len(data) - size + 1
+    # octet i de chaque fenêtre décalé de 8·(size - 1 - i) bits : un entier par fragment
+    values = data[:count].copy()
+    for offset in range(1, size):
+        values <<= np.uint64(8)
+        values |= data[offset:offset + count]
+    return np.unique(values)
+
+
+class MinHasher:
+    """
+    Signatures MinHash de `num_perm` composantes (uint32) et clés LSH par bandes.
+
+    Chaque composante est le minimum, sur les fragments du texte, d'une fonction de
+    hachage multiply-shift ((a·x + b) mod 2^64) >> 32 : la proportion de composantes
+    égales entre deux signatures estime la similarité de Jaccard des deux textes.
+
+    Les `bands` bandes de num_perm / bands composantes donnent chacune une clé : deux
+    textes partagent au moins une clé avec une probabilité 1 - (1 - J^r)^b, proche de 1
+    au-dessus du seuil (1 / b)^(1 / r) (0,5 pour 64 composantes en 16 bandes).
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = MINHASH_SEED):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+        # combinaison des composantes d'une bande en une clé 64 bits, distincte par bande
+        self._band_mix = rng.integers(1, 2 ** 63, self.rows, dtype=np.uint64) | np.uint64(1)
+        self._band_salt = rng.integers(0, 2 ** 63, bands, dtype=np.uint64)
+
+    @property
+    def threshold(self) -> float:
+        """Similarité à partir de laquelle deux textes ont plus d'une chance sur deux d'être candidats."""
+        return (1 / self.bands) ** (1 / self.rows)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """Signature (num_perm,) en uint32, ou None pour un texte sans fragment."""
+        values = shingles(text)
+        if not len(values):
+            return None
+        # les produits débordent volontairement : arithmétique modulo 2^64
+        hashed = (values[:, None] * self._a[None, :] + self._b[None, :]) >> np.uint64(32)
+        return hashed.min(axis=0).astype(np.uint32)
+
+    def band_keys(self, signature: np.ndarray) -> List[int]:
+        """Clés LSH (entiers 64 bits signés, stockables tels quels dans Mongo), une par bande."""
+        bands = signature.astype(np.uint64).reshape(self.bands, self.rows)
+        keys = (bands * self._band_mix[None, :]).sum(axis=1, dtype=np.uint64) + self._band_salt
+        return keys.view(np.int64).tolist()
+
+    def sketch(self, text: str) -> Tuple[Optional[bytes], List[int]]:
+        """Signature sérialisée (octets) et clés LSH d'un texte ; (None, []) s'il est vide."""
+        signature = self.signature(text)
+        if signature is None:
+            return None, []
+        return signature.tobytes(), self.band_keys(signature)
+
+    def similarities(self, signature: np.ndarray, candidates: List[bytes]) -> np.ndarray:
+        """Jaccard estimée entre une signature et des signatures sérialisées (autre taille : 0)."""
+        size = self.num_perm * 4
+        valid = [index for index, raw in enumerate(candidates) if raw is not None and len(raw) == size]
+        scores = np.zeros(len(candidates), dtype=np.float32)
+        if valid:
+            matrix = np.frombuffer(b"".join(candidates[index] for index in valid), dtype=np.uint32)
+            matrix = matrix.reshape(len(valid), self.num_perm)
+            scores[valid] = (matrix == signature[None, :]).mean(axis=1)
+        return scores
@@ -0,0 +1,82 @@
+from functools import lru_cache
+from typing import Any, Optional, Tuple, Type
+
+from beanie import PydanticObjectId
+from pydantic import BaseModel, ConfigDict, Field, create_model
+
+from models.item import Item
+
+
+class ItemProjectionBase(BaseModel):
+    """
+    Base des modèles de projection d'Item : seul l'identifiant est toujours présent.
+    """
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: PydanticObjectId = Field(alias="_id")
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """
+    Transforme le paramètre `fields` ("title,status") en tuple trié de champs d'Item.
+    Lève ValueError si un champ n'existe pas sur le modèle Item.
+    """
+    if not fields:
+        return ()
+    names = tuple(sorted({name.strip() for name in fields.split(",") if name.strip()} - {"id", "_id"}))
+    # les champs exclus de la sérialisation (revision_id, minhash...) ne sont pas projetables
+    unknown = [name for name in names if name not in Item.model_fields or Item.model_fields[name].exclude]
+    if unknown:
+        raise ValueError(f"Unknown item fields: {', '.join(unknown)}")
+    return names
+
+
+@lru_cache(maxsize=128)
+def item_projection_model(fields: Tuple[str, ...]) -> Type[ItemProjectionBase]:
+    """
+    Génère (une seule fois par combinaison de champs) un modèle de projection Beanie
+    ne contenant que les champs demandés. Les champs sont optionnels afin de
+    supporter les documents anciens où ils sont absents.
+    """
+    definitions = {
+        name: (Optional[Item.model_fields[name].annotation], None)
+        for name in fields
+    }
+    return create_model(
+        "ItemProjection_" + "_".join(fields),
+        __base__=ItemProjectionBase,
+        **definitions,
+    )
+
+
+def projection_output_fields(fields: Tuple[str, ...]) -> Tuple[Tuple[str, None, None], ...]:
+    """
+    Champs de sortie d'une projection pour la sérialisation brute (voir utils/raw_documents.py) :
+    `_id` puis les champs demandés, null s'ils sont absents du document.
+    """
+    return (("_id", None, None),) + tuple((name, None, None) for name in fields)
+
+
+# Marque ajoutée à une chaîne tronquée par truncate_texts
+TRUNCATION_MARK = "…"
+# Valeurs jamais tronquées : identifiants, énumérations courtes et dates
+UNTRUNCATED_KEYS = frozenset({"_id", "board_id", "type", "status", "created_at", "updated_at"})
+
+
+def truncate_texts(value: Any, max_text: Optional[int]) -> Any:
+    """
+    Tronque à `max_text` caractères (plus TRUNCATION_MARK) les chaînes d'un document de
+    sortie, y compris dans metadata et checklist. Sans max_text, le document est inchangé.
+    """
+    if not max_text:
+        return value
+    if isinstance(value, str):
+        return value if len(value) <= max_text else value[:max_text] + TRUNCATION_MARK
+    if isinstance(value, dict):
+        return {
+            key: item if key in UNTRUNCATED_KEYS else truncate_texts(item, max_text)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [truncate_texts(item, max_text) for item in value]
+    return value
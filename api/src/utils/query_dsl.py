@@ -0,0 +1,257 @@
+"""
+Langage de filtre de GET /items/by_board/{board_id} : la query string est compilée
+en un filtre Mongo, les valeurs étant converties selon le type du champ.
+
+    status=todo                    égalité
+    status__ne=done                différent
+    status__in=todo,review         dans la liste (__nin : hors de la liste)
+    metadata.points__gte=3         comparaisons : __gt, __gte, __lt, __lte
+    metadata.owner__exists=false   présence du champ
+    sort=-updated_at,title         tri (préfixe "-" : décroissant)
+
+Les champs d'Item sont typés par le modèle, les champs `metadata.<chemin>` par le
+registre des schémas (ItemSchema) : `metadata.points=3` cible l'entier 3. Une valeur
+compatible avec plusieurs types connus du chemin (ex: int dans un schéma, str dans un
+autre) est cherchée sous chacune de ses formes.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union, get_args, get_origin
+
+from models.item import Item
+
+# Suffixe de la query string -> opérateur Mongo
+OPERATORS = {
+    "eq": "$eq",
+    "ne": "$ne",
+    "gt": "$gt",
+    "gte": "$gte",
+    "lt": "$lt",
+    "lte": "$lte",
+    "in": "$in",
+    "nin": "$nin",
+    "exists": "$exists",
+}
+
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte"}
+
+# Ordre de conversion d'une valeur quand un chemin a plusieurs types
+_TYPE_PRIORITY = ("NoneType", "bool", "int", "float", "datetime", "str")
+
+_SCALAR_TYPES = {str: "str", int: "int", float: "float", bool: "bool", datetime: "datetime"}
+
+
+class QueryError(ValueError):
+    """Filtre invalide (champ inconnu, opérateur inconnu, valeur non convertible)."""
+
+
+def _field_type(annotation: Any) -> Optional[str]:
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        annotation = args[0] if len(args) == 1 else None
+    return _SCALAR_TYPES.get(annotation)
+
+
+# Champs scalaires d'Item filtrables et triables (board_id est porté par l'URL)
+ITEM_FIELD_TYPES: Dict[str, str] = {
+    name: type_name
+    for name, info in Item.model_fields.items()
+    if name != "board_id" and not info.exclude and (type_name := _field_type(info.annotation))
+}
+
+
+@dataclass
+class ItemQuery:
+    filter: Dict[str, Any]
+    sort: List[Tuple[str, int]] = field(default_factory=list)
+    # Chemins metadata filtrés (pour le conseiller d'index)
+    metadata_keys: List[str] = field(default_factory=list)
+
+
+def _parse_bool(raw: str) -> Optional[bool]:
+    lowered = raw.strip().lower()
+    if lowered in ("true", "1", "yes"):
+        return True
+    if lowered in ("false", "0", "no"):
+        return False
+    return None
+
+
+def _parse_datetime(raw: str) -> Optional[datetime]:
+    try:
+        value = datetime.fromisoformat(raw.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    # Mongo stocke en UTC : une date sans fuseau est considérée comme UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _convert(raw: str, type_name: str) -> Tuple[bool, Any]:
+    if type_name == "str":
+        return True, raw
+    if type_name == "NoneType":
+        return raw == "null", None
+    if type_name == "bool":
+        lowered = raw.strip().lower()
+        return lowered in ("true", "false"), lowered == "true"
+    if type_name == "int":
+        try:
+            return True, int(raw)
+        except ValueError:
+            return False, None
+    if type_name == "float":
+        try:
+            return True, float(raw)
+        except ValueError:
+            return False, None
+    if type_name == "datetime":
+        value = _parse_datetime(raw)
+        return value is not None, value
+    return False, None
+
+
+def coerce_value(path: str, raw: str, types: Set[str]) -> List[Any]:
+    """
+    Formes possibles de `raw` pour les types connus d'un champ, dans l'ordre de
+    _TYPE_PRIORITY. Sans type connu, la chaîne est gardée telle quelle.
+    """
+    if not types:
+        return [raw]
+    candidates: List[Any] = []
+    for type_name in _TYPE_PRIORITY:
+        if type_name in types:
+            ok, value = _convert(raw, type_name)
+            if ok and value not in candidates:
+                candidates.append(value)
+    if not candidates:
+        expected = " | ".join(sorted(types))
+        raise QueryError(f"Invalid value {raw!r} for {path} (expected {expected})")
+    return candidates
+
+
+def _split_key(key: str) -> Tuple[str, str]:
+    path, sep, suffix = key.rpartition("__")
+    if sep and suffix in OPERATORS:
+        return path, suffix
+    if sep and path in ITEM_FIELD_TYPES:
+        raise QueryError(f"Unknown operator: __{suffix}")
+    return key, "eq"
+
+
+def _resolve_path(path: str, metadata_types: Dict[str, Set[str]]) -> Set[str]:
+    if path.startswith("metadata."):
+        sub_path = path.split(".", 1)[1]
+        if not sub_path:
+            raise QueryError(f"Invalid field: {path}")
+        # Clé absente du registre (données antérieures aux schémas) : comparaison textuelle
+        return metadata_types.get(sub_path, set())
+    if path not in ITEM_FIELD_TYPES:
+        raise QueryError(f"Unknown item field: {path}")
+    return {ITEM_FIELD_TYPES[path]}
+
+
+def _condition(path: str, operator: str, raw: str, types: Set[str]) -> Dict[str, Any]:
+    if operator == "$exists":
+        value = _parse_bool(raw)
+        if value is None:
+            raise QueryError(f"Invalid value {raw!r} for {path}__exists (expected true or false)")
+        return {"$exists": value}
+    if operator in ("$in", "$nin"):
+        values: List[Any] = []
+        for part in raw.split(","):
+            for value in coerce_value(path, part.strip(), types):
+                if value not in values:
+                    values.append(value)
+        return {operator: values}
+    candidates = coerce_value(path, raw, types)
+    if operator in RANGE_OPERATORS:
+        # Mongo ne compare que des valeurs de même type : la forme la plus typée est retenue
+        typed = [value for value in candidates if value is not None]
+        if not typed:
+            raise QueryError(f"Invalid value {raw!r} for {path}__{operator[1:]}")
+        return {operator: typed[0]}
+    if len(candidates) == 1:
+        return {operator: candidates[0]}
+    return {"$in" if operator == "$eq" else "$nin": candidates}
+
+
+def _same_value(a: Any, b: Any) -> bool:
+    # 1 == True en Python, mais pas pour Mongo
+    return type(a) is type(b) and a == b
+
+
+def _merge_condition(ops: Dict[str, Any], condition: Dict[str, Any]) -> None:
+    """
+    Ajoute `condition` aux opérateurs d'un champ. Une égalité multi-types compilée en
+    $in (ou une différence en $nin) peut rencontrer le __in (__nin) du même champ :
+    les deux listes sont alors combinées (intersection pour $in, union pour $nin).
+    """
+    for operator, value in condition.items():
+        if operator not in ops:
+            ops[operator] = value
+        elif operator == "$in":
+            ops[operator] = [item for item in ops[operator] if any(_same_value(item, other) for other in value)]
+        elif operator == "$nin":
+            ops[operator] = ops[operator] + [
+                item for item in value if not any(_same_value(item, other) for other in ops[operator])
+            ]
+
+
+def _parse_sort(raw: str, metadata_types: Dict[str, Set[str]]) -> List[Tuple[str, int]]:
+    sort: List[Tuple[str, int]] = []
+    for part in raw.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        direction = -1 if part.startswith("-") else 1
+        path = part.lstrip("+-")
+        if path not in ("_id", "id"):
+            _resolve_path(path, metadata_types)
+        sort.append(("_id" if path == "id" else path, direction))
+    # Départage par _id : ordre stable d'une requête à l'autre
+    if sort and sort[-1][0] != "_id":
+        sort.append(("_id", 1))
+    return sort
+
+
+def compile_item_query(
+    board_id: str,
+    query_params: Iterable[Tuple[str, str]],
+    metadata_types: Dict[str, Set[str]],
+    reserved: Iterable[str] = (),
+) -> ItemQuery:
+    """
+    Compile les paramètres de filtre et de tri en requête Mongo sur les items d'un board.
+
+    Le filtre ne contient que des comparaisons directes sur des champs (pas de $where,
+    $expr ni d'expression régulière) : l'égalité sur board_id et les autres champs
+    peut être servie par les index (board_id, board_status_updated, index metadata
+    du conseiller). Lève QueryError sur un champ ou un opérateur inconnu.
+    """
+    reserved = set(reserved)
+    conditions: Dict[str, Dict[str, Any]] = {}
+    # Opérateurs demandés par champ (avant compilation) : chacun une seule fois
+    requested: Dict[str, Set[str]] = {}
+    metadata_keys: List[str] = []
+    sort: List[Tuple[str, int]] = []
+    for key, raw in query_params:
+        if key == "sort":
+            sort = _parse_sort(raw, metadata_types)
+            continue
+        if key in reserved:
+            continue
+        path, suffix = _split_key(key)
+        operator = OPERATORS[suffix]
+        types = _resolve_path(path, metadata_types)
+        if operator in requested.setdefault(path, set()):
+            raise QueryError(f"Duplicate filter: {key}")
+        requested[path].add(operator)
+        _merge_condition(conditions.setdefault(path, {}), _condition(path, operator, raw, types))
+        if path.startswith("metadata.") and path.split(".", 1)[1] not in metadata_keys:
+            metadata_keys.append(path.split(".", 1)[1])
+
+    query: Dict[str, Any] = {"board_id": board_id}
+    for path, ops in conditions.items():
+        # {"status": "todo"} plutôt que {"status": {"$eq": "todo"}}
+        query[path] = ops["$eq"] if list(ops) == ["$eq"] else ops
+    return ItemQuery(filter=query, sort=sort, metadata_keys=metadata_keys)
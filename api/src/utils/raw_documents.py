@@ -0,0 +1,101 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+import orjson
+from beanie import Document
+from fastapi.responses import Response
+from pydantic_core import PydanticUndefined
+
+# Champ de sortie : (clé JSON, valeur par défaut, fabrique de la valeur par défaut)
+OutputField = Tuple[str, Any, Optional[Callable[[], Any]]]
+
+
+def _default(value: Any) -> Any:
+    # Types BSON non gérés nativement par orjson (ObjectId, Decimal128...) : forme texte
+    return str(value)
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encode en JSON avec orjson. Les ObjectId deviennent des chaînes ; les datetimes
+    sont au même format que la sérialisation Pydantic (UTC suffixé par "Z").
+    """
+    return orjson.dumps(value, default=_default, option=orjson.OPT_UTC_Z)
+
+
+@lru_cache(maxsize=None)
+def output_fields(model: Type[Document]) -> Tuple[OutputField, ...]:
+    """
+    Champs sérialisés par le response_model (clé JSON = alias, ex: "_id"), dans l'ordre
+    du modèle, avec leur valeur par défaut. Les champs exclus (revision_id) sont ignorés.
+    """
+    fields = []
+    for name, field in model.model_fields.items():
+        if field.exclude:
+            continue
+        default = None if field.default is PydanticUndefined else field.default
+        fields.append((field.alias or name, default, field.default_factory))
+    return tuple(fields)
+
+
+@lru_cache(maxsize=None)
+def mongo_projection(model: Type[Document]) -> Dict[str, int]:
+    """Projection Mongo limitée aux champs de sortie du modèle."""
+    return {key: 1 for key, _, _ in output_fields(model)}
+
+
+def shape_document(doc: Dict[str, Any], fields: Sequence[OutputField]) -> Dict[str, Any]:
+    """
+    Met un document BSON brut à la forme du response_model : champs dans l'ordre du
+    modèle, valeurs par défaut pour les champs absents (documents anciens).
+    """
+    shaped = {}
+    for key, default, factory in fields:
+        if key in doc:
+            shaped[key] = doc[key]
+        else:
+            shaped[key] = factory() if factory is not None else default
+    return shaped
+
+
+async def find_raw(
+    model: Type[Document],
+    query: Dict[str, Any],
+    projection: Optional[Dict[str, int]] = None,
+    sort: Optional[List[Tuple[str, int]]] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Lit des documents via Motor sans construire de modèles Beanie.
+    Par défaut la projection se limite aux champs du modèle.
+    """
+    cursor = model.get_motor_collection().find(query, projection or mongo_projection(model))
+    if sort:
+        cursor = cursor.sort(sort)
+    if limit:
+        cursor = cursor.limit(limit)
+    return await cursor.to_list(length=None)
+
+
+class RawJSONResponse(Response):
+    """Réponse JSON encodée par orjson, sans validation par un response_model."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def raw_documents_response(
+    model: Type[Document],
+    docs: Iterable[Dict[str, Any]],
+    headers: Optional[Dict[str, str]] = None,
+) -> RawJSONResponse:
+    """Liste de documents bruts sérialisée comme le ferait response_model=List[model]."""
+    fields = output_fields(model)
+    return RawJSONResponse([shape_document(doc, fields) for doc in docs], headers=headers)
+
+
+def json_response(body: bytes, headers: Optional[Dict[str, str]] = None, status_code: int = 200) -> Response:
+    """Réponse à partir d'un corps JSON déjà encodé (ex: servi depuis le cache)."""
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
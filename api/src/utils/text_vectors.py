@@ -0,0 +1,84 @@
+import re
+import unicodedata
+import zlib
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+# Taille maximale du cache mot -> composantes de HashingEmbedder
+MAX_CACHED_WORDS = 100_000
+
+
+def normalize_text(text: str) -> str:
+    """Minuscules sans accents : "Créer l'Écran" et "creer l'ecran" ont les mêmes traits."""
+    text = text.lower()
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class HashingEmbedder:
+    """
+    Vectoriseur local (sans modèle ni réseau) : mots, bigrammes de mots et n-grammes
+    de caractères, hachés (crc32, stable d'un processus à l'autre) dans `dim` composantes.
+
+    Les vecteurs sont des fréquences de termes amorties (log(1 + tf)), non normalisées :
+    la pondération IDF et la normalisation sont faites par l'index (uses_idf).
+    Les n-grammes de caractères rapprochent les variantes d'un même mot
+    ("export", "exporter", "exports").
+    """
+
+    uses_idf = True
+
+    def __init__(self, dim: int = 1024, char_ngram: int = 4, char_weight: float = 0.25):
+        self.dim = dim
+        self.char_ngram = char_ngram
+        # un mot produit beaucoup de n-grammes : sans pondération ils domineraient les mots entiers
+        self.char_weight = char_weight
+        # mot -> composantes du mot et de ses n-grammes : le vocabulaire d'un board se répète
+        self._word_buckets: Dict[str, Tuple[int, ...]] = {}
+
+    def _hash(self, feature: str) -> int:
+        return zlib.crc32(feature.encode("utf-8")) % self.dim
+
+    def _word(self, word: str) -> Tuple[int, ...]:
+        """Composante du mot suivie de celles de ses n-grammes de caractères."""
+        buckets = self._word_buckets.get(word)
+        if buckets is None:
+            n = self.char_ngram
+            grams = []
+            if len(word) > n:
+                padded = f"<{word}>"
+                grams = ["#" + padded[i:i + n] for i in range(len(padded) - n + 1)]
+            buckets = (self._hash(word),) + tuple(self._hash(gram) for gram in grams)
+            if len(self._word_buckets) < MAX_CACHED_WORDS:
+                self._word_buckets[word] = buckets
+        return buckets
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Matrice (len(texts), dim) en float32, une ligne par texte : mots et bigrammes
+        de mots (poids 1), n-grammes de caractères (poids char_weight).
+        """
+        word_cells: List[int] = []
+        gram_cells: List[int] = []
+        for row, text in enumerate(texts):
+            offset = row * self.dim
+            words = _WORD.findall(normalize_text(text))
+            for word in words:
+                buckets = self._word(word)
+                word_cells.append(offset + buckets[0])
+                gram_cells.extend(offset + bucket for bucket in buckets[1:])
+            word_cells.extend(offset + self._hash(f"{first} {second}") for first, second in zip(words, words[1:]))
+        # une seule accumulation par poids pour tout le lot (cellules de la matrice aplatie)
+        size = len(texts) * self.dim
+        flat = np.bincount(np.asarray(word_cells, dtype=np.int64), minlength=size).astype(np.float32)
+        if gram_cells:
+            flat += self.char_weight * np.bincount(np.asarray(gram_cells, dtype=np.int64), minlength=size)
+        matrix = flat.reshape(len(texts), self.dim)
+        # fréquences amorties : un mot répété dix fois ne pèse pas dix fois plus
+        np.log1p(matrix, out=matrix)
+        return matrix
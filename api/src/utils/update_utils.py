@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Type, TypeVar
+
+from beanie import Document, PydanticObjectId
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from pymongo import ReturnDocument
+
+# Champs gérés par le serveur, jamais modifiables par un patch
+PROTECTED_FIELDS = {"id", "_id", "revision_id", "revision", "created_at", "minhash", "lsh_buckets"}
+
+DocType = TypeVar("DocType", bound=Document)
+
+
+def _check_merge_key(field: str, key: Any) -> None:
+    # Une clé devient un segment de chemin Mongo : "$", "." ou NUL changeraient la cible du $set
+    if not isinstance(key, str) or not key or key.startswith("$") or "." in key or "\x00" in key:
+        raise ValueError(f"Invalid {field} key {key!r}: keys must be non-empty and cannot start with '$' or contain '.' or NUL")
+
+
+def build_set_update(
+    model: Type[BaseModel],
+    patch_data: Dict[str, Any],
+    merge_fields: Iterable[str] = ("metadata",),
+) -> Dict[str, Any]:
+    """
+    Traduit un patch partiel en document `$set` Mongo.
+
+    Les champs de `merge_fields` (par défaut metadata) sont fusionnés clé par clé
+    via des chemins pointés (`metadata.<clé>`) au lieu d'être remplacés.
+    `updated_at` est renseigné automatiquement.
+    Lève ValueError si un champ n'existe pas sur le modèle, ou si une clé fusionnée
+    commence par `$` ou contient `.` ou NUL.
+    """
+    merge_fields = set(merge_fields)
+    unknown = [
+        field for field in patch_data
+        if field not in model.model_fields or field in PROTECTED_FIELDS
+    ]
+    if unknown:
+        raise ValueError(f"Unknown or read-only fields: {', '.join(unknown)}")
+    set_fields: Dict[str, Any] = {}
+    for field, value in patch_data.items():
+        if field in merge_fields and isinstance(value, dict):
+            for key, sub_value in value.items():
+                _check_merge_key(field, key)
+                set_fields[f"{field}.{key}"] = sub_value
+        else:
+            set_fields[field] = value
+    set_fields["updated_at"] = datetime.now(timezone.utc)
+    return set_fields
+
+
+def strip_protected_fields(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Retire d'un dict les champs gérés par le serveur (id, revision, created_at...).
+    """
+    return {field: value for field, value in data.items() if field not in PROTECTED_FIELDS}
+
+
+def revision_filter(expected_revision: int) -> Dict[str, Any]:
+    """
+    Filtre de concurrence optimiste sur le champ `revision`.
+    Les documents créés avant l'ajout de ce champ sont considérés en révision 0.
+    """
+    if expected_revision == 0:
+        return {"$or": [{"revision": 0}, {"revision": {"$exists": False}}]}
+    return {"revision": expected_revision}
+
+
+async def atomic_update(
+    model: Type[DocType],
+    id: PydanticObjectId,
+    set_fields: Dict[str, Any],
+    expected_revision: Optional[int] = None,
+    not_found_detail: str = "Document not found",
+) -> DocType:
+    """
+    Applique `$set` + incrément de `revision` en un seul find_one_and_update
+    et retourne le document après modification.
+
+    Si `expected_revision` est fourni et ne correspond plus au document, lève une
+    HTTPException 409 (modification concurrente) ; 404 si le document n'existe pas.
+    """
+    query: Dict[str, Any] = {"_id": id}
+    if expected_revision is not None:
+        query.update(revision_filter(expected_revision))
+    raw = await model.get_motor_collection().find_one_and_update(
+        query,
+        {"$set": set_fields, "$inc": {"revision": 1}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if raw is None:
+        # Chemin d'erreur uniquement : distinguer document absent et conflit de révision
+        if expected_revision is not None and await model.find_one({"_id": id}) is not None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Revision mismatch: the document was modified concurrently",
+            )
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=not_found_detail)
+    return model.model_validate(raw)
@@ -0,0 +1,47 @@
+"""
+Tests de l'API sur une base en mémoire (mongomock-motor) : pas de mongod nécessaire,
+mais pas de transactions ni de $text.
+"""
+import os
+import sys
+import warnings
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+import httpx  # noqa: E402
+from beanie import init_beanie  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+from core.database import DOCUMENT_MODELS  # noqa: E402
+from services.board_stats import invalidate_board_stats  # noqa: E402
+from services.schema_service import invalidate_schema_cache  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def database():
+    """Base vide, modèles Beanie initialisés avec leurs index."""
+    client = AsyncMongoMockClient()
+    await init_beanie(database=client["ai_board_test"], document_models=DOCUMENT_MODELS)
+    invalidate_schema_cache()
+    yield client["ai_board_test"]
+    invalidate_schema_cache()
+
+
+@pytest.fixture
+async def api(database):
+    """Client HTTP de l'API en process (sans lifespan : ni runner de jobs ni change streams)."""
+    import main
+
+    invalidate_board_stats()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        yield client
+    invalidate_board_stats()
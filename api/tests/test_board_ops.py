@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from models.item import Item
+from services import board_ops
+
+pytestmark = pytest.mark.anyio
+
+
+async def _items(api, board_id: str, count: int):
+    for index in range(count):
+        await api.post("/items/", json={"title": f"Item {index}", "type": "task", "board_id": board_id})
+
+
+async def test_cascade_deletes_every_item_of_the_board_only(api):
+    board = (await api.post("/boards/", json={"name": "deleted"})).json()["_id"]
+    other = (await api.post("/boards/", json={"name": "kept"})).json()["_id"]
+    await _items(api, board, 3)
+    await _items(api, other, 2)
+
+    assert await board_ops.delete_board_cascade(board) == {"deleted_items": 3}
+    assert await Item.find(Item.board_id == board).count() == 0
+    assert await Item.find(Item.board_id == other).count() == 2
+    assert (await api.get(f"/boards/{board}")).status_code == 404
+
+
+
+async def test_move_only_touches_items_of_the_source_board(api):
+    source = (await api.post("/boards/", json={"name": "source"})).json()["_id"]
+    target = (await api.post("/boards/", json={"name": "target"})).json()["_id"]
+    other = (await api.post("/boards/", json={"name": "other"})).json()["_id"]
+    await _items(api, source, 3)
+    await _items(api, other, 1)
+
+    assert await board_ops.move_board_items(source, target) == {"moved_items": 3}
+    assert await Item.find(Item.board_id == target).count() == 3
+    assert await Item.find(Item.board_id == other).count() == 1
+
+
+@pytest.fixture
+def board_job_runner(monkeypatch):
+    from core.config import settings
+    from services.jobs import JobRunner
+
+    monkeypatch.setattr(settings, "board_ops_background_threshold", 2)
+    monkeypatch.setattr(settings, "board_ops_batch_size", 2)
+    runner = JobRunner(1, poll_interval=0.05, stale_after=30, max_attempts=3)
+    runner.handlers.update({kind: board_ops.job_runner.handlers[kind] for kind in board_ops.BOARD_JOBS})
+    return runner
+
+
+async def _finished_job(api, runner, job_id: str) -> dict:
+    await runner.start()
+    try:
+        for _ in range(500):
+            job = (await api.get(f"/boards/jobs/{job_id}")).json()
+            if job["status"] in ("done", "failed", "cancelled"):
+                return job
+            await asyncio.sleep(0.01)
+    finally:
+        await runner.stop()
+    raise AssertionError(f"job {job_id} still {job['status']}")
+
+
+async def test_large_cascade_runs_as_a_runner_job(api, board_job_runner):
+    board = (await api.post("/boards/", json={"name": "large"})).json()["_id"]
+    await _items(api, board, 5)
+
+    response = await api.delete(f"/boards/{board}", params={"cascade": "true"})
+    assert response.status_code == 202
+    job = response.json()
+    assert (job["kind"], job["status"], job["total"]) == (board_ops.DELETE_CASCADE_JOB, "queued", 5)
+    assert response.headers["location"] == f"/boards/jobs/{job['_id']}"
+
+    job = await _finished_job(api, board_job_runner, job["_id"])
+    assert (job["status"], job["processed"], job["result"]) == ("done", 5, {"deleted_items": 5})
+    assert await Item.find(Item.board_id == board).count() == 0
+    assert (await api.get(f"/boards/{board}")).status_code == 404
+
+
+async def test_large_move_runs_as_a_runner_job(api, board_job_runner):
+    source = (await api.post("/boards/", json={"name": "source"})).json()["_id"]
+    target = (await api.post("/boards/", json={"name": "target"})).json()["_id"]
+    await _items(api, source, 5)
+
+    response = await api.post(f"/boards/{source}/move-items", json={"target_board_id": target})
+    assert response.status_code == 202
+    job = await _finished_job(api, board_job_runner, response.json()["_id"])
+    assert (job["status"], job["result"]) == ("done", {"moved_items": 5})
+    assert await Item.find(Item.board_id == target).count() == 5
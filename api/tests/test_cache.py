@@ -0,0 +1,26 @@
+import pytest
+
+from core.config import settings
+from services import cache
+from services.events import event_bus
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    monkeypatch.setattr(cache.document_cache, "backend", cache.MemoryCache(30, 100))
+    return cache.document_cache
+
+
+@pytest.mark.parametrize(
+    "workers, source, expected",
+    [
+        (1, "routes", cache.MemoryCache),
+        (4, "routes", cache.NullCache),
+        (4, "change_stream", cache.MemoryCache),
+    ],
+)
+def test_memory_cache_needs_one_worker_or_change_streams(memory_cache, monkeypatch, workers, source, expected):
+    monkeypatch.setattr(settings, "web_concurrency", workers)
+    monkeypatch.setattr(event_bus, "source", source)
+    cache.check_cache_backend()
+    assert type(memory_cache.backend) is expected
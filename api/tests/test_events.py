@@ -0,0 +1,59 @@
+import pytest
+
+from api.v1.items import BulkItemResult, BulkItemUpdate, _publish_bulk_updates
+from models.item import Item
+from services import events
+from services.events import EPOCH, EventBus, event_bus
+
+pytestmark = pytest.mark.anyio
+
+
+def test_history_of_idle_boards_is_evicted():
+    bus = EventBus(history_size=10, history_boards=2)
+    watched = bus.subscribe("watched")
+    for board_id in ("a", "b", "c"):
+        bus.unsubscribe(board_id, bus.subscribe(board_id))
+        bus.publish(board_id, "created", board_id)
+    assert list(bus._history) == ["watched", "c"]
+    assert bus.publish("watched", "created", "w").seq == 4
+    assert [event.item_id for event in bus.events_since("watched", f"{EPOCH}-0")] == ["w"]
+
+    # l'historique de "a" a été oublié : reprise impossible, même après un nouvel abonnement
+    bus.subscribe("a")
+    assert bus.events_since("a", f"{EPOCH}-0") is None
+    assert bus.events_since("a", f"{EPOCH}-{bus.last_seq}") == []
+    bus.unsubscribe("watched", watched)
+
+
+def test_item_is_serialized_only_when_retained_or_read(monkeypatch):
+    encoded = []
+    encoder = events.jsonable_encoder
+    monkeypatch.setattr(events, "jsonable_encoder", lambda obj, **kwargs: encoded.append(obj) or encoder(obj, **kwargs))
+    bus = EventBus(history_size=10, history_boards=10)
+    item = Item(title="t", type="task", board_id="board")
+
+    unwatched = bus.publish("board", "created", "1", item)
+    assert encoded == []
+    assert unwatched.item["board_id"] == "board"
+    assert len(encoded) == 1
+
+    queue = bus.subscribe("board")
+    bus.publish("board", "created", "2", item)
+    assert len(encoded) == 2
+    assert queue.get_nowait().item["title"] == "t"
+    assert len(encoded) == 2
+
+
+async def test_bulk_patch_reaches_listeners_without_subscribers(database):
+    # mongomock ne gère pas le bulk_write de PATCH /items/bulk : seule la publication est testée
+    item = Item(title="t", type="task", board_id="board")
+    await item.insert()
+    update = BulkItemUpdate(id=item.id, data={"status": "done"})
+    result = BulkItemResult(index=0, id=str(item.id), status="updated")
+    seen = []
+    event_bus.add_listener(seen.append)
+    try:
+        await _publish_bulk_updates([update], [result], [0], [{"status": "done"}])
+    finally:
+        event_bus._listeners.remove(seen.append)
+    assert [(event.board_id, event.changes) for event in seen] == [("board", {"status": "done"})]
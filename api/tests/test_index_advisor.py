@@ -0,0 +1,41 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+from core.config import settings
+from models.item_schema import ItemSchema
+from services import index_advisor
+from utils.item_schema_utils import generate_metadata_schema, merge_metadata_schemas
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_known_types_include_union_members(database):
+    schema = merge_metadata_schemas(
+        generate_metadata_schema({"owner": None, "tags": ["a"], "estimate": {"points": 1}}),
+        generate_metadata_schema({"owner": "alice", "tags": [1], "estimate": {"points": 2}}),
+    )
+    await ItemSchema(item_type="task", version=1, schema=schema).insert()
+    assert await index_advisor.known_metadata_types("owner") == ["NoneType", "str"]
+    assert await index_advisor.known_metadata_types("tags") == ["int", "str"]
+    assert await index_advisor.known_metadata_types("estimate") == ["dict"]
+    assert await index_advisor.known_metadata_types("missing") == []
+
+
+async def test_evaluation_tasks_are_kept_until_done(database, monkeypatch):
+    monkeypatch.setattr(settings, "index_advisor_threshold", 1)
+    monkeypatch.setattr(index_advisor, "_filter_counts", Counter())
+    monkeypatch.setattr(index_advisor, "_evaluated_keys", set())
+    release = asyncio.Event()
+
+    async def evaluate(key):
+        await release.wait()
+
+    monkeypatch.setattr(index_advisor, "_evaluate_key", evaluate)
+    index_advisor.record_metadata_filters(["priority"])
+    assert len(index_advisor._tasks) == 1
+    release.set()
+    await asyncio.gather(*index_advisor._tasks)
+    await asyncio.sleep(0)
+    assert not index_advisor._tasks
@@ -0,0 +1,51 @@
+import pytest
+
+from core.config import settings
+from models.item import Item
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def strict_validation(monkeypatch):
+    monkeypatch.setattr(settings, "metadata_validation", "strict")
+
+
+async def _board_with_schema(api) -> str:
+    board = (await api.post("/boards/", json={"name": "b"})).json()["_id"]
+    created = await api.post("/items/", json={
+        "title": "first", "type": "task", "board_id": board, "metadata": {"points": 1},
+    })
+    assert created.status_code == 201, created.text
+    return board
+
+
+def _entries(board: str):
+    return [
+        {"title": "valid 1", "type": "task", "board_id": board, "metadata": {"points": 2}},
+        {"title": "invalid", "type": "task", "board_id": board, "metadata": {"points": "many"}},
+        {"title": "valid 2", "type": "task", "board_id": board, "metadata": {"points": 3}},
+    ]
+
+
+async def test_unordered_bulk_reports_invalid_metadata_per_entry(api, strict_validation):
+    board = await _board_with_schema(api)
+    response = await api.post("/items/bulk", params={"ordered": "false"}, json=_entries(board))
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [result["status"] for result in body["results"]] == ["created", "error", "created"]
+    assert "metadata.points: expected int, got str" in body["results"][1]["error"]
+    assert (body["ok"], body["errors"]) == (2, 1)
+    titles = {item.title for item in await Item.find(Item.board_id == board).to_list()}
+    assert titles == {"first", "valid 1", "valid 2"}
+
+
+async def test_ordered_bulk_stops_at_invalid_metadata(api, strict_validation):
+    board = await _board_with_schema(api)
+    response = await api.post("/items/bulk", json=_entries(board))
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == ["created", "error", "error"]
+    assert results[2]["error"] == "not attempted (ordered batch aborted)"
+    titles = {item.title for item in await Item.find(Item.board_id == board).to_list()}
+    assert titles == {"first", "valid 1"}
@@ -0,0 +1,84 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _board(api, name: str) -> str:
+    return (await api.post("/boards/", json={"name": name})).json()["_id"]
+
+
+async def _total(api, board_id: str) -> int:
+    return (await api.get(f"/boards/{board_id}/stats")).json()["total_items"]
+
+
+async def test_patch_board_id_refreshes_both_boards(api):
+    source, target = await _board(api, "source"), await _board(api, "target")
+    item = (await api.post("/items/", json={"title": "t", "type": "task", "board_id": source})).json()
+    assert (await _total(api, source), await _total(api, target)) == (1, 0)
+    assert len((await api.get(f"/items/by_board/{source}")).json()) == 1
+
+    response = await api.patch(f"/items/{item['_id']}", json={"board_id": target})
+    assert response.status_code == 200
+
+    assert (await _total(api, source), await _total(api, target)) == (0, 1)
+    assert (await api.get(f"/items/by_board/{source}")).json() == []
+
+
+async def test_put_board_id_refreshes_both_boards(api):
+    source, target = await _board(api, "source"), await _board(api, "target")
+    item = (await api.post("/items/", json={"title": "t", "type": "task", "board_id": source})).json()
+    assert await _total(api, source) == 1
+
+    item["board_id"] = target
+    response = await api.put(f"/items/{item['_id']}", json=item)
+    assert response.status_code == 200
+
+    assert (await _total(api, source), await _total(api, target)) == (0, 1)
+
+
+def _drain(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+async def test_patch_board_id_notifies_the_previous_board(api):
+    from services.events import event_bus
+
+    source, target = await _board(api, "source"), await _board(api, "target")
+    item = (await api.post("/items/", json={"title": "t", "type": "task", "board_id": source})).json()
+    source_queue, target_queue = event_bus.subscribe(source), event_bus.subscribe(target)
+    try:
+        await api.patch(f"/items/{item['_id']}", json={"board_id": target})
+        left = _drain(source_queue)
+        joined = _drain(target_queue)
+    finally:
+        event_bus.unsubscribe(source, source_queue)
+        event_bus.unsubscribe(target, target_queue)
+
+    assert [(event.op, event.item_id, event.changes) for event in left] == [("updated", item["_id"], {"board_id": target})]
+    assert [(event.op, event.item["board_id"]) for event in joined] == [("updated", target)]
+
+
+def test_change_stream_board_change_notifies_the_previous_board():
+    from bson import ObjectId
+    from services.events import _publish_change, event_bus
+
+    item_id = ObjectId()
+    source_queue, target_queue = event_bus.subscribe("source"), event_bus.subscribe("target")
+    try:
+        _publish_change({
+            "operationType": "update",
+            "documentKey": {"_id": item_id},
+            "fullDocument": {"_id": item_id, "title": "t", "type": "task", "board_id": "target"},
+            "fullDocumentBeforeChange": {"_id": item_id, "title": "t", "type": "task", "board_id": "source"},
+        })
+        left = _drain(source_queue)
+        joined = _drain(target_queue)
+    finally:
+        event_bus.unsubscribe("source", source_queue)
+        event_bus.unsubscribe("target", target_queue)
+
+    assert [(event.op, event.changes) for event in left] == [("updated", {"board_id": "target"})]
+    assert [event.item["board_id"] for event in joined] == ["target"]
@@ -0,0 +1,44 @@
+from utils.item_schema_utils import generate_metadata_schema, infer_value_schema, merge_metadata_schemas
+from utils.metadata_validator import compile_metadata_schema
+
+
+def test_null_and_value_merge_into_a_union_at_every_level():
+    previous = generate_metadata_schema({"owner": None, "estimate": {"points": 3}})
+    current = generate_metadata_schema({"owner": "alice", "estimate": {"points": None}})
+    merged = merge_metadata_schemas(previous, current)
+    assert merged["owner"] == {"anyOf": [{"type": "NoneType", "required": False}, {"type": "str", "required": True}]}
+    assert merged["estimate"]["properties"]["points"] == {
+        "anyOf": [{"type": "NoneType", "required": False}, {"type": "int", "required": True}],
+    }
+    validate = compile_metadata_schema(merged)
+    assert validate({"owner": None, "estimate": {"points": 1}}) == []
+    assert validate({"owner": 1}) == ["metadata.owner: expected NoneType | str, got int"]
+
+
+def test_merge_is_idempotent():
+    previous = generate_metadata_schema({"a": None, "b": {"c": [1, None]}, "d": 1})
+    current = generate_metadata_schema({"a": 1.5, "b": {"c": [], "e": True}})
+    merged = merge_metadata_schemas(previous, current)
+    assert merge_metadata_schemas(merged, previous) == merged
+    assert merge_metadata_schemas(merged, current) == merged
+    # une clé présente d'un seul côté devient optionnelle
+    assert merged["d"] == {"type": "int", "required": False}
+    assert merged["b"]["properties"]["e"] == {"type": "bool", "required": False}
+
+
+def test_list_element_merge_is_unchanged():
+    assert infer_value_schema([{"a": 1}, {"a": None}]) == {
+        "type": "list",
+        "required": True,
+        "items": {
+            "type": "dict",
+            "required": True,
+            "properties": {"a": {"anyOf": [{"type": "NoneType", "required": False}, {"type": "int", "required": True}]}},
+        },
+    }
+
+
+def test_key_only_seen_null_accepts_any_value():
+    validate = compile_metadata_schema(generate_metadata_schema({"owner": None, "points": 1}))
+    assert validate({"owner": "alice", "points": 2}) == []
+    assert validate({"owner": None, "points": "2"}) == ["metadata.points: expected int, got str"]
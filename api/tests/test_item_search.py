@@ -0,0 +1,64 @@
+import pytest
+
+from models.item import Item
+
+pytestmark = pytest.mark.anyio
+
+
+def _without_text_search(pipeline):
+    """mongomock n'a pas d'index texte : $text et le score de pertinence sont remplacés."""
+    stages = []
+    for stage in pipeline:
+        if "$match" in stage:
+            stage = {"$match": {key: value for key, value in stage["$match"].items() if key != "$text"}}
+        elif "$sort" in stage:
+            continue
+        elif "$project" in stage:
+            stage = {"$project": {
+                key: {"$literal": 1.0} if value == {"$meta": "textScore"} else value
+                for key, value in stage["$project"].items()
+            }}
+        stages.append(stage)
+    return stages
+
+
+@pytest.fixture
+def text_search(monkeypatch):
+    pipelines = []
+    aggregate = Item.aggregate
+
+    def fake_aggregate(pipeline, *args, **kwargs):
+        pipelines.append(pipeline)
+        return aggregate(_without_text_search(pipeline), *args, **kwargs)
+
+    monkeypatch.setattr(Item, "aggregate", fake_aggregate)
+    return pipelines
+
+
+async def test_search_without_fields_returns_model_fields_only(api, text_search):
+    board = (await api.post("/boards/", json={"name": "b"})).json()["_id"]
+    created = await api.post("/items/", json={
+        "title": "Export CSV", "type": "task", "board_id": board,
+        "functional_description": "Exporter les rapports mensuels en CSV",
+    })
+    # la signature de doublons (binaire) est bien stockée sur le document
+    assert (await Item.get_motor_collection().find_one({}))["minhash"]
+
+    response = await api.get("/items/search", params={"q": "csv"})
+
+    assert response.status_code == 200
+    [result] = response.json()
+    assert result["_id"] == created.json()["_id"]
+    assert result["score"] == 1.0
+    assert "minhash" not in result and "lsh_buckets" not in result
+    assert "minhash" not in text_search[0][-1]["$project"]
+
+
+async def test_search_with_fields_projects_them(api, text_search):
+    board = (await api.post("/boards/", json={"name": "b"})).json()["_id"]
+    await api.post("/items/", json={"title": "Export CSV", "type": "task", "board_id": board})
+
+    response = await api.get("/items/search", params={"q": "csv", "fields": "title"})
+
+    assert response.status_code == 200
+    assert set(response.json()[0]) == {"_id", "title", "score"}
@@ -0,0 +1,156 @@
+import asyncio
+
+import pytest
+
+from models.job import Job
+from services.ai_service import LLMBatcher, StubLLM
+from services.jobs import FINAL_STATUSES, JobRunner
+
+pytestmark = pytest.mark.anyio
+
+KIND = "test.llm"
+
+
+class Recorder:
+    """Handler de test : un appel au LLM local par job, ordre de démarrage et concurrence observés."""
+
+    def __init__(self, latency_ms: float):
+        self.batcher = LLMBatcher(StubLLM(latency_ms=latency_ms, per_prompt_ms=0), 8, 1, 4)
+        self.started = []
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, job, ctx):
+        self.started.append(job.params["name"])
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            answer = await self.batcher.complete(f"Demande : {job.params['name']}")
+        finally:
+            self.running -= 1
+        return {"answer": answer}
+
+
+def make_runner(recorder: Recorder, concurrency: int) -> JobRunner:
+    runner = JobRunner(concurrency, poll_interval=0.05, stale_after=30, max_attempts=3)
+    runner.register(KIND, recorder)
+    return runner
+
+
+async def wait_for_status(job_id, statuses, timeout: float = 5) -> Job:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        job = await Job.get(job_id)
+        if job.status in statuses:
+            return job
+        assert loop.time() < deadline, f"job {job_id} still {job.status}"
+        await asyncio.sleep(0.01)
+
+
+async def test_jobs_start_by_priority_then_age(database):
+    recorder = Recorder(latency_ms=1)
+    runner = make_runner(recorder, concurrency=1)
+    jobs = [
+        await runner.submit(KIND, {"name": name}, priority=priority)
+        for name, priority in [("low", 0), ("high", 5), ("mid", 1), ("high-later", 5)]
+    ]
+    await runner.start()
+    try:
+        for job in jobs:
+            assert (await wait_for_status(job.id, FINAL_STATUSES)).status == "done"
+    finally:
+        await runner.stop()
+    assert recorder.started == ["high", "high-later", "mid", "low"]
+
+
+async def test_concurrency_limit(database):
+    recorder = Recorder(latency_ms=30)
+    runner = make_runner(recorder, concurrency=2)
+    jobs = [await runner.submit(KIND, {"name": str(index)}) for index in range(6)]
+    await runner.start()
+    try:
+        for job in jobs:
+            assert (await wait_for_status(job.id, FINAL_STATUSES)).status == "done"
+    finally:
+        await runner.stop()
+    assert recorder.max_running == 2
+    assert runner.counters["done"] == 6
+
+
+async def test_cancel_queued_job(database):
+    recorder = Recorder(latency_ms=1)
+    runner = make_runner(recorder, concurrency=1)
+    job = await runner.submit(KIND, {"name": "cancelled"})
+    assert (await runner.cancel(job.id)).status == "cancelled"
+    other = await runner.submit(KIND, {"name": "kept"})
+    await runner.start()
+    try:
+        await wait_for_status(other.id, FINAL_STATUSES)
+    finally:
+        await runner.stop()
+    assert recorder.started == ["kept"]
+    assert (await Job.get(job.id)).status == "cancelled"
+
+
+async def test_cancel_running_job(database):
+    recorder = Recorder(latency_ms=10_000)
+    runner = make_runner(recorder, concurrency=1)
+    job = await runner.submit(KIND, {"name": "slow"})
+    await runner.start()
+    try:
+        await wait_for_status(job.id, ("running",))
+        while not recorder.running:
+            await asyncio.sleep(0.01)
+        await runner.cancel(job.id)
+        cancelled = await wait_for_status(job.id, FINAL_STATUSES, timeout=2)
+    finally:
+        await runner.stop()
+    assert cancelled.status == "cancelled"
+    assert cancelled.cancel_requested
+
+
+async def test_stop_requeues_running_jobs(database):
+    recorder = Recorder(latency_ms=10_000)
+    runner = make_runner(recorder, concurrency=1)
+    job = await runner.submit(KIND, {"name": "interrupted"})
+    await runner.start()
+    await wait_for_status(job.id, ("running",))
+    while not recorder.running:
+        await asyncio.sleep(0.01)
+    await runner.stop()
+
+    requeued = await Job.get(job.id)
+    assert requeued.status == "queued"
+    assert requeued.worker is None
+    assert requeued.attempts == 1
+    assert runner.counters["requeued"] == 1
+
+    # un autre runner reprend le job
+    recorder.batcher.client.latency_ms = 1
+    other = make_runner(recorder, concurrency=1)
+    await other.start()
+    try:
+        done = await wait_for_status(job.id, FINAL_STATUSES)
+    finally:
+        await other.stop()
+    assert done.status == "done"
+    assert done.attempts == 2
+
+
+class ShortLLM:
+    """Client qui perd la dernière réponse de chaque lot."""
+
+    async def complete_batch(self, prompts):
+        return [f"answer {prompt}" for prompt in prompts[:-1]]
+
+
+async def test_batcher_fails_prompts_without_answer():
+    batcher = LLMBatcher(ShortLLM(), max_batch_size=3, max_wait_ms=1, max_concurrent_batches=1)
+    results = await asyncio.wait_for(
+        asyncio.gather(*(batcher.complete(str(index)) for index in range(3)), return_exceptions=True),
+        timeout=1,
+    )
+    assert results[:2] == ["answer 0", "answer 1"]
+    assert isinstance(results[2], RuntimeError)
+    assert not batcher._tasks
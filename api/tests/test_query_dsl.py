@@ -0,0 +1,62 @@
+import pytest
+
+from utils.query_dsl import QueryError, compile_item_query
+
+BOARD = "board"
+
+
+def compile_filter(params, metadata_types=None):
+    return compile_item_query(BOARD, params, metadata_types or {}).filter
+
+
+def test_value_is_coerced_to_every_known_type():
+    assert compile_filter([("metadata.points", "3")], {"points": {"int", "str"}}) == {
+        "board_id": BOARD, "metadata.points": {"$in": [3, "3"]},
+    }
+    assert compile_filter([("metadata.points", "3")], {"points": {"int"}})["metadata.points"] == 3
+    assert compile_filter([("metadata.points__ne", "3")], {"points": {"int", "str"}})["metadata.points"] == {"$nin": [3, "3"]}
+    with pytest.raises(QueryError, match="expected int"):
+        compile_filter([("metadata.points", "three")], {"points": {"int"}})
+
+
+def test_in_accepts_a_comma_separated_list():
+    assert compile_filter([("status__in", "todo, review,done")])["status"] == {"$in": ["todo", "review", "done"]}
+    assert compile_filter([("metadata.points__nin", "1,2")], {"points": {"int"}})["metadata.points"] == {"$nin": [1, 2]}
+
+
+def test_range_on_a_nullable_union_uses_the_typed_value():
+    types = {"points": {"NoneType", "int"}}
+    assert compile_filter([("metadata.points__gte", "3")], types)["metadata.points"] == {"$gte": 3}
+    assert compile_filter([("metadata.points", "null")], types)["metadata.points"] is None
+    with pytest.raises(QueryError):
+        compile_filter([("metadata.points__lt", "null")], types)
+
+
+def test_repeated_operator_is_rejected():
+    with pytest.raises(QueryError, match="Duplicate filter: status"):
+        compile_filter([("status", "todo"), ("status", "done")])
+    with pytest.raises(QueryError, match="Duplicate filter: metadata.points__in"):
+        compile_filter([("metadata.points__in", "1"), ("metadata.points__in", "2")], {"points": {"int"}})
+
+
+def test_equality_and_in_on_the_same_field_are_combined():
+    assert compile_filter([("status", "todo"), ("status__in", "todo,review")])["status"] == {
+        "$eq": "todo", "$in": ["todo", "review"],
+    }
+    # l'égalité multi-types compilée en $in rencontre le __in du même champ
+    types = {"owner": {"int", "str"}}
+    assert compile_filter([("metadata.owner", "1"), ("metadata.owner__in", "1,2")], types)["metadata.owner"] == {
+        "$in": [1, "1"],
+    }
+    assert compile_filter([("metadata.owner__ne", "1"), ("metadata.owner__nin", "2")], types)["metadata.owner"] == {
+        "$nin": [1, "1", 2, "2"],
+    }
+
+
+def test_sort_ends_with_an_id_tie_break():
+    assert compile_item_query(BOARD, [("sort", "-metadata.points,title")], {"points": {"int"}}).sort == [
+        ("metadata.points", -1), ("title", 1), ("_id", 1),
+    ]
+    assert compile_item_query(BOARD, [("sort", "title,-id")], {}).sort == [("title", 1), ("_id", -1)]
+    with pytest.raises(QueryError):
+        compile_item_query(BOARD, [("sort", "nope")], {})
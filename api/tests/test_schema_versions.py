@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+
+from core.database import DOCUMENT_MODELS, create_indexes
+from models.item_schema import ItemSchema
+from services.schema_service import ensure_schema_version, invalidate_schema_cache
+
+pytestmark = pytest.mark.anyio
+
+WRITERS = 20
+
+
+async def _versions(item_type: str):
+    docs = await ItemSchema.find(ItemSchema.item_type == item_type).to_list()
+    return sorted(doc.version for doc in docs)
+
+
+async def test_concurrent_writers_get_contiguous_versions(database):
+    # chaque writer envoie une forme de metadata différente : une version chacun
+    results = await asyncio.gather(*(
+        ensure_schema_version("feature", {f"field_{index}": index}) for index in range(WRITERS)
+    ))
+    assert await _versions("feature") == list(range(1, WRITERS + 1))
+    assert sorted(doc.version for doc in results) == list(range(1, WRITERS + 1))
+
+
+async def test_concurrent_writers_with_same_shape_share_one_version(database):
+    results = await asyncio.gather(*(
+        ensure_schema_version("bug", {"severity": "high", "points": index}) for index in range(WRITERS)
+    ))
+    assert await _versions("bug") == [1]
+    assert {doc.version for doc in results} == {1}
+
+
+async def test_migration_removes_duplicate_versions_and_legacy_index():
+    client = AsyncMongoMockClient()
+    await init_beanie(database=client["ai_board_migration"], document_models=DOCUMENT_MODELS, skip_indexes=True)
+    invalidate_schema_cache()
+    collection = ItemSchema.get_motor_collection()
+    await collection.create_index([("item_type", 1), ("version", -1)])
+    # état laissé par l'ancienne course : deux copies de v2 (même schéma) et un autre schéma en v2
+    await collection.insert_many([
+        {"item_type": "task", "version": 1, "schema": {"a": {"type": "int"}}},
+        {"item_type": "task", "version": 2, "schema": {"b": {"type": "int"}}},
+        {"item_type": "task", "version": 2, "schema": {"b": {"type": "int"}}},
+        {"item_type": "task", "version": 2, "schema": {"c": {"type": "str"}}},
+    ])
+
+    await create_indexes()
+
+    assert await _versions("task") == [1, 2, 3]
+    indexes = await collection.index_information()
+    assert "item_type_1_version_-1" not in indexes
+    assert indexes["item_type_version_unique"].get("unique")
+
+
+async def test_null_value_flips_create_a_single_version(database):
+    first = await ensure_schema_version("task", {"owner": None, "estimate": {"points": 3, "unit": None}})
+    flipped = await ensure_schema_version("task", {"owner": "alice", "estimate": {"points": None, "unit": "d"}})
+    assert flipped.version == 2
+    for metadata in (
+        {"owner": None, "estimate": {"points": 3, "unit": None}},
+        {"owner": "bob", "estimate": {"points": 5, "unit": "h"}},
+        {"owner": None, "estimate": {"points": None, "unit": None}},
+    ):
+        assert (await ensure_schema_version("task", metadata)).version == 2
+    assert await _versions("task") == [first.version, flipped.version]
+
+
+async def test_missing_key_does_not_create_a_version(database):
+    await ensure_schema_version("task", {"owner": "alice", "points": 3})
+    assert (await ensure_schema_version("task", {"owner": "bob"})).version == 2
+    assert (await ensure_schema_version("task", {"owner": "bob", "points": 1})).version == 2
+    assert (await ensure_schema_version("task", {"owner": "bob", "tags": ["x"]})).version == 3
@@ -0,0 +1,24 @@
+import pytest
+
+from models.item import Item
+from utils.update_utils import build_set_update
+
+
+def test_metadata_keys_are_merged_as_dotted_paths():
+    set_fields = build_set_update(Item, {"title": "Titre", "metadata": {"points": 3}})
+    assert set_fields["metadata.points"] == 3
+    assert set_fields["title"] == "Titre"
+    assert "updated_at" in set_fields
+
+
+@pytest.mark.parametrize("key", ["$bad", "a.b", "nul\x00", ""])
+def test_invalid_metadata_keys_are_rejected(key):
+    with pytest.raises(ValueError):
+        build_set_update(Item, {"metadata": {key: 1}})
+
+
+def test_unknown_and_protected_fields_are_rejected():
+    with pytest.raises(ValueError):
+        build_set_update(Item, {"nope": 1})
+    with pytest.raises(ValueError):
+        build_set_update(Item, {"revision": 4})
@@ -0,0 +1,198 @@
+"""
+Benchmark de la détection des doublons (MinHash/LSH, services/duplicates.py) sur un
+board de `--items` items (100 000 par défaut) au vocabulaire réaliste.
+
+- signature : coût du calcul de la signature d'un item (à chaque écriture) ;
+- lsh : recherche par clés LSH en mémoire (ce que fait l'index board_lsh_buckets),
+  latence p50/p95, candidats examinés, rappel des doublons plantés et taux de faux positifs ;
+- brute_force : comparaison de la signature à toutes celles du board (référence) ;
+- database : find_duplicates sur la base (`--db-items` items, mongomock par défaut :
+  sans index, latences non représentatives d'un mongod, utiliser `--mongo-url`).
+
+    python bench/duplicates.py --items 100000 --lookups 1000 --output bench-duplicates.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import warnings
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+warnings.filterwarnings("ignore")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "api", "src"))
+
+import numpy as np  # noqa: E402
+from bson import ObjectId  # noqa: E402
+
+from models.item import Item  # noqa: E402
+from report import summarize  # noqa: E402
+from seed import init_database  # noqa: E402
+from services.duplicates import find_duplicates, minhasher, signature_fields, signature_text  # noqa: E402
+from core.config import settings  # noqa: E402
+
+SYLLABLES = ["ba", "ca", "de", "fi", "go", "ju", "ka", "li", "mo", "nu", "pa", "ri", "so", "ta", "ve", "xo", "zu", "ex", "on", "ar"]
+
+
+def make_vocabulary(rng: random.Random, size: int) -> Tuple[List[str], List[float]]:
+    """Mots de 2 à 4 syllabes, tirés selon une loi de Zipf (quelques mots très fréquents)."""
+    words = sorted({"".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(size * 2)})[:size]
+    rng.shuffle(words)
+    return words, [1 / rank for rank in range(1, len(words) + 1)]
+
+
+def make_text(rng: random.Random, vocabulary, count: int) -> str:
+    words, weights = vocabulary
+    return " ".join(rng.choices(words, weights, k=count))
+
+
+def make_item(rng: random.Random, vocabulary) -> Dict[str, Any]:
+    return {
+        "title": make_text(rng, vocabulary, 6).capitalize(),
+        "functional_description": make_text(rng, vocabulary, 25),
+    }
+
+
+def near_duplicate(rng: random.Random, item: Dict[str, Any], vocabulary) -> Dict[str, Any]:
+    """Reformulation légère d'un item : un mot retiré, un mot remplacé, casse et ponctuation changées."""
+    def edit(text: str) -> str:
+        words = text.split()
+        if len(words) > 3:
+            del words[rng.randrange(len(words))]
+        words[rng.randrange(len(words))] = rng.choice(vocabulary[0])
+        return " ".join(words).upper() + " !"
+    return {"title": edit(item["title"]), "functional_description": edit(item["functional_description"])}
+
+
+def measure_signatures(docs: List[Dict[str, Any]]) -> Tuple[np.ndarray, List[List[int]], Dict[str, float]]:
+    started = time.process_time()
+    sketches = [minhasher.sketch(signature_text(doc)) for doc in docs]
+    elapsed = time.process_time() - started
+    matrix = np.frombuffer(b"".join(minhash for minhash, _ in sketches), dtype=np.uint32).reshape(len(docs), -1)
+    stats = {"items": len(docs), "us_per_item": round(elapsed / len(docs) * 1e6, 2), "items_per_s": round(len(docs) / elapsed)}
+    return matrix, [buckets for _, buckets in sketches], stats
+
+
+def lookup_queries(rng: random.Random, docs, vocabulary, count: int) -> List[Tuple[str, int, Dict[str, Any]]]:
+    """Moitié doublons plantés (index de l'original), moitié textes nouveaux (-1)."""
+    queries = []
+    for index in range(count):
+        if index % 2 == 0:
+            original = rng.randrange(len(docs))
+            queries.append(("duplicate", original, near_duplicate(rng, docs[original], vocabulary)))
+        else:
+            queries.append(("fresh", -1, make_item(rng, vocabulary)))
+    return queries
+
+
+def measure_lsh(matrix, all_buckets, queries, threshold: float) -> Dict[str, Any]:
+    index = defaultdict(list)
+    for row, buckets in enumerate(all_buckets):
+        for key in buckets:
+            index[key].append(row)
+    latencies, candidates_seen = [], []
+    found = planted = false_positives = fresh = 0
+    started = time.perf_counter()
+    for kind, original, doc in queries:
+        begin = time.perf_counter()
+        minhash, buckets = minhasher.sketch(signature_text(doc))
+        rows = np.unique(np.fromiter((row for key in buckets for row in index.get(key, ())), dtype=np.int64))
+        signature = np.frombuffer(minhash, dtype=np.uint32)
+        scores = (matrix[rows] == signature).mean(axis=1) if len(rows) else np.zeros(0)
+        matches = set(rows[scores >= threshold].tolist())
+        latencies.append(time.perf_counter() - begin)
+        candidates_seen.append(len(rows))
+        if kind == "duplicate":
+            planted += 1
+            found += original in matches
+        else:
+            fresh += 1
+            false_positives += bool(matches)
+    stats = summarize(latencies, 0, time.perf_counter() - started)
+    stats.update({
+        "mean_candidates": round(float(np.mean(candidates_seen)), 1),
+        "recall": round(found / planted, 4) if planted else None,
+        "false_positive_rate": round(false_positives / fresh, 4) if fresh else None,
+    })
+    return stats
+
+
+def measure_brute_force(matrix, queries) -> Dict[str, Any]:
+    latencies = []
+    started = time.perf_counter()
+    for _, _, doc in queries:
+        begin = time.perf_counter()
+        signature = minhasher.signature(signature_text(doc))
+        (matrix == signature).mean(axis=1)
+        latencies.append(time.perf_counter() - begin)
+    return summarize(latencies, 0, time.perf_counter() - started)
+
+
+async def measure_database(args, docs, queries) -> Dict[str, Any]:
+    await init_database(args.mongo_url, "ai_board_bench")
+    board_id = str(ObjectId())
+    collection = Item.get_motor_collection()
+    for start in range(0, len(docs), 5000):
+        await collection.insert_many([
+            dict(doc, type="task", status="todo", board_id=board_id, **signature_fields(doc))
+            for doc in docs[start:start + 5000]
+        ])
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for kind, original, doc in queries:
+        begin = time.perf_counter()
+        fields = signature_fields(doc)
+        matches = await find_duplicates(board_id, fields["minhash"], fields["lsh_buckets"])
+        latencies.append(time.perf_counter() - begin)
+        # un doublon planté dont l'original est dans la base doit être retrouvé
+        errors += kind == "duplicate" and original < len(docs) and not matches
+    stats = summarize(latencies, errors, time.perf_counter() - started)
+    stats["items"] = len(docs)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Détection des doublons MinHash/LSH")
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    parser.add_argument("--threshold", type=float, default=settings.duplicate_threshold)
+    parser.add_argument("--db-items", type=int, default=20_000, help="items insérés en base (0 = pas de mesure base)")
+    parser.add_argument("--db-lookups", type=int, default=100)
+    parser.add_argument("--mongo-url", default=None, help="mongod à utiliser (défaut : mongomock-motor en mémoire)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng, args.vocabulary)
+    docs = [make_item(rng, vocabulary) for _ in range(args.items)]
+    queries = lookup_queries(rng, docs, vocabulary, args.lookups)
+
+    matrix, all_buckets, signature_stats = measure_signatures(docs)
+    result = {
+        "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+        "minhash": {"permutations": minhasher.num_perm, "bands": minhasher.bands, "lsh_threshold": round(minhasher.threshold, 3)},
+        "signature": signature_stats,
+        "lsh": measure_lsh(matrix, all_buckets, queries, args.threshold),
+        "brute_force": measure_brute_force(matrix, queries),
+    }
+    if args.db_items:
+        db_docs = docs[:args.db_items]
+        db_queries = [query for query in queries if query[1] < len(db_docs)][:args.db_lookups]
+        result["database"] = asyncio.run(measure_database(args, db_docs, db_queries))
+        result["database"]["backend"] = "mongod" if args.mongo_url else "mongomock"
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Benchmark du client HTTP du service MCP : tool `list_items` appelé contre une API factice
+servie en TCP local (uvicorn), qui répond une page d'items après `--api-latency-ms`.
+
+- per_call : un httpx.AsyncClient ouvert et fermé à chaque appel de tool (comportement
+  d'avant le client partagé) : connexion TCP et pool recréés à chaque fois ;
+- shared : le client partagé du service (get_http_client, connexions keep-alive).
+
+Pour chaque mode : latence par appel séquentiel (p50/p95/p99) et débit avec
+`--concurrency` appels simultanés. L'API factice tourne dans un process à part (un seul
+worker uvicorn) : comparer les modes entre eux, pas à une API réelle.
+
+    python bench/http_client.py --calls 2000 --concurrency 32 --output bench-http-client.json
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sys
+import time
+import warnings
+from typing import Any, Dict, List, Tuple
+
+warnings.filterwarnings("ignore")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "mcp", "src"))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+import mcp_service  # noqa: E402
+from report import summarize  # noqa: E402
+
+BOARD_ID = "689b28b3c9a050f2cb476051"
+
+# Clients ouverts pendant l'appel de tool en cours (mode per_call)
+_call_clients: contextvars.ContextVar[List[httpx.AsyncClient]] = contextvars.ContextVar("call_clients")
+
+
+def make_stub_api(latency_ms: float, items: int) -> Starlette:
+    page = [
+        {"_id": f"{index:024x}", "title": f"Item {index}", "type": "task", "status": "todo",
+         "functional_description": "Description courte de l'item"}
+        for index in range(items)
+    ]
+
+    async def by_board(request):
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        return JSONResponse(page)
+
+    return Starlette(routes=[Route("/items/by_board/{board_id}", by_board)])
+
+
+def serve_stub_api(sock: socket.socket, latency_ms: float, items: int) -> None:
+    app = make_stub_api(latency_ms, items)
+    uvicorn.Server(uvicorn.Config(app, log_level="warning", access_log=False, timeout_keep_alive=60)).run(sockets=[sock])
+
+
+def start_stub_api(latency_ms: float, items: int) -> Tuple[str, multiprocessing.Process]:
+    """Lance l'API factice dans un process séparé et renvoie son URL une fois prête."""
+    sock = socket.socket()
+    # sans TCP_NODELAY (hérité par les connexions acceptées), l'ACK retardé ajoute ~40 ms par réponse
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    process = multiprocessing.get_context("fork").Process(target=serve_stub_api, args=(sock, latency_ms, items), daemon=True)
+    process.start()
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(500):
+        try:
+            httpx.get(f"{url}/items/by_board/{BOARD_ID}")
+            return url, process
+        except httpx.TransportError:
+            time.sleep(0.01)
+    raise RuntimeError("API factice injoignable")
+
+
+def per_call_client() -> httpx.AsyncClient:
+    client = httpx.AsyncClient(timeout=httpx.Timeout(mcp_service.HTTP_TIMEOUT, connect=mcp_service.HTTP_CONNECT_TIMEOUT))
+    _call_clients.get().append(client)
+    return client
+
+
+async def call_tool(mode: str) -> bool:
+    if mode == "per_call":
+        token = _call_clients.set([])
+        try:
+            result = await mcp_service.list_items.fn(board_id=BOARD_ID)
+        finally:
+            for client in _call_clients.get():
+                await client.aclose()
+            _call_clients.reset(token)
+    else:
+        result = await mcp_service.list_items.fn(board_id=BOARD_ID)
+    return "error" not in result
+
+
+async def measure(mode: str, calls: int, concurrency: int) -> Dict[str, Any]:
+    # latence par appel : appels successifs, un seul à la fois
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for _ in range(calls):
+        begin = time.perf_counter()
+        errors += not await call_tool(mode)
+        latencies.append(time.perf_counter() - begin)
+    sequential = summarize(latencies, errors, time.perf_counter() - started)
+
+    # débit : `concurrency` appels en vol en permanence
+    latencies, errors = [], 0
+    remaining = calls
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            begin = time.perf_counter()
+            errors += not await call_tool(mode)
+            latencies.append(time.perf_counter() - begin)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    concurrent = summarize(latencies, errors, time.perf_counter() - started)
+    return {"sequential": sequential, "concurrent": concurrent}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    mcp_service.API_URL, stub_process = start_stub_api(args.api_latency_ms, args.page_items)
+    shared_client = mcp_service.get_http_client
+    results = {}
+    for mode in args.modes:
+        if mode == "per_call":
+            mcp_service.get_http_client = per_call_client
+        else:
+            mcp_service.get_http_client = shared_client
+        await call_tool(mode)  # échauffement (connexion du client partagé)
+        results[mode] = await measure(mode, args.calls, args.concurrency)
+    mcp_service.get_http_client = shared_client
+    if mcp_service._http_client is not None:
+        await mcp_service._http_client.aclose()
+    stub_process.terminate()
+    if "per_call" in results and "shared" in results:
+        results["speedup"] = {
+            kind: round(results["shared"][kind]["throughput_rps"] / results["per_call"][kind]["throughput_rps"], 2)
+            for kind in ("sequential", "concurrent")
+            if results["per_call"][kind]["throughput_rps"]
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Client HTTP partagé vs client par appel (service MCP)")
+    parser.add_argument("--calls", type=int, default=2000, help="appels de tool par mode et par mesure")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--api-latency-ms", type=float, default=0, help="temps de réponse de l'API factice")
+    parser.add_argument("--page-items", type=int, default=20, help="items par réponse de l'API factice")
+    parser.add_argument("--modes", nargs="+", choices=("per_call", "shared"), default=["per_call", "shared"])
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    for name in ("mcp", "httpx"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    result = {
+        "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+        "pool": {
+            "max_connections": mcp_service.HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": mcp_service.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        },
+    }
+    result.update(asyncio.run(run(args)))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
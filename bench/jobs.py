@@ -0,0 +1,105 @@
+"""
+Benchmark du runner de jobs IA : `--jobs` jobs POST /ai/process (chacun de
+`--requests-per-job` demandes) traités contre le LLM local (StubLLM) de latence fixe.
+
+Mesure le débit (jobs et demandes par seconde), la latence soumission -> fin de job
+(p50/p95/p99) et la taille moyenne des lots envoyés au LLM. Comparer par exemple
+`--batch-size 1` (un appel LLM par demande) et `--batch-size 16`.
+
+    python bench/jobs.py --jobs 200 --requests-per-job 5 --llm-latency-ms 200 --batch-size 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import warnings
+
+warnings.filterwarnings("ignore")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "api", "src"))
+
+import httpx  # noqa: E402
+
+import main as api_main  # noqa: E402
+from models.job import Job  # noqa: E402
+from report import summarize  # noqa: E402
+from seed import init_database  # noqa: E402
+from services import ai_service  # noqa: E402
+from services.ai_service import LLMBatcher, StubLLM  # noqa: E402
+from services.jobs import FINAL_STATUSES, job_runner  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Débit et latence du runner de jobs IA")
+    parser.add_argument("--mongo-url", default=None, help="mongod à utiliser (défaut : mongomock-motor en mémoire)")
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--requests-per-job", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=8, help="jobs simultanés du runner")
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--batch-wait-ms", type=float, default=20)
+    parser.add_argument("--max-concurrent-batches", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=600, help="durée maximale du run (s)")
+    parser.add_argument("--output", default=None)
+    return parser.parse_args()
+
+
+async def run(args: argparse.Namespace) -> dict:
+    await init_database(args.mongo_url, "ai_board_bench")
+    llm = StubLLM(latency_ms=args.llm_latency_ms)
+    ai_service.llm_batcher = LLMBatcher(llm, args.batch_size, args.batch_wait_ms, args.max_concurrent_batches)
+    job_runner.concurrency = args.concurrency
+    await job_runner.start()
+
+    transport = httpx.ASGITransport(app=api_main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        submitted = {}
+        for index in range(args.jobs):
+            requests = [f"Demande {index}-{n} : ajouter l'export CSV des items" for n in range(args.requests_per_job)]
+            response = await client.post("/ai/process", json={"requests": requests})
+            response.raise_for_status()
+            submitted[response.json()["_id"]] = time.perf_counter()
+
+        # fin de job observée par le client, comme un utilisateur qui suit GET /ai/jobs/{id}
+        latencies, errors = [], 0
+        pending = set(submitted)
+        deadline = started + args.timeout
+        while pending and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+            for job_id in list(pending):
+                job = (await client.get(f"/ai/jobs/{job_id}")).json()
+                if job["status"] in FINAL_STATUSES:
+                    pending.discard(job_id)
+                    latencies.append(time.perf_counter() - submitted[job_id])
+                    errors += job["status"] != "done"
+        elapsed = time.perf_counter() - started
+
+    await job_runner.stop()
+    stats = summarize(latencies, errors + len(pending), elapsed)
+    return {
+        "backend": "mongod" if args.mongo_url else "mongomock",
+        "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+        "jobs": stats,
+        "requests_per_s": round(len(latencies) * args.requests_per_job / elapsed, 2) if elapsed > 0 else 0.0,
+        "unfinished": len(pending),
+        "llm": ai_service.llm_batcher.stats(),
+        "jobs_in_db": await Job.find_all().count(),
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    result = asyncio.run(run(args))
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
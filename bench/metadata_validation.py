@@ -0,0 +1,195 @@
+"""
+Micro-benchmark : coût CPU de la validation de metadata volumineuses et imbriquées contre
+le schéma de leur type, par validation.
+
+- interpreted : parcours du descripteur de schéma à chaque validation (validateur non
+  compilé, référence de même sémantique que le validateur compilé) ;
+- compile_per_call : compile_metadata_schema à chaque validation (compilation sans cache) ;
+- cached : MetadataValidator.validate, validateur compilé une fois et mis en cache par
+  (item_type, version) (chemin des routes items).
+
+    python bench/metadata_validation.py --keys 64 --depth 3 --rounds 5 --output bench-metadata-validation.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import warnings
+from typing import Any, Callable, Dict, List
+
+warnings.filterwarnings("ignore")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "api", "src"))
+
+from utils.item_schema_utils import generate_metadata_schema  # noqa: E402
+from utils.metadata_validator import MetadataValidationError, MetadataValidator, compile_metadata_schema  # noqa: E402
+
+SCALARS: List[Callable[[random.Random], Any]] = [
+    lambda rng: rng.randint(0, 1000),
+    lambda rng: round(rng.random() * 100, 2),
+    lambda rng: rng.choice(["low", "medium", "high"]),
+    lambda rng: rng.random() < 0.5,
+]
+
+
+def make_metadata(rng: random.Random, keys: int, depth: int, list_length: int) -> Dict[str, Any]:
+    """`keys` clés par niveau : scalaires, listes de scalaires, objets et listes d'objets sur `depth` niveaux."""
+    metadata: Dict[str, Any] = {}
+    for index in range(keys):
+        kind = index % 4
+        if kind == 2 and depth > 1:
+            metadata[f"object_{index}"] = make_metadata(rng, max(2, keys // 8), depth - 1, list_length)
+        elif kind == 3 and depth > 1:
+            metadata[f"records_{index}"] = [
+                make_metadata(rng, max(2, keys // 16), depth - 1, list_length) for _ in range(list_length)
+            ]
+        elif kind == 1:
+            make = SCALARS[index % len(SCALARS)]
+            metadata[f"values_{index}"] = [make(rng) for _ in range(list_length)]
+        else:
+            metadata[f"field_{index}"] = SCALARS[index % len(SCALARS)](rng)
+    return metadata
+
+
+def corrupt(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Copie dont la première valeur scalaire de chaque niveau change de type."""
+    copy = {}
+    replaced = False
+    for key, value in metadata.items():
+        if isinstance(value, dict):
+            value = corrupt(value)
+        elif isinstance(value, list) and value and isinstance(value[0], dict):
+            value = [corrupt(element) for element in value]
+        elif not replaced and not isinstance(value, list):
+            value, replaced = [value], True
+        copy[key] = value
+    return copy
+
+
+_TYPES = {"str": str, "bool": bool, "int": int, "float": (int, float), "dict": dict, "list": list}
+
+
+def _interpret(path: str, spec: Dict[str, Any], value: Any, errors: List[str], in_union: bool = False) -> bool:
+    """Contrôle `value` contre `spec` en relisant le descripteur ; False si la valeur est invalide."""
+    if "anyOf" in spec:
+        members = [member for member in spec["anyOf"] if isinstance(member, dict)]
+        if any(_interpret(path, member, value, [], in_union=True) for member in members):
+            return True
+        expected = " | ".join(str(member.get("type")) for member in members)
+        errors.append(f"{path}: expected {expected}, got {type(value).__name__}")
+        return False
+    type_name = spec.get("type")
+    if type_name == "NoneType":
+        # seul (clé vue uniquement à null), le descripteur accepte toute valeur
+        if value is None or not in_union:
+            return True
+        errors.append(f"{path}: expected NoneType, got {type(value).__name__}")
+        return False
+    if type_name not in _TYPES:
+        return True
+    if value is None:
+        if spec.get("required", False):
+            errors.append(f"{path}: null value not allowed (expected {type_name})")
+            return False
+        return True
+    if not isinstance(value, _TYPES[type_name]) or (type_name in ("int", "float") and isinstance(value, bool)):
+        errors.append(f"{path}: expected {type_name}, got {type(value).__name__}")
+        return False
+    before = len(errors)
+    if type_name == "dict" and isinstance(spec.get("properties"), dict):
+        _interpret_properties(path, spec["properties"], value, errors)
+    elif type_name == "list" and isinstance(spec.get("items"), dict):
+        for index, element in enumerate(value):
+            _interpret(f"{path}[{index}]", spec["items"], element, errors)
+    return len(errors) == before
+
+
+def _interpret_properties(path: str, properties: Dict[str, Any], value: Dict[str, Any], errors: List[str]) -> None:
+    for key, spec in properties.items():
+        if isinstance(spec, dict) and key in value:
+            _interpret(f"{path}.{key}", spec, value[key], errors)
+
+
+def interpreted(schema: Dict[str, Any], metadata: Dict[str, Any]) -> List[str]:
+    errors: List[str] = []
+    _interpret_properties("metadata", schema, metadata, errors)
+    return errors
+
+
+def compile_per_call(schema: Dict[str, Any], metadata: Dict[str, Any]) -> List[str]:
+    return compile_metadata_schema(schema)(metadata)
+
+
+def cached(schema: Dict[str, Any], metadata: Dict[str, Any]) -> List[str]:
+    try:
+        MetadataValidator.validate(metadata, "bench", 1, schema)
+    except MetadataValidationError as e:
+        return e.errors
+    return []
+
+
+def count_values(value: Any) -> int:
+    if isinstance(value, dict):
+        return sum(count_values(sub_value) for sub_value in value.values())
+    if isinstance(value, list):
+        return sum(count_values(element) for element in value)
+    return 1
+
+
+def measure(function: Callable[[Dict[str, Any], Dict[str, Any]], List[str]], schema, samples, rounds: int) -> Dict[str, float]:
+    cpu_times = []
+    for _ in range(rounds):
+        started = time.process_time()
+        for metadata in samples:
+            function(schema, metadata)
+        cpu_times.append(time.process_time() - started)
+    best = min(cpu_times)
+    return {
+        "us_per_validation": round(best / len(samples) * 1e6, 2),
+        "validations_per_s": round(len(samples) / best) if best else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Coût CPU de la validation de metadata imbriquées")
+    parser.add_argument("--keys", type=int, default=64, help="clés au premier niveau")
+    parser.add_argument("--depth", type=int, default=3, help="niveaux d'objets imbriqués")
+    parser.add_argument("--list-length", type=int, default=3)
+    parser.add_argument("--samples", type=int, default=200, help="metadata différentes validées par round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    samples = [make_metadata(rng, args.keys, args.depth, args.list_length) for _ in range(args.samples)]
+    schema = generate_metadata_schema(samples[0])
+    # Les trois chemins doivent produire les mêmes erreurs
+    for metadata in (samples[0], corrupt(samples[0])):
+        assert interpreted(schema, metadata) == compile_per_call(schema, metadata) == cached(schema, metadata)
+    assert cached(schema, corrupt(samples[0]))
+
+    result = {
+        "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+        "values_per_metadata": count_values(samples[0]),
+        "schema_bytes": len(json.dumps(schema)),
+        "interpreted": measure(interpreted, schema, samples, args.rounds),
+        "compile_per_call": measure(compile_per_call, schema, samples, args.rounds),
+        "cached": measure(cached, schema, samples, args.rounds),
+    }
+    result["speedup"] = {
+        baseline: round(result[baseline]["us_per_validation"] / max(result["cached"]["us_per_validation"], 1e-6), 2)
+        for baseline in ("interpreted", "compile_per_call")
+    }
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Statistiques de latence et comparaison de deux résultats JSON du benchmark.
+
+    python bench/report.py baseline.json current.json [--fail-above 10]
+"""
+import argparse
+import json
+import math
+import sys
+from typing import Any, Dict, List
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Percentile par rang le plus proche (valeurs déjà triées)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    """Résumé d'une série de latences (secondes) : ms et requêtes/s."""
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "count": count,
+        "errors": errors,
+        "throughput_rps": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(values) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if count else 0.0,
+    }
+
+
+def format_table(result: Dict[str, Any]) -> str:
+    rows = [("operation", "count", "err", "rps", "p50 ms", "p95 ms", "p99 ms")]
+    for name, stats in sorted(result["operations"].items()) + [("TOTAL", result["total"])]:
+        rows.append((
+            name, str(stats["count"]), str(stats["errors"]), f"{stats['throughput_rps']:.1f}",
+            f"{stats['p50_ms']:.2f}", f"{stats['p95_ms']:.2f}", f"{stats['p99_ms']:.2f}",
+        ))
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    lines = ["  ".join(cell.ljust(widths[i]) if i == 0 else cell.rjust(widths[i]) for i, cell in enumerate(row)) for row in rows]
+    memory = result.get("memory", {})
+    if memory:
+        lines.append("memory: " + ", ".join(f"{key}={value}" for key, value in memory.items()))
+    return "\n".join(lines)
+
+
+def _delta(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Écarts (%) de p50/p95/p99 et de débit, par opération présente dans les deux résultats."""
+    rows = []
+    names = sorted(set(baseline["operations"]) & set(current["operations"])) + ["TOTAL"]
+    for name in names:
+        before = baseline["total"] if name == "TOTAL" else baseline["operations"][name]
+        after = current["total"] if name == "TOTAL" else current["operations"][name]
+        rows.append({
+            "operation": name,
+            **{f"{key}_delta_pct": round(_delta(before[key], after[key]), 1) for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")},
+        })
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare deux résultats du benchmark")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--fail-above", type=float, default=None,
+                        help="code de sortie 1 si le p95 d'une opération se dégrade de plus de N %%")
+    args = parser.parse_args()
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+
+    rows = compare(baseline, current)
+    width = max(len(row["operation"]) for row in rows)
+    print(f"{'operation'.ljust(width)}  {'p50 %':>8}  {'p95 %':>8}  {'p99 %':>8}  {'rps %':>8}")
+    for row in rows:
+        print(f"{row['operation'].ljust(width)}  {row['p50_ms_delta_pct']:>8}  {row['p95_ms_delta_pct']:>8}  "
+              f"{row['p99_ms_delta_pct']:>8}  {row['throughput_rps_delta_pct']:>8}")
+    if args.fail_above is not None and any(row["p95_ms_delta_pct"] > args.fail_above for row in rows):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
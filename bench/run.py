@@ -0,0 +1,191 @@
+"""
+Benchmark de l'API (routes boards / items / schemas) et des tools MCP.
+
+L'API est appelée en process via httpx.ASGITransport (pas de réseau) ; les tools MCP
+passent par un client fastmcp en mémoire dont les appels HTTP visent cette même API.
+
+    python bench/run.py --mix api --requests 2000 --concurrency 16 --output bench-api.json
+    python bench/run.py --mix mcp --mongo-url mongodb://localhost:27017
+    python bench/run.py --replay requests.jsonl --repeat 3
+    python bench/report.py bench-old.json bench-api.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+# avertissements de dépréciation des dépendances : bruit sans rapport avec la mesure
+warnings.filterwarnings("ignore")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "api", "src"))
+sys.path.insert(0, os.path.join(ROOT, "mcp", "src"))
+
+import httpx  # noqa: E402
+
+from report import format_table, summarize  # noqa: E402
+from seed import SeedConfig, init_database, seed  # noqa: E402
+from workloads import MIXES, BenchError, Context, WeightedOperation, load_replay, pick, pick_sequence  # noqa: E402
+
+API_BASE_URL = "http://bench"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark de l'API et des tools MCP")
+    parser.add_argument("--mongo-url", default=None, help="mongod à utiliser (défaut : mongomock-motor en mémoire)")
+    parser.add_argument("--db-name", default="ai_board_bench")
+    parser.add_argument("--boards", type=int, default=5)
+    parser.add_argument("--items-per-board", type=int, default=200)
+    parser.add_argument("--metadata-keys", type=int, default=6)
+    parser.add_argument("--item-types", type=int, default=4)
+    parser.add_argument("--flat-metadata", action="store_true", help="metadata sans listes ni objets imbriqués")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="api")
+    parser.add_argument("--replay", default=None, help="fichier JSONL à rejouer à la place du mix")
+    parser.add_argument("--repeat", type=int, default=1, help="nombre de passes sur le fichier rejoué")
+    parser.add_argument("--requests", type=int, default=1000, help="nombre d'opérations mesurées (mix)")
+    parser.add_argument("--warmup", type=int, default=50, help="opérations non mesurées avant la mesure")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42, help="graine du générateur aléatoire")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="mesure le pic d'allocations Python (ralentit sensiblement l'exécution)")
+    parser.add_argument("--output", default=None, help="écrit le résultat JSON dans ce fichier")
+    return parser.parse_args()
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def _drive(ctx: Context, operations: List[WeightedOperation], total: int, concurrency: int,
+                 sequential: bool, latencies: Dict[str, List[float]], errors: Dict[str, int]) -> float:
+    """
+    Exécute `total` opérations avec `concurrency` workers en boucle fermée.
+    Retourne la durée écoulée (secondes).
+    """
+    counter = iter(range(total))
+
+    async def worker():
+        for index in counter:
+            operation = pick_sequence(operations, index) if sequential else pick(operations, ctx.rng)
+            started = time.perf_counter()
+            try:
+                await operation.run(ctx)
+            except (BenchError, httpx.HTTPError) as e:
+                errors[operation.name] += 1
+                logging.getLogger("bench").debug(str(e))
+                continue
+            latencies[operation.name].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return time.perf_counter() - started
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    config = SeedConfig(
+        boards=args.boards,
+        items_per_board=args.items_per_board,
+        metadata_keys=args.metadata_keys,
+        item_types=args.item_types,
+        nested_metadata=not args.flat_metadata,
+        random_seed=args.seed,
+    )
+    await init_database(args.mongo_url, args.db_name)
+    seed_started = time.perf_counter()
+    data = await seed(config)
+    seed_seconds = time.perf_counter() - seed_started
+
+    import main as api_main
+    api = httpx.AsyncClient(transport=httpx.ASGITransport(app=api_main.app), base_url=API_BASE_URL)
+    ctx = Context(api=api, data=data, config=config, rng=random.Random(args.seed), real_mongo=bool(args.mongo_url))
+
+    if args.replay:
+        operations = load_replay(args.replay)
+        total = len(operations) * args.repeat
+        sequential = True
+    else:
+        operations = MIXES[args.mix](ctx)
+        total = args.requests
+        sequential = False
+
+    mcp_client = None
+    if args.mix == "mcp" and not args.replay:
+        import mcp_service
+        from fastmcp import Client
+        # Les tools appellent l'API en process via le client HTTP partagé du service MCP
+        mcp_service.API_URL = API_BASE_URL
+        mcp_service._http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=api_main.app))
+        mcp_client = Client(mcp_service.mcp)
+        await mcp_client.__aenter__()
+        ctx.mcp = mcp_client
+
+    try:
+        if args.warmup and not sequential:
+            await _drive(ctx, operations, args.warmup, args.concurrency, sequential, defaultdict(list), defaultdict(int))
+        if args.tracemalloc:
+            tracemalloc.start()
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        latencies: Dict[str, List[float]] = defaultdict(list)
+        errors: Dict[str, int] = defaultdict(int)
+        elapsed = await _drive(ctx, operations, total, args.concurrency, sequential, latencies, errors)
+        memory = {
+            # ru_maxrss est en Ko sous Linux
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "max_rss_growth_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before,
+        }
+        if args.tracemalloc:
+            memory["python_peak_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+            tracemalloc.stop()
+    finally:
+        if mcp_client is not None:
+            await mcp_client.__aexit__(None, None, None)
+        await api.aclose()
+
+    names = set(latencies) | set(errors)
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": "mongod" if args.mongo_url else "mongomock",
+            "workload": f"replay:{os.path.basename(args.replay)}" if args.replay else args.mix,
+            "concurrency": args.concurrency,
+            "seed": vars(config),
+            "seed_seconds": round(seed_seconds, 3),
+        },
+        "total": summarize(all_latencies, sum(errors.values()), elapsed),
+        "operations": {name: summarize(latencies[name], errors[name], elapsed) for name in sorted(names)},
+        "memory": memory,
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    result = asyncio.run(run(args))
+    print(format_table(result))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
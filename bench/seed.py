@@ -0,0 +1,123 @@
+"""
+Initialisation de la base du benchmark : connexion (mongod ou mongomock-motor)
+et génération d'un jeu de boards / items / schémas de taille configurable.
+"""
+import random
+import string
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from beanie import init_beanie
+
+from core.database import DOCUMENT_MODELS
+from models.board import Board
+from models.item import Item
+from services.schema_service import ensure_schema_version, invalidate_schema_cache
+
+STATUSES = ["todo", "in_progress", "review", "done"]
+
+WORDS = [
+    "api", "board", "cache", "client", "dashboard", "export", "filter", "index",
+    "latency", "login", "metadata", "migration", "notification", "pagination",
+    "permission", "query", "report", "schema", "search", "session", "stream",
+    "sync", "token", "upload", "validation", "webhook",
+]
+
+
+@dataclass
+class SeedConfig:
+    boards: int = 5
+    items_per_board: int = 200
+    metadata_keys: int = 6
+    item_types: int = 4
+    nested_metadata: bool = True
+    random_seed: int = 42
+
+
+@dataclass
+class SeedData:
+    board_ids: List[str] = field(default_factory=list)
+    item_ids: List[str] = field(default_factory=list)
+    item_types: List[str] = field(default_factory=list)
+    # metadata représentatives de chaque type (même schéma que les items seedés)
+    sample_metadata: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+async def init_database(mongo_url: Optional[str], db_name: str):
+    """
+    Initialise Beanie sur une base vide. Sans mongo_url, mongomock-motor est utilisé
+    (en mémoire : pas de $text ni de transactions, latences non représentatives d'un mongod).
+    """
+    if mongo_url:
+        import motor.motor_asyncio
+        client = motor.motor_asyncio.AsyncIOMotorClient(mongo_url)
+        await client.drop_database(db_name)
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+    await init_beanie(database=client[db_name], document_models=DOCUMENT_MODELS)
+    invalidate_schema_cache()
+    return client
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def make_metadata(rng: random.Random, keys: int, nested: bool) -> Dict[str, Any]:
+    """
+    Metadata de `keys` clés, de types variés (les mêmes pour un même nombre de clés,
+    pour que tous les items d'un type partagent un schéma).
+    """
+    metadata: Dict[str, Any] = {}
+    for index in range(keys):
+        kind = index % (5 if nested else 3)
+        key = f"field_{index}"
+        if kind == 0:
+            metadata[key] = rng.randint(0, 1000)
+        elif kind == 1:
+            metadata[key] = rng.choice(WORDS)
+        elif kind == 2:
+            metadata[key] = rng.random() < 0.5
+        elif kind == 3:
+            metadata[key] = [rng.choice(WORDS) for _ in range(rng.randint(1, 4))]
+        else:
+            metadata[key] = {"owner": rng.choice(WORDS), "estimate": rng.randint(1, 13)}
+    return metadata
+
+
+def make_item(rng: random.Random, board_id: str, item_type: str, config: SeedConfig) -> Dict[str, Any]:
+    return {
+        "title": _sentence(rng, 4).capitalize(),
+        "type": item_type,
+        "functional_description": _sentence(rng, 30),
+        "technical_description": _sentence(rng, 20),
+        "status": rng.choice(STATUSES),
+        "checklist": [{"task": _sentence(rng, 3), "completed": rng.random() < 0.5} for _ in range(rng.randint(0, 4))],
+        "board_id": board_id,
+        "metadata": make_metadata(rng, config.metadata_keys, config.nested_metadata),
+    }
+
+
+async def seed(config: SeedConfig) -> SeedData:
+    rng = random.Random(config.random_seed)
+    data = SeedData(item_types=[f"type_{string.ascii_lowercase[i % 26]}{i}" for i in range(config.item_types)])
+
+    for item_type in data.item_types:
+        sample = make_metadata(rng, config.metadata_keys, config.nested_metadata)
+        data.sample_metadata[item_type] = sample
+        await ensure_schema_version(item_type, sample, author="bench")
+
+    for index in range(config.boards):
+        board = Board(name=f"Bench board {index}", description=_sentence(rng, 8))
+        await board.insert()
+        board_id = str(board.id)
+        data.board_ids.append(board_id)
+        items = [
+            Item(**make_item(rng, board_id, rng.choice(data.item_types), config))
+            for _ in range(config.items_per_board)
+        ]
+        if items:
+            result = await Item.insert_many(items)
+            data.item_ids.extend(str(item_id) for item_id in result.inserted_ids)
+    return data
@@ -0,0 +1,104 @@
+"""
+Micro-benchmark : coût CPU de la sérialisation d'une liste d'items, par 10 000 items.
+
+- response_model : documents BSON -> modèles Beanie -> validation du response_model
+  List[Item] -> JSON (chemin historique de GET /items/by_board/{id}) ;
+- raw : documents BSON mis en forme (utils/raw_documents.py) -> orjson.
+
+    python bench/serialization.py --items 10000 --rounds 5 --output bench-serialization.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import warnings
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+warnings.filterwarnings("ignore")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "api", "src"))
+
+from bson import ObjectId  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from models.item import Item  # noqa: E402
+from seed import SeedConfig, init_database, make_item  # noqa: E402
+from utils.raw_documents import dumps, output_fields, shape_document  # noqa: E402
+
+
+def make_documents(count: int, config: SeedConfig) -> List[Dict[str, Any]]:
+    """Documents tels que renvoyés par Motor (ObjectId, datetimes naïfs en UTC)."""
+    rng = random.Random(config.random_seed)
+    board_id = str(ObjectId())
+    docs = []
+    for _ in range(count):
+        doc = make_item(rng, board_id, "feature", config)
+        doc["_id"] = ObjectId()
+        doc["created_at"] = doc["updated_at"] = datetime(2025, 1, 1, 12, 0, 0, 123000)
+        doc["revision"] = rng.randint(0, 5)
+        docs.append(doc)
+    return docs
+
+
+def response_model_path(docs: List[Dict[str, Any]]) -> bytes:
+    adapter = TypeAdapter(List[Item])
+    items = [Item.model_validate(doc) for doc in docs]
+    content = adapter.dump_python(adapter.validate_python(items), mode="json", by_alias=True)
+    return json.dumps(content).encode("utf-8")
+
+
+def raw_path(docs: List[Dict[str, Any]]) -> bytes:
+    fields = output_fields(Item)
+    return dumps([shape_document(doc, fields) for doc in docs])
+
+
+def measure(function: Callable[[List[Dict[str, Any]]], bytes], docs: List[Dict[str, Any]], rounds: int) -> Dict[str, float]:
+    cpu_times = []
+    size = 0
+    for _ in range(rounds):
+        started = time.process_time()
+        size = len(function(docs))
+        cpu_times.append(time.process_time() - started)
+    best = min(cpu_times)
+    return {
+        "cpu_ms_per_10k_items": round(best / len(docs) * 10_000 * 1000, 2),
+        "cpu_ms_best": round(best * 1000, 2),
+        "bytes": size,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Coût CPU de la sérialisation des listes d'items")
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--metadata-keys", type=int, default=6)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    # Les modèles Beanie ne se construisent qu'une fois la collection initialisée (base en mémoire)
+    asyncio.run(init_database(None, "ai_board_bench"))
+    docs = make_documents(args.items, SeedConfig(metadata_keys=args.metadata_keys))
+    # Les deux chemins doivent produire le même JSON
+    assert json.loads(response_model_path(docs[:50])) == json.loads(raw_path(docs[:50]))
+
+    result = {
+        "items": args.items,
+        "metadata_keys": args.metadata_keys,
+        "response_model": measure(response_model_path, docs, args.rounds),
+        "raw": measure(raw_path, docs, args.rounds),
+    }
+    result["speedup"] = round(result["response_model"]["cpu_ms_best"] / max(result["raw"]["cpu_ms_best"], 1e-6), 1)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Opérations du benchmark : mix de routes FastAPI, mix de tools MCP et rejeu d'un
+fichier JSONL. Chaque opération est une coroutine qui lève BenchError en cas d'échec.
+"""
+import json
+import random
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from seed import SeedConfig, SeedData, make_item
+
+
+class BenchError(Exception):
+    pass
+
+
+@dataclass
+class Context:
+    api: httpx.AsyncClient
+    data: SeedData
+    config: SeedConfig
+    rng: random.Random
+    # client fastmcp (mix "mcp" uniquement)
+    mcp: Any = None
+    # $text et transactions ne sont pas disponibles sous mongomock
+    real_mongo: bool = False
+
+
+Operation = Callable[[Context], Awaitable[None]]
+
+
+@dataclass
+class WeightedOperation:
+    name: str
+    weight: int
+    run: Operation
+
+
+def _check(response: httpx.Response) -> httpx.Response:
+    if response.status_code >= 400:
+        raise BenchError(f"{response.request.method} {response.request.url.path}: {response.status_code}")
+    return response
+
+
+def _board(ctx: Context) -> str:
+    return ctx.rng.choice(ctx.data.board_ids)
+
+
+def _item(ctx: Context) -> str:
+    return ctx.rng.choice(ctx.data.item_ids)
+
+
+# --- Mix API -----------------------------------------------------------------
+
+async def list_boards(ctx: Context) -> None:
+    _check(await ctx.api.get("/boards/"))
+
+
+async def get_board(ctx: Context) -> None:
+    _check(await ctx.api.get(f"/boards/{_board(ctx)}"))
+
+
+async def items_by_board(ctx: Context) -> None:
+    _check(await ctx.api.get(f"/items/by_board/{_board(ctx)}"))
+
+
+async def items_by_board_page(ctx: Context) -> None:
+    _check(await ctx.api.get(f"/items/by_board/{_board(ctx)}", params={"limit": 50, "fields": "title,status,type"}))
+
+
+async def items_by_board_filtered(ctx: Context) -> None:
+    _check(await ctx.api.get(f"/items/by_board/{_board(ctx)}", params={"status": "todo"}))
+
+
+async def get_item(ctx: Context) -> None:
+    _check(await ctx.api.get(f"/items/{_item(ctx)}"))
+
+
+async def create_item(ctx: Context) -> None:
+    item = make_item(ctx.rng, _board(ctx), ctx.rng.choice(ctx.data.item_types), ctx.config)
+    response = _check(await ctx.api.post("/items/", json=item))
+    ctx.data.item_ids.append(response.json()["_id"])
+
+
+async def patch_item(ctx: Context) -> None:
+    _check(await ctx.api.patch(f"/items/{_item(ctx)}", json={"status": ctx.rng.choice(["todo", "done"])}))
+
+
+async def board_stats(ctx: Context) -> None:
+    _check(await ctx.api.get(f"/boards/{_board(ctx)}/stats"))
+
+
+async def latest_schema(ctx: Context) -> None:
+    _check(await ctx.api.get(f"/schemas/{ctx.rng.choice(ctx.data.item_types)}/latest"))
+
+
+async def list_schemas(ctx: Context) -> None:
+    _check(await ctx.api.get("/schemas/"))
+
+
+async def search_items(ctx: Context) -> None:
+    _check(await ctx.api.get("/items/search", params={"board_id": _board(ctx), "q": "cache latency"}))
+
+
+def api_mix(ctx: Context) -> List[WeightedOperation]:
+    """Mix à dominante lecture, proche d'une UI de board consultée par plusieurs clients."""
+    mix = [
+        WeightedOperation("GET /boards/", 5, list_boards),
+        WeightedOperation("GET /boards/{id}", 5, get_board),
+        WeightedOperation("GET /items/by_board/{id}", 15, items_by_board),
+        WeightedOperation("GET /items/by_board/{id}?limit&fields", 15, items_by_board_page),
+        WeightedOperation("GET /items/by_board/{id}?status", 10, items_by_board_filtered),
+        WeightedOperation("GET /items/{id}", 15, get_item),
+        WeightedOperation("POST /items/", 8, create_item),
+        WeightedOperation("PATCH /items/{id}", 10, patch_item),
+        WeightedOperation("GET /boards/{id}/stats", 5, board_stats),
+        WeightedOperation("GET /schemas/{type}/latest", 5, latest_schema),
+        WeightedOperation("GET /schemas/", 2, list_schemas),
+    ]
+    if ctx.real_mongo:
+        mix.append(WeightedOperation("GET /items/search", 5, search_items))
+    return mix
+
+
+# --- Mix MCP -----------------------------------------------------------------
+
+async def _call_tool(ctx: Context, name: str, arguments: Dict[str, Any]) -> Any:
+    result = await ctx.mcp.call_tool(name, arguments, raise_on_error=False)
+    if result.is_error:
+        raise BenchError(f"tool {name}: {result.content}")
+    data = result.structured_content
+    if isinstance(data, dict) and "result" in data and len(data) == 1:
+        data = data["result"]
+    if isinstance(data, dict) and data.get("error"):
+        raise BenchError(f"tool {name}: {data['error']}")
+    return data
+
+
+async def mcp_list_items(ctx: Context) -> None:
+    await _call_tool(ctx, "list_items", {"board_id": _board(ctx), "limit": 50})
+
+
+async def mcp_create_item(ctx: Context) -> None:
+    item_type = ctx.rng.choice(ctx.data.item_types)
+    item = make_item(ctx.rng, _board(ctx), item_type, ctx.config)
+    # metadata conformes au schéma du type : pas de metadata_mismatch
+    item["metadata"] = ctx.data.sample_metadata[item_type]
+    item.pop("technical_description")
+    await _call_tool(ctx, "create_item", item)
+
+
+async def mcp_update_item(ctx: Context) -> None:
+    await _call_tool(ctx, "update_item", {"id": _item(ctx), "status": ctx.rng.choice(["todo", "done"])})
+
+
+async def mcp_find_related_items(ctx: Context) -> None:
+    query = "cache latency" if ctx.real_mongo else ""
+    await _call_tool(ctx, "find_related_items", {"board_id": _board(ctx), "query": query})
+
+
+async def mcp_list_item_types(ctx: Context) -> None:
+    await _call_tool(ctx, "list_item_types", {})
+
+
+def mcp_mix(ctx: Context) -> List[WeightedOperation]:
+    """Mix d'un agent qui décompose des features : beaucoup de lectures de contexte, quelques écritures."""
+    return [
+        WeightedOperation("mcp list_items", 30, mcp_list_items),
+        WeightedOperation("mcp find_related_items", 20, mcp_find_related_items),
+        WeightedOperation("mcp list_item_types", 10, mcp_list_item_types),
+        WeightedOperation("mcp create_item", 20, mcp_create_item),
+        WeightedOperation("mcp update_item", 20, mcp_update_item),
+    ]
+
+
+MIXES = {"api": api_mix, "mcp": mcp_mix}
+
+
+# --- Rejeu JSONL ---------------------------------------------------------------
+
+def _fill(template: str, ctx: Context) -> str:
+    return template.format(
+        board_id=_board(ctx),
+        item_id=_item(ctx),
+        item_type=ctx.rng.choice(ctx.data.item_types),
+    )
+
+
+def _replay_http(record: Dict[str, Any]) -> WeightedOperation:
+    method = record["method"].upper()
+    path = record["path"]
+
+    async def run(ctx: Context) -> None:
+        body = record.get("json")
+        if isinstance(body, str):
+            body = json.loads(_fill(body, ctx))
+        params = {key: _fill(str(value), ctx) for key, value in (record.get("params") or {}).items()}
+        _check(await ctx.api.request(method, _fill(path, ctx), params=params or None, json=body))
+
+    return WeightedOperation(record.get("name") or f"{method} {path}", 1, run)
+
+
+def _replay_backlog(record: Dict[str, Any]) -> WeightedOperation:
+    async def run(ctx: Context) -> None:
+        item_type = ctx.rng.choice(ctx.data.item_types)
+        item = {
+            "title": record["title"],
+            "type": item_type,
+            "functional_description": record.get("body", ""),
+            "board_id": _board(ctx),
+            "metadata": ctx.data.sample_metadata[item_type],
+        }
+        response = _check(await ctx.api.post("/items/", json=item))
+        ctx.data.item_ids.append(response.json()["_id"])
+
+    return WeightedOperation("POST /items/ (backlog)", 1, run)
+
+
+def load_replay(path: str) -> List[WeightedOperation]:
+    """
+    Charge un fichier JSONL à rejouer, une opération par ligne :
+
+    - requête HTTP : {"method": "GET", "path": "/items/by_board/{board_id}", "params": {...}, "json": ...}
+      (les marqueurs {board_id}, {item_id} et {item_type} sont remplacés par des valeurs du seed) ;
+    - entrée de backlog ({"request_id", "title", "body"}, ex: requests.jsonl) : ce n'est pas un
+      journal de trafic, chaque entrée est rejouée comme un POST /items/ portant son titre et son texte.
+    """
+    operations = []
+    with open(path, encoding="utf-8") as replay_file:
+        for line_number, line in enumerate(replay_file, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if "method" in record and "path" in record:
+                operations.append(_replay_http(record))
+            elif "title" in record:
+                operations.append(_replay_backlog(record))
+            else:
+                raise ValueError(f"{path}:{line_number}: ni requête HTTP (method/path) ni entrée de backlog (title)")
+    return operations
+
+
+def pick(operations: List[WeightedOperation], rng: random.Random) -> WeightedOperation:
+    return rng.choices(operations, weights=[operation.weight for operation in operations])[0]
+
+
+def pick_sequence(operations: List[WeightedOperation], index: int) -> Optional[WeightedOperation]:
+    return operations[index % len(operations)] if operations else None
@@ -1,8 +1,17 @@
 import os
+import json
 import logging
-from typing import Dict
+import re
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 import httpx
 from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import Response
+
+from metrics import CONTENT_TYPE, DEFAULT_SIZE_BUCKETS, Registry
 
 logging.basicConfig(
     level=logging.INFO,
@@ -12,12 +21,253 @@ logger = logging.getLogger("mcp")
 
 API_URL = os.environ.get("API_URL", "http://localhost:8000")
 
+# Configuration du client HTTP partagé (pool de connexions keep-alive vers l'API)
+HTTP_MAX_CONNECTIONS = int(os.environ.get("MCP_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("MCP_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("MCP_HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.environ.get("MCP_HTTP_TIMEOUT", "5"))
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("MCP_HTTP_CONNECT_TIMEOUT", "5"))
+# HTTP/2 nécessite le paquet h2 (pip install httpx[http2]) et une API servie en TLS
+HTTP2 = os.environ.get("MCP_HTTP2", "false").lower() in ("1", "true", "yes")
+
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_users = 0
+
+# Métriques des appels à l'API (GET /metrics du service MCP)
+metrics_registry = Registry()
+api_calls = metrics_registry.counter(
+    "mcp_api_requests_total", "Appels HTTP du service MCP vers l'API", ("method", "path", "status"),
+)
+api_call_duration = metrics_registry.histogram(
+    "mcp_api_request_duration_seconds", "Durée des appels à l'API, jusqu'à la réception des en-têtes", ("method", "path"),
+)
+api_response_size = metrics_registry.histogram(
+    "mcp_api_response_size_bytes", "Taille des réponses de l'API (Content-Length)", ("method", "path"), DEFAULT_SIZE_BUCKETS,
+)
+_OBJECT_ID_SEGMENT = re.compile(r"/[0-9a-f]{24}(?=/|$)")
+
+
+def _metrics_path(url: httpx.URL) -> str:
+    # Les identifiants Mongo sont remplacés par {id} pour borner la cardinalité
+    return _OBJECT_ID_SEGMENT.sub("/{id}", url.path)
+
+
+async def _on_request(request: httpx.Request) -> None:
+    request.extensions["metrics_started"] = time.perf_counter()
+
+
+async def _on_response(response: httpx.Response) -> None:
+    request = response.request
+    started = request.extensions.get("metrics_started")
+    path = _metrics_path(request.url)
+    api_calls.inc(request.method, path, str(response.status_code))
+    if started is not None:
+        api_call_duration.observe(time.perf_counter() - started, request.method, path)
+    content_length = response.headers.get("content-length")
+    if content_length is not None:
+        api_response_size.observe(int(content_length), request.method, path)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Retourne le client HTTP partagé par tous les tools (créé à la demande).
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        http2 = HTTP2 and _http2_available()
+        if HTTP2 and not http2:
+            logger.warning("MCP_HTTP2 activé mais le paquet h2 n'est pas installé, utilisation de HTTP/1.1")
+        _http_client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            event_hooks={"request": [_on_request], "response": [_on_response]},
+        )
+    return _http_client
+
+
+@asynccontextmanager
+async def http_client_lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """
+    Lifespan FastMCP : ouvre le client HTTP partagé au démarrage et le ferme à l'arrêt.
+    Le compteur d'utilisateurs évite de fermer le client si le lifespan est
+    entré plusieurs fois (une fois par session selon le transport).
+    """
+    global _http_client, _http_client_users
+    _http_client_users += 1
+    get_http_client()
+    try:
+        yield
+    finally:
+        _http_client_users -= 1
+        if _http_client_users == 0 and _http_client is not None:
+            await _http_client.aclose()
+            _http_client = None
+
+
+# Cache LRU + TTL des réponses de l'API /schemas (les schémas changent rarement)
+SCHEMA_CACHE_TTL = float(os.environ.get("MCP_SCHEMA_CACHE_TTL", "60"))
+SCHEMA_CACHE_SIZE = int(os.environ.get("MCP_SCHEMA_CACHE_SIZE", "256"))
+
+
+class SchemaCache:
+    """
+    Cache LRU avec expiration des réponses GET de l'API /schemas.
+
+    Tant qu'une entrée est fraîche, elle est servie sans appel réseau. Une fois
+    expirée, elle est revalidée par un GET conditionnel (If-None-Match) : un 304
+    prolonge l'entrée sans retransférer le corps.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[Optional[str], Any, float]]" = OrderedDict()
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        if path is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(path, None)
+
+    def _store(self, path: str, etag: Optional[str], data: Any) -> None:
+        self._entries[path] = (etag, data, time.monotonic() + self.ttl)
+        self._entries.move_to_end(path)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, client: httpx.AsyncClient, path: str) -> Optional[Any]:
+        """
+        Retourne le JSON de GET {API_URL}{path}, ou None si l'API répond 404.
+        Les autres erreurs HTTP sont levées (httpx.HTTPStatusError).
+        """
+        entry = self._entries.get(path)
+        headers = {}
+        if entry is not None:
+            etag, data, expires_at = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(path)
+                return data
+            if etag:
+                headers["If-None-Match"] = etag
+        response = await client.get(f"{API_URL}{path}", headers=headers)
+        if response.status_code == 304 and entry is not None:
+            self._store(path, entry[0], entry[1])
+            return entry[1]
+        if response.status_code == 404:
+            self.invalidate(path)
+            return None
+        response.raise_for_status()
+        data = response.json()
+        self._store(path, response.headers.get("ETag"), data)
+        return data
+
+
+schema_cache = SchemaCache(SCHEMA_CACHE_TTL, SCHEMA_CACHE_SIZE)
+
+
+# Niveaux de détail des items renvoyés par les tools (paramètre `detail`) : champs
+# demandés à l'API (projection Mongo côté API), "" = tous les champs
+DETAIL_FIELDS = {
+    "ids": "title",
+    "summary": "title,type,status,functional_description",
+    "full": "",
+}
+# Taille minimale du JSON d'un item à chaque niveau (clés et identifiant seuls) : borne
+# le nombre d'items qu'il est utile de lire pour un budget max_chars
+DETAIL_MIN_CHARS = {"ids": 38, "summary": 90, "full": 250}
+# Longueur maximale des textes au niveau "summary" (tronqués par l'API)
+SUMMARY_MAX_TEXT = int(os.environ.get("MCP_SUMMARY_MAX_TEXT", "160"))
+# Plus petite troncature acceptée par l'API (max_text)
+MIN_MAX_TEXT = 16
+
+
+def _detail_params(detail: str, max_chars: int = 0) -> Dict[str, Any]:
+    """
+    Paramètres de l'API pour un niveau de détail : `fields` (seuls ces champs sont lus et
+    renvoyés) et `max_text` (textes tronqués par l'API). Avec un budget max_chars, un texte
+    ne peut pas en occuper plus du quart. Lève ValueError sur un niveau inconnu.
+    """
+    if detail not in DETAIL_FIELDS:
+        raise ValueError(f"Unknown detail level '{detail}' (expected one of: {', '.join(DETAIL_FIELDS)})")
+    params: Dict[str, Any] = {}
+    if DETAIL_FIELDS[detail]:
+        params["fields"] = DETAIL_FIELDS[detail]
+    max_text = SUMMARY_MAX_TEXT if detail == "summary" else 0
+    if max_chars:
+        budget_text = max(MIN_MAX_TEXT, max_chars // 4)
+        max_text = min(max_text, budget_text) if max_text else budget_text
+    if max_text:
+        params["max_text"] = max_text
+    return params
+
+
+def _budget_limit(detail: str, max_items: int, max_chars: int, cap: int = 1000) -> int:
+    """
+    Nombre d'items à demander à l'API : max_items, réduit au nombre d'items qui peuvent
+    tenir dans max_chars et à la limite `cap` de la route (0 = pas de limite).
+    """
+    if not max_chars:
+        return max_items
+    fitting = min(cap, max_chars // DETAIL_MIN_CHARS.get(detail, DETAIL_MIN_CHARS["ids"]) + 1)
+    return min(max_items, fitting) if max_items else fitting
+
+
+def _fit_budget(items: List[Dict], max_chars: int) -> Tuple[List[Dict], bool]:
+    """
+    Premiers items dont le JSON tient dans max_chars caractères, et True si des items
+    ont été écartés (0 = pas de budget).
+    """
+    if not max_chars:
+        return items, False
+    used = 2
+    for index, item in enumerate(items):
+        used += len(json.dumps(item, ensure_ascii=False, separators=(",", ":"))) + 2
+        if used > max_chars:
+            return items[:index], True
+    return items, False
+
+
 mcp = FastMCP(
     name="ai-driven-board-mcp",
     port=9000,
-    host="0.0.0.0"
+    host="0.0.0.0",
+    lifespan=http_client_lifespan
 )
 
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> Response:
+    """Métriques au format texte Prometheus (appels HTTP vers l'API)."""
+    return Response(content=metrics_registry.render(), media_type=CONTENT_TYPE)
+
+def _metadata_may_differ(metadata: Dict, schema_fields: Dict) -> bool:
+    """
+    Comparaison locale (sans appel API) des metadata au schéma courant d'un type :
+    mêmes clés et mêmes types de premier niveau. Les valeurs imbriquées (objets,
+    listes) ne peuvent pas être tranchées localement et renvoient True.
+    """
+    if set(metadata) != set(schema_fields):
+        return True
+    for key, value in metadata.items():
+        if isinstance(value, (dict, list)):
+            return True
+        spec = schema_fields.get(key)
+        if not isinstance(spec, dict) or spec.get("type") != type(value).__name__:
+            return True
+    return False
+
 @mcp.tool()
 async def create_item(
     title: str,
@@ -28,7 +278,9 @@ async def create_item(
     status: str = "todo",
     checklist: list = [],
     metadata: Dict = {},
-    first_request: bool = True
+    first_request: bool = True,
+    detail: str = "full",
+    on_duplicate: str = "allow"
 ) -> Dict:
     """
     Create a new item in the board with dynamic metadata and optional board assignment.
@@ -47,9 +299,21 @@ async def create_item(
         checklist (list of dict, optional): A list of checklist items, each as a dict with keys "task" (str) and "completed" (bool). Default: [].
         metadata (dict, optional): Arbitrary key-value pairs for custom metadata (e.g., priority, tags, estimation, or anything else relevant for this item). Default: {}.
         first_request (bool, optional): Whether this is the first request for item creation. Default: True.
+        detail (str, optional): Fields returned for the created item: "ids" (_id, title),
+            "summary" (title, type, status, start of functional_description) or "full" (every field).
+            Default: "full"; pass "ids" when only the new _id is needed.
+        on_duplicate (str, optional): What to do when the board already has items with a nearly identical
+            title and functional description. Default: "allow", as for POST /items/.
+            - "allow": the item is created; likely duplicates are listed under "possible_duplicates" (their _id).
+              Check them and delete the new item, or update it, if it only repeats one of them.
+            - "reject": nothing is created; returns {"error": "possible_duplicate", "duplicates": [...]}
+              ({"_id", "title", "type", "status", "similarity"}). Update one of them, or call again with
+              "allow" if the new item really is different.
+            - "merge": the closest duplicate is completed with what it lacks (empty descriptions, new metadata
+              keys, new checklist tasks) and returned with "merged_into"; no item is created.
 
     Returns:
-        dict: The created item as a dictionary, including its unique ID and all fields.
+        dict: The created item as a dictionary, including its unique ID and the fields of the `detail` level.
 
     Example:
         >>> create_item(
@@ -64,7 +328,7 @@ async def create_item(
         ...     first_request=True
         ... )
         {
-            "id": "item456",
+            "_id": "item456",
             "title": "Add OAuth login",
             "type": "feature",
             "functional_description": "Allow users to log in with Google",
@@ -74,20 +338,31 @@ async def create_item(
             "checklist": [{"task": "Design UI", "completed": False}],
             "metadata": {"priority": "high"},
             "created_at": "...",
-            "updated_at": "..."
+            "updated_at": "...",
+            "revision": 0
         }
 
+        With detail="summary", only "_id", "title", "type", "status" and the start of
+        "functional_description" are returned.
+
     Notes:
         - All fields not provided will use their default values.
         - The returned dictionary includes auto-generated fields such as "id", "created_at", and "updated_at".
         - Checklist items should be dictionaries with "task" (str) and "completed" (bool).
+        - Duplicate detection is done server-side on an index: no need to list the board first.
         
     Enhanced:
     - Checks if the type exists via the schemas API.
-    - If type exists, compares requested metadata to the latest schema.
-    - If metadata differ and first_request is True, returns a message explaining the differences and options.
+    - If type exists, compares requested metadata keys and types to the latest schema.
+    - If metadata differ and first_request is True, returns a message explaining the
+      structural differences (added, removed and changed paths) and options.
     - If not first_request, creates the item regardless of differences.
     """
+    try:
+        detail_params = _detail_params(detail)
+    except ValueError as e:
+        return {"error": str(e)}
+    detail_params["on_duplicate"] = on_duplicate
     payload = {
         "title": title,
         "type": type,
@@ -99,58 +374,89 @@ async def create_item(
         "metadata": metadata
     }
     logger.info(f"Enhanced create_item: check type/schema before POST {API_URL}/items")
-    async with httpx.AsyncClient() as client:
-        # 1. Vérifier si le type existe déjà via l'API schemas
-        try:
-            schema_resp = await client.get(f"{API_URL}/schemas/{type}/latest")
-            if schema_resp.status_code == 404:
-                # Type inconnu, on peut créer l'item normalement
-                logger.info(f"Type {type} inconnu, création directe.")
-            elif schema_resp.status_code == 200:
-                schema = schema_resp.json()
-                schema_metadata = schema.get("metadata", {})
-                # 2. Comparer les metadata demandées à celles du modèle courant
-                if metadata != schema_metadata:
-                    if first_request:
-                        # Générer un message d'explication structuré pour LLM
-                        diff_keys = set(metadata.keys()) ^ set(schema_metadata.keys())
-                        common_keys = set(metadata.keys()) & set(schema_metadata.keys())
-                        value_diffs = {k: (metadata[k], schema_metadata[k]) for k in common_keys if metadata[k] != schema_metadata[k]}
-                        explanation = {
-                            "message": "Les metadata demandées diffèrent du modèle existant pour ce type.",
-                            "diff_keys": list(diff_keys),
-                            "value_diffs": value_diffs,
-                            "conseil": (
-                                "Vous pouvez soit utiliser le modèle existant (metadata actuelles), "
-                                "soit proposer de nouveaux champs si vraiment nécessaires. "
-                                "Si vous souhaitez forcer la création avec ces metadata, relancez la demande avec first_request=False."
-                            ),
-                            "metadata_attendu": schema_metadata,
-                            "metadata_demande": metadata
-                        }
-                        logger.info(f"Différence de metadata détectée pour le type {type}: {explanation}")
-                        return {"error": "metadata_mismatch", "explanation": explanation}
-                    else:
-                        logger.info(f"Différence de metadata ignorée (first_request=False), création forcée.")
+    client = get_http_client()
+    # Le schéma courant du type doit-il être relu après la création ?
+    schema_changed = False
+    # 1. Vérifier si le type existe déjà via l'API schemas (cache local, revalidé par ETag)
+    try:
+        schema = await schema_cache.get(client, f"/schemas/{type}/latest")
+        if schema is None:
+            # Type inconnu, on peut créer l'item normalement
+            logger.info(f"Type {type} inconnu, création directe.")
+            schema_changed = True
+        else:
+            schema_fields = schema.get("schema", {})
+            # 2. Comparer localement les clés et types de premier niveau au schéma courant ;
+            # le diff structurel n'est demandé à l'API qu'en cas de doute
+            diff = None
+            if _metadata_may_differ(metadata, schema_fields):
+                diff_response = await client.post(f"{API_URL}/schemas/{type}/diff", json=metadata)
+                diff_response.raise_for_status()
+                diff = diff_response.json()
+                if diff.get("identical"):
+                    diff = None
+            if diff is not None:
+                if first_request:
+                    # Générer un message d'explication structuré pour LLM
+                    changes = diff.get("diff", {})
+                    explanation = {
+                        "message": "Les metadata demandées diffèrent du modèle existant pour ce type.",
+                        "diff_keys": sorted(set(changes.get("added", {})) | set(changes.get("removed", {}))),
+                        "diff": changes,
+                        "conseil": (
+                            "Vous pouvez soit utiliser le modèle existant (metadata actuelles), "
+                            "soit proposer de nouveaux champs si vraiment nécessaires. "
+                            "Si vous souhaitez forcer la création avec ces metadata, relancez la demande avec first_request=False."
+                        ),
+                        "metadata_attendu": schema_fields,
+                        "metadata_demande": metadata
+                    }
+                    logger.info(f"Différence de metadata détectée pour le type {type}: {explanation}")
+                    return {"error": "metadata_mismatch", "explanation": explanation}
                 else:
-                    logger.info(f"Metadata identiques au modèle existant, création normale.")
+                    logger.info(f"Différence de metadata ignorée (first_request=False), création forcée.")
+                    schema_changed = True
             else:
-                logger.warning(f"Réponse inattendue de l'API schemas: {schema_resp.status_code} {schema_resp.text}")
-        except Exception as e:
-            logger.error(f"Erreur lors de la vérification du schéma: {str(e)}")
-            # On continue la création même si la vérification échoue
+                logger.info(f"Metadata identiques au modèle existant, création normale.")
+    except httpx.HTTPStatusError as e:
+        logger.warning(f"Réponse inattendue de l'API schemas: {e.response.status_code} {e.response.text}")
+    except Exception as e:
+        logger.error(f"Erreur lors de la vérification du schéma: {str(e)}")
+        # On continue la création même si la vérification échoue
 
-        # 3. Créer l'item normalement
-        try:
-            response = await client.post(f"{API_URL}/items/", json=payload)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTPStatusError: {e.response.status_code} {e.response.text}")
-            return {"error": f"API error: {e.response.status_code} {e.response.text}"}
-        except Exception as e:
-            logger.error(f"Exception lors de l'appel API: {str(e)}")
-            return {"error": str(e)}
+    # 3. Créer l'item normalement
+    try:
+        response = await client.post(f"{API_URL}/items/", params=detail_params, json=payload)
+        if response.status_code == 409:
+            detail_body = response.json().get("detail")
+            if isinstance(detail_body, dict) and "duplicates" in detail_body:
+                logger.info(f"Doublons probables, item non créé: {detail_body['duplicates']}")
+                return {
+                    "error": "possible_duplicate",
+                    "duplicates": detail_body["duplicates"],
+                    "conseil": (
+                        "Des items très proches existent déjà dans ce board. Mettez-en un à jour (update_item), "
+                        "ou relancez avec on_duplicate=\"merge\" pour compléter le plus proche, "
+                        "ou on_duplicate=\"allow\" si le nouvel item est réellement différent."
+                    ),
+                }
+        response.raise_for_status()
+        if schema_changed:
+            # L'API a pu créer un nouveau type ou une nouvelle version de schéma
+            schema_cache.invalidate(f"/schemas/{type}/latest")
+            schema_cache.invalidate("/schemas/")
+        result = response.json()
+        if response.headers.get("X-Merged-Into"):
+            result["merged_into"] = response.headers["X-Merged-Into"]
+        if response.headers.get("X-Possible-Duplicates"):
+            result["possible_duplicates"] = response.headers["X-Possible-Duplicates"].split(",")
+        return result
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTPStatusError: {e.response.status_code} {e.response.text}")
+        return {"error": f"API error: {e.response.status_code} {e.response.text}"}
+    except Exception as e:
+        logger.error(f"Exception lors de l'appel API: {str(e)}")
+        return {"error": str(e)}
 
 @mcp.tool()
 async def update_item(
@@ -162,12 +468,19 @@ async def update_item(
     board_id: str = "",
     status: str = "",
     checklist: list = [],
-    metadata: Dict = {}
+    metadata: Dict = {},
+    detail: str = "full"
 ) -> Dict:
     """
     Update an existing item by ID with provided fields.
     Only non-empty fields will be updated.
+    `detail` selects the fields returned for the updated item: "ids" (_id, title),
+    "summary" (title, type, status, start of functional_description) or "full" (default).
     """
+    try:
+        detail_params = _detail_params(detail)
+    except ValueError as e:
+        return {"error": str(e)}
     payload = {}
     if title: payload["title"] = title
     if type: payload["type"] = type
@@ -179,22 +492,97 @@ async def update_item(
     if metadata: payload["metadata"] = metadata
 
     logger.info(f"PATCH {API_URL}/items/{id}")
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.patch(f"{API_URL}/items/{id}", json=payload)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTPStatusError: {e.response.status_code} {e.response.text}")
-            return {"error": f"API error: {e.response.status_code} {e.response.text}"}
-        except Exception as e:
-            logger.error(f"Exception lors de l'appel API: {str(e)}")
-            return {"error": str(e)}
+    client = get_http_client()
+    try:
+        response = await client.patch(f"{API_URL}/items/{id}", params=detail_params, json=payload)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTPStatusError: {e.response.status_code} {e.response.text}")
+        return {"error": f"API error: {e.response.status_code} {e.response.text}"}
+    except Exception as e:
+        logger.error(f"Exception lors de l'appel API: {str(e)}")
+        return {"error": str(e)}
         
+@mcp.tool()
+async def create_items(
+    items: list,
+    ordered: bool = False
+) -> Dict:
+    """
+    Create several items in a single API call (bulk insert).
+
+    Prefer this tool over repeated create_item calls when decomposing a feature into
+    many tasks: the whole batch costs one HTTP request and one database round-trip.
+    The metadata schema check of create_item is not performed here.
+
+    Args:
+        items (list of dict): The items to create. Each dict accepts the same keys as create_item
+            ("title" and "type" are required; "functional_description", "technical_description",
+            "board_id", "status", "checklist", "metadata" are optional).
+        ordered (bool, optional): If True, stop at the first failing item. Default: False.
+
+    Returns:
+        dict: {"ok": <number created>, "errors": <number failed>, "results": [...]}, with one result per
+            input item, in order: {"index", "id", "status": "created" | "error", "error"}.
+    """
+    logger.info(f"POST {API_URL}/items/bulk ({len(items)} items)")
+    client = get_http_client()
+    try:
+        response = await client.post(f"{API_URL}/items/bulk", params={"ordered": ordered}, json=items)
+        response.raise_for_status()
+        # De nouveaux types ou versions de schéma ont pu être créés
+        schema_cache.invalidate()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTPStatusError: {e.response.status_code} {e.response.text}")
+        return {"error": f"API error: {e.response.status_code} {e.response.text}"}
+    except Exception as e:
+        logger.error(f"Exception lors de l'appel API: {str(e)}")
+        return {"error": str(e)}
+
+@mcp.tool()
+async def update_items(
+    updates: list,
+    ordered: bool = False
+) -> Dict:
+    """
+    Partially update several items in a single API call (bulk update).
+
+    Args:
+        updates (list of dict): Each entry is {"id": "<item id>", "data": {<fields to update>}}.
+            "data" follows update_item semantics: only the given fields change, and "metadata"
+            keys are merged into the existing metadata.
+        ordered (bool, optional): If True, stop at the first failing update. Default: False.
+
+    Returns:
+        dict: {"ok", "errors", "results": [...]}, with one result per entry, in order:
+            {"index", "id", "status": "updated" | "not_found" | "error", "error"}.
+    """
+    logger.info(f"PATCH {API_URL}/items/bulk ({len(updates)} updates)")
+    client = get_http_client()
+    try:
+        response = await client.patch(f"{API_URL}/items/bulk", params={"ordered": ordered}, json=updates)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTPStatusError: {e.response.status_code} {e.response.text}")
+        return {"error": f"API error: {e.response.status_code} {e.response.text}"}
+    except Exception as e:
+        logger.error(f"Exception lors de l'appel API: {str(e)}")
+        return {"error": str(e)}
+
 @mcp.tool()
 async def list_items(
     board_id: str,
-    filters: Dict = None
+    filters: Dict = None,
+    limit: int = 0,
+    after: str = "",
+    fields: str = "",
+    sort: str = "",
+    detail: str = "full",
+    max_items: int = 0,
+    max_chars: int = 0
 ) -> Dict:
     """
     Liste les items d'un board avec filtrage dynamique sur tous les champs, y compris metadata.
@@ -207,9 +595,27 @@ async def list_items(
         filters (dict, optionnel): Dictionnaire de filtres à appliquer. Les clés correspondent aux champs du modèle Item.
             Pour filtrer dans metadata, utiliser la syntaxe "metadata.<clé>" (ex: "metadata.priority").
             Exemple: {"status": "todo", "type": "feature", "metadata.priority": "high"}
+            Opérateurs par suffixe de clé : "__ne", "__in" / "__nin" (liste ou valeurs séparées par des virgules),
+            "__gt", "__gte", "__lt", "__lte" et "__exists" (true/false).
+            Exemple: {"status__in": ["todo", "review"], "metadata.points__gte": 3, "metadata.owner__exists": True}
+            Les valeurs sont converties côté serveur selon le type du champ (schémas de metadata) : 3 et "3" sont équivalents.
+        limit (int, optionnel): Nombre maximal d'items à retourner (pagination). 0 = tous les items.
+        after (str, optionnel): Identifiant du dernier item de la page précédente (valeur "next_after" d'un appel précédent).
+        fields (str, optionnel): Liste de champs à retourner séparés par des virgules (ex: "title,status").
+            L'identifiant "_id" est toujours inclus. Prioritaire sur les champs du niveau `detail`.
+        sort (str, optionnel): Tri, champs séparés par des virgules, préfixe "-" pour décroissant
+            (ex: "-metadata.points,title"). Incompatible avec `after` ; combiner avec `limit` pour un "top N".
+        detail (str, optionnel): Niveau de détail des items :
+            "ids" (_id et title), "summary" (title, type, status et début de functional_description),
+            "full" (défaut : tous les champs, dont metadata, checklist et dates).
+        max_items (int, optionnel): Nombre maximal d'items (comme limit). 0 = pas de limite.
+        max_chars (int, optionnel): Budget en caractères du JSON des items ; les textes longs sont tronqués
+            par l'API et les items qui ne tiennent pas sont écartés (voir "truncated"). 0 = pas de budget.
 
     Returns:
-        dict: Un dictionnaire contenant la liste des items filtrés sous la clé "items".
+        dict: Un dictionnaire contenant la liste des items filtrés sous la clé "items",
+            l'identifiant à passer dans `after` pour la page suivante sous la clé "next_after" (None si dernière page),
+            et "truncated" (True si des items ont été écartés pour respecter max_chars).
 
     Exemple d'appel:
         >>> list_items(
@@ -219,7 +625,7 @@ async def list_items(
         {
             "items": [
                 {
-                    "id": "...",
+                    "_id": "...",
                     "title": "...",
                     "type": "feature",
                     "status": "todo",
@@ -234,14 +640,35 @@ async def list_items(
         - Tous les filtres sont combinés avec un ET logique (AND).
         - Les clés de filtre peuvent cibler n'importe quel champ du modèle, y compris les sous-champs de metadata.
         - Si filters est None ou vide, tous les items du board sont retournés.
-        - Pour filtrer sur plusieurs valeurs d'un même champ, appeler plusieurs fois ce tool ou faire le filtrage côté client.
+        - Pour filtrer sur plusieurs valeurs d'un même champ, utiliser "__in" plutôt que de filtrer côté client.
+        - Un champ ou un opérateur inconnu renvoie une erreur 400 de l'API.
+        - Sur les gros boards, préférer detail="ids", `max_items` + `after` ou `max_chars` pour limiter
+          le volume retourné ; n'utiliser detail="full" que pour les items à modifier.
 
     """
+    try:
+        detail_params = _detail_params(detail, max_chars)
+    except ValueError as e:
+        return {"error": str(e)}
+    limit = _budget_limit("ids" if fields else detail, max_items or limit, max_chars)
     # Construction de la query string
     params = {"board_id": board_id}
+    params.update(detail_params)
     if filters:
         for k, v in filters.items():
+            if isinstance(v, (list, tuple)):
+                v = ",".join(str(value) for value in v)
+            elif isinstance(v, bool):
+                v = "true" if v else "false"
             params[k] = v
+    if limit:
+        params["limit"] = limit
+    if sort:
+        params["sort"] = sort
+    if after:
+        params["after"] = after
+    if fields:
+        params["fields"] = fields
     # Générer l'URL avec query params
     from urllib.parse import urlencode
     query = urlencode(params)
@@ -249,17 +676,22 @@ async def list_items(
     if query:
         url = f"{url}?{urlencode({k: v for k, v in params.items() if k != 'board_id'})}"
     logger.info(f"GET {url}")
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url)
-            response.raise_for_status()
-            return {"items": response.json()}
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTPStatusError: {e.response.status_code} {e.response.text}")
-            return {"error": f"API error: {e.response.status_code} {e.response.text}"}
-        except Exception as e:
-            logger.error(f"Exception lors de l'appel API: {str(e)}")
-            return {"error": str(e)}
+    client = get_http_client()
+    try:
+        response = await client.get(url)
+        response.raise_for_status()
+        items, truncated = _fit_budget(response.json(), max_chars)
+        next_after = response.headers.get("X-Next-After")
+        if truncated and not sort:
+            # la page suivante reprend après le dernier item gardé
+            next_after = items[-1]["_id"] if items else after or None
+        return {"items": items, "next_after": next_after, "truncated": truncated}
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTPStatusError: {e.response.status_code} {e.response.text}")
+        return {"error": f"API error: {e.response.status_code} {e.response.text}"}
+    except Exception as e:
+        logger.error(f"Exception lors de l'appel API: {str(e)}")
+        return {"error": str(e)}
 
 
 @mcp.tool()
@@ -279,50 +711,159 @@ async def create_board(
         "metadata": metadata if metadata is not None else {}
     }
     logger.info(f"POST {API_URL}/boards/")
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(f"{API_URL}/boards/", json=payload)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTPStatusError: {e.response.status_code} {e.response.text}")
-            return {"error": f"API error: {e.response.status_code} {e.response.text}"}
-        except Exception as e:
-            logger.error(f"Exception lors de l'appel API: {str(e)}")
-            return {"error": str(e)}
+    client = get_http_client()
+    try:
+        response = await client.post(f"{API_URL}/boards/", json=payload)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTPStatusError: {e.response.status_code} {e.response.text}")
+        return {"error": f"API error: {e.response.status_code} {e.response.text}"}
+    except Exception as e:
+        logger.error(f"Exception lors de l'appel API: {str(e)}")
+        return {"error": str(e)}
 
 
 
+@mcp.tool()
+async def move_board_items(
+    board_id: str,
+    target_board_id: str,
+    item_ids: Optional[List[str]] = None,
+    status: Optional[str] = None
+) -> Dict:
+    """
+    Move items from one board to another in a single server-side operation.
+
+    Args:
+        board_id (str): Source board.
+        target_board_id (str): Destination board.
+        item_ids (list of str, optional): Only move these items (default: all items of the board).
+        status (str, optional): Only move items with this status.
+
+    Returns:
+        dict: {"moved_items": n}, or for very large boards a background job
+        ({"_id", "kind", "status", "processed", "total", ...}) whose progress is available on
+        GET /boards/jobs/{_id}.
+    """
+    payload = {"target_board_id": target_board_id, "item_ids": item_ids, "status": status}
+    logger.info(f"POST {API_URL}/boards/{board_id}/move-items")
+    client = get_http_client()
+    try:
+        response = await client.post(f"{API_URL}/boards/{board_id}/move-items", json=payload)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTPStatusError: {e.response.status_code} {e.response.text}")
+        return {"error": f"API error: {e.response.status_code} {e.response.text}"}
+    except Exception as e:
+        logger.error(f"Exception lors de l'appel API: {str(e)}")
+        return {"error": str(e)}
+
+
 @mcp.tool()
 async def find_related_items(
     board_id: str,
-    query: str = ""
+    query: str = "",
+    limit: int = 20,
+    detail: str = "full",
+    max_items: int = 0,
+    max_chars: int = 0
 ) -> Dict:
     """
     Find items in a board related to a query (searches title and descriptions).
+
+    The search runs server-side on a full-text index: only the `limit` most relevant
+    items are returned, sorted by relevance (each item carries a "score" key).
+    If query is empty, all items of the board are returned (up to max_items).
+    For items phrased differently (synonyms, word variants), use find_similar_items.
+
+    Args:
+        detail (str): "ids" (_id, title), "summary" (title, type, status and the start
+            of functional_description) or "full" (default: every field).
+        max_items (int): Maximum number of items (same as limit; 0 = limit).
+        max_chars (int): Character budget for the returned items; long texts are truncated by the API
+            and items that do not fit are dropped ("truncated": True). 0 = no budget.
     """
-    logger.info(f"GET {API_URL}/items/by_board/{board_id} for related items")
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{API_URL}/items/by_board/{board_id}")
+    client = get_http_client()
+    try:
+        params = _detail_params(detail, max_chars)
+        if query:
+            logger.info(f"GET {API_URL}/items/search for related items")
+            params.update(q=query, board_id=board_id, limit=_budget_limit(detail, max_items or limit, max_chars, cap=200))
+            response = await client.get(f"{API_URL}/items/search", params=params)
+            response.raise_for_status()
+            items, truncated = _fit_budget(response.json(), max_chars)
+            return {"items": items, "truncated": truncated}
+        # Sans requête : lecture en streaming (NDJSON) du board, arrêtée dès que le budget est atteint
+        logger.info(f"GET {API_URL}/items/by_board/{board_id} for related items")
+        params["format"] = "ndjson"
+        limit = _budget_limit(detail, max_items, max_chars)
+        if limit:
+            params["limit"] = limit
+        items = []
+        truncated = False
+        used = 2
+        async with client.stream("GET", f"{API_URL}/items/by_board/{board_id}", params=params) as response:
             response.raise_for_status()
-            items = response.json()
-            if query:
-                q = query.lower()
-                filtered = [
-                    item for item in items
-                    if q in (item.get("title", "").lower() + " " +
-                             item.get("functional_description", "").lower() + " " +
-                             item.get("technical_description", "").lower())
-                ]
-                return {"items": filtered}
-            return {"items": items}
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTPStatusError: {e.response.status_code} {e.response.text}")
-            return {"error": f"API error: {e.response.status_code} {e.response.text}"}
-        except Exception as e:
-            logger.error(f"Exception lors de l'appel API: {str(e)}")
-            return {"error": str(e)}
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                used += len(line) + 2
+                if max_chars and used > max_chars:
+                    truncated = True
+                    break
+                items.append(json.loads(line))
+        return {"items": items, "truncated": truncated}
+    except httpx.HTTPStatusError as e:
+        await e.response.aread()
+        logger.error(f"HTTPStatusError: {e.response.status_code} {e.response.text}")
+        return {"error": f"API error: {e.response.status_code} {e.response.text}"}
+    except Exception as e:
+        logger.error(f"Exception lors de l'appel API: {str(e)}")
+        return {"error": str(e)}
+
+@mcp.tool()
+async def find_similar_items(
+    board_id: str,
+    queries: List[str] = None,
+    item_ids: List[str] = None,
+    k: int = 10,
+    min_score: float = 0.05
+) -> Dict:
+    """
+    Trouve les items d'un board sémantiquement proches de textes ou d'items existants.
+
+    Contrairement à find_related_items (mots exacts), la recherche utilise un index vectoriel
+    (TF-IDF haché sur mots, bigrammes et fragments de mots) : "exporter en CSV" retrouve
+    "Export des rapports au format csv". Plusieurs requêtes sont traitées en un seul appel.
+
+    Args:
+        board_id (str): Board dans lequel chercher.
+        queries (list[str], optionnel): Textes libres (ex: titre d'un item à créer, pour détecter un doublon).
+        item_ids (list[str], optionnel): Items de référence ; chacun est exclu de ses propres résultats.
+        k (int): Nombre maximal d'items par requête (1 à 100).
+        min_score (float): Score cosinus minimal (0 à 1).
+
+    Returns:
+        dict: {"board_id": ..., "results": [{"query" ou "item_id": ..., "items": [{"_id", "title", "type", "status", "score"}]}]}
+            dans l'ordre des queries puis des item_ids.
+    """
+    params = [("board_id", board_id), ("k", k), ("min_score", min_score)]
+    params += [("q", query) for query in queries or []]
+    params += [("item_id", item_id) for item_id in item_ids or []]
+    logger.info(f"GET {API_URL}/items/similar ({len(params) - 3} requêtes)")
+    client = get_http_client()
+    try:
+        response = await client.get(f"{API_URL}/items/similar", params=params)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTPStatusError: {e.response.status_code} {e.response.text}")
+        return {"error": f"API error: {e.response.status_code} {e.response.text}"}
+    except Exception as e:
+        logger.error(f"Exception lors de l'appel API: {str(e)}")
+        return {"error": str(e)}
 
 @mcp.tool()
 async def list_item_types() -> Dict:
@@ -337,18 +878,16 @@ async def list_item_types() -> Dict:
         }
     """
     logger.info(f"GET {API_URL}/schemas/ pour la liste des types d'item")
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{API_URL}/schemas/")
-            response.raise_for_status()
-            types = response.json()
-            return {"types": types}
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTPStatusError: {e.response.status_code} {e.response.text}")
-            return {"error": f"API error: {e.response.status_code} {e.response.text}"}
-        except Exception as e:
-            logger.error(f"Exception lors de l'appel API: {str(e)}")
-            return {"error": str(e)}
+    client = get_http_client()
+    try:
+        types = await schema_cache.get(client, "/schemas/")
+        return {"types": types or []}
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTPStatusError: {e.response.status_code} {e.response.text}")
+        return {"error": f"API error: {e.response.status_code} {e.response.text}"}
+    except Exception as e:
+        logger.error(f"Exception lors de l'appel API: {str(e)}")
+        return {"error": str(e)}
 
 @mcp.tool()
 async def delete_item(
@@ -371,21 +910,21 @@ async def delete_item(
         {"success": true, "message": "Item supprimé"}
     """
     logger.info(f"DELETE {API_URL}/items/{id}")
-    async with httpx.AsyncClient() as client:
+    client = get_http_client()
+    try:
+        response = await client.delete(f"{API_URL}/items/{id}")
+        response.raise_for_status()
         try:
-            response = await client.delete(f"{API_URL}/items/{id}")
-            response.raise_for_status()
-            try:
-                data = response.json()
-            except Exception:
-                data = response.text if response.text else None
-            return {"success": True, "message": "Item supprimé", "data": data}
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTPStatusError: {e.response.status_code} {e.response.text}")
-            return {"success": False, "error": f"API error: {e.response.status_code} {e.response.text}"}
-        except Exception as e:
-            logger.error(f"Exception lors de l'appel API: {str(e)}")
-            return {"success": False, "error": str(e)}
+            data = response.json()
+        except Exception:
+            data = response.text if response.text else None
+        return {"success": True, "message": "Item supprimé", "data": data}
+    except httpx.HTTPStatusError as e:
+        logger.error(f"HTTPStatusError: {e.response.status_code} {e.response.text}")
+        return {"success": False, "error": f"API error: {e.response.status_code} {e.response.text}"}
+    except Exception as e:
+        logger.error(f"Exception lors de l'appel API: {str(e)}")
+        return {"success": False, "error": str(e)}
 if __name__ == "__main__":
     # Utilisation du transport HTTP streamable (POST/GET/SSE) recommandé pour reverse proxy
     mcp.run(transport='streamable-http')